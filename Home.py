@@ -1,8 +1,14 @@
-
 import streamlit as st
-from PIL import Image
+
+
+@st.cache_resource
+def logo():
+    """Octets du logo, lus une seule fois par processus (pas de décodage ni de réencodage à chaque visite)."""
+    with open('./images/logo_miroiterie.png', 'rb') as f:
+        return f.read()
+
 
 st.set_page_config(page_title="Accueil", page_icon="🏠")
 st.title("Bienvenue dans l'application ToolBox Miroiterie Dignoise")
 st.write("Utilisez le menu à gauche pour naviguer entre les pages.")
-st.image(Image.open('./images/logo_miroiterie.png'))
\ No newline at end of file
+st.image(logo())
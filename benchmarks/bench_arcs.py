@@ -0,0 +1,62 @@
+"""
+Générateur d'arcs (miroiterie.arcs) comparé à l'ancienne boucle de la page
+« Forme Cintrée » : nombre de sommets, écart réel à la courbe et temps.
+
+    python benchmarks/bench_arcs.py
+"""
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import shapely
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from miroiterie.arcs import TOLERANCE_CORDE, generer_arc  # noqa: E402
+
+
+def generate_arc_boucle(D, C, fleche, n_points=50):
+    """Ancienne version : boucle Python, 50 points quelle que soit la taille de l'arc."""
+    arc_points = []
+    for t in np.linspace(0, 1, n_points):
+        x = D[0] + t * (C[0] - D[0])
+        y = D[1] + t * (C[1] - D[1])
+        h = 4 * fleche * t * (1 - t)
+        dx, dy = C[0] - D[0], C[1] - D[1]
+        norm = math.hypot(dx, dy)
+        nx, ny = -dy / norm, dx / norm
+        arc_points.append((x + nx * h, y + ny * h))
+    return arc_points
+
+
+def ecart(arc, type, D, C, fleche):
+    """Écart maximal (Hausdorff) entre la polyligne et une référence très fine."""
+    reference = generer_arc(D, C, fleche, type, n_points=100001)
+    return shapely.hausdorff_distance(shapely.linestrings(arc), shapely.linestrings(reference))
+
+
+def chrono(fonction, *args, repetitions=2000, **kwargs):
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        fonction(*args, **kwargs)
+    return (time.perf_counter() - debut) / repetitions * 1e6
+
+
+def main():
+    D = (0.0, 600.0)
+    for largeur, fleche in [(300, 5), (1000, 50), (3000, 400)]:
+        C = (float(largeur), 800.0)
+        ancien = generate_arc_boucle(D, C, fleche)
+        print(f"Corde {largeur} mm, flèche {fleche} mm")
+        print(f"  boucle 50 points   : {len(ancien):4d} sommets, écart {ecart(ancien, 'parabole', D, C, fleche):.3f} mm, "
+              f"{chrono(generate_arc_boucle, D, C, fleche):7.1f} µs")
+        for type in ("parabole", "cercle"):
+            arc = generer_arc(D, C, fleche, type)
+            print(f"  {type:8s} tol. {TOLERANCE_CORDE} : {len(arc):4d} sommets, "
+                  f"écart {ecart(arc, type, D, C, fleche):.3f} mm, {chrono(generer_arc, D, C, fleche, type):7.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Import d'une commande synthétique (miroiterie.commandes) : débit et pic
+mémoire selon le nombre de lignes, avec et sans DXF / PDF par ligne.
+
+    python benchmarks/bench_commandes.py [nb_lignes]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from miroiterie.commandes import importer_commande  # noqa: E402
+
+COLONNES = ["forme", "reference", "base1", "base2", "hauteur", "largeur", "hg", "hd", "fleche", "quantite"]
+
+
+def commande_synthetique(chemin, n, graine=0):
+    """Commande CSV de n lignes : trapèzes isocèles et formes cintrées, une ligne sur 50 invalide."""
+    rng = np.random.default_rng(graine)
+    with open(chemin, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(COLONNES)
+        for k in range(n):
+            a, b, c = rng.uniform(200, 2000, 3).round(1)
+            if k % 50 == 49:
+                writer.writerow(["trapeze_isocele", f"E{k}", a, b, "?", "", "", "", "", 1])
+            elif k % 2:
+                writer.writerow(["forme_cintree_cercle", f"C{k}", "", "", "", a, b, c, round(a / 10, 1), 1])
+            else:
+                writer.writerow(["trapeze_isocele", f"T{k}", a, b, c, "", "", "", "", 2])
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    dossier = tempfile.mkdtemp()
+    commande = os.path.join(dossier, "commande.csv")
+    sortie = os.path.join(dossier, "resultats.csv")
+    commande_synthetique(commande, n)
+
+    for processus in sorted({1, os.cpu_count() or 1}):
+        debut = time.perf_counter()
+        nb, erreurs = importer_commande(commande, sortie, processus=processus)
+        duree = time.perf_counter() - debut
+        print(f"{nb} lignes ({erreurs} en erreur), {processus} processus : {duree:.2f} s, {nb / duree:.0f} lignes/s")
+
+    nb_fichiers = min(n, 2000)
+    commande_fichiers = os.path.join(dossier, "commande_fichiers.csv")
+    commande_synthetique(commande_fichiers, nb_fichiers)
+    debut = time.perf_counter()
+    importer_commande(commande_fichiers, sortie, os.path.join(dossier, "pieces.zip"))
+    print(f"{nb_fichiers} lignes avec DXF + PDF : {time.perf_counter() - debut:.2f} s")
+
+    # Pic mémoire (en un seul processus) : il ne doit pas croître avec la longueur de la commande
+    for nb in (n // 10, n):
+        commande_synthetique(commande, nb)
+        tracemalloc.start()
+        importer_commande(commande, sortie, processus=1)
+        _, pic = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{nb} lignes : pic mémoire {pic / 1e6:.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
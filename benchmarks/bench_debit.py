@@ -0,0 +1,62 @@
+"""
+Débit des tôles (miroiterie.debit) : temps d'une grosse commande de
+chantier, puis gain de la recherche exacte sur first-fit decreasing pour
+de petits groupes.
+
+    python benchmarks/bench_debit.py [nb_lignes]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from miroiterie.debit import debit_exact, debiter, first_fit_decreasing  # noqa: E402
+
+FORMES = [("Cornière", {"A": 50, "B": 70}), ("Profil Z", {"A": 50, "B": 30, "C": 70}),
+          ("Seuil", {"Largeur": 120}), ("Tôle en U", {"A": 50, "B": 40, "C": 70})]
+
+
+def commande_synthetique(n, graine=0):
+    """n lignes de tôles : 4 formes, 2 métaux, 2 épaisseurs, 3 teintes, 1 à 30 pièces de 300 à 4000 mm."""
+    rng = np.random.default_rng(graine)
+    toles = []
+    for k in range(n):
+        forme, dimensions = FORMES[k % 4]
+        toles.append({
+            "metal": ("Aluminium", "Acier")[rng.integers(2)], "epaisseur": ("15/10ème", "20/10ème")[rng.integers(2)],
+            "coloris": ("RAL 7016", "RAL 9010", "RAL 9005")[rng.integers(3)], "laquage": "Laquage Exterieur",
+            "finition": "Satiné", "note_finition": "", "forme": forme, "dimensions": dimensions,
+            "quantite": int(rng.integers(1, 31)), "longueur": int(rng.integers(300, 4001)), "note": "",
+        })
+    return toles
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    toles = commande_synthetique(n)
+    debut = time.perf_counter()
+    debit = debiter(toles)
+    duree = time.perf_counter() - debut
+    print(f"{n} lignes, {len(debit.pieces)} pièces, {len(debit.groupes)} groupes : {duree * 1000:.0f} ms, "
+          f"{sum(len(g.bandes) for g in debit.groupes)} bandes, chute {debit.taux_chute:.1%}, {debit.poids:.0f} kg")
+
+    rng = np.random.default_rng(1)
+    for taille in (8, 12, 16):
+        gains, optimaux, temps = [], 0, 0.0
+        for _ in range(100):
+            longueurs = rng.integers(300, 4001, taille).tolist()
+            ffd = sum(b.longueur for b in first_fit_decreasing(longueurs))
+            debut = time.perf_counter()
+            bandes, optimal = debit_exact(longueurs)
+            temps += time.perf_counter() - debut
+            gains.append(1 - sum(b.longueur for b in bandes) / ffd)
+            optimaux += optimal
+        print(f"{taille} pièces : exact {temps * 10:.1f} ms en moyenne, bandes -{np.mean(gains):.1%} "
+              f"(max -{np.max(gains):.1%}) par rapport à first-fit decreasing, {optimaux} % prouvés optimaux")
+
+
+if __name__ == "__main__":
+    main()
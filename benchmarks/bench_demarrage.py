@@ -0,0 +1,84 @@
+"""
+Démarrage à froid : temps du premier rendu de chaque page dans un processus
+neuf (streamlit déjà importé) et bibliothèques lourdes chargées à cette
+occasion. Échoue (code de sortie 1) si une page dépasse son budget ou charge
+une bibliothèque réservée aux fonctions qui ne servent pas au premier rendu
+(exports PDF / DXF, visionneuse...).
+
+    python benchmarks/bench_demarrage.py [--repetitions N] [--facteur F]
+
+Les budgets sont ceux d'une machine de développement mono-cœur : --facteur
+les multiplie sur une machine plus lente.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Bibliothèques surveillées (plotly n'y figure pas : streamlit l'importe lui-même)
+LOURDES = ("numpy", "shapely", "matplotlib", "reportlab", "ezdxf", "fpdf")
+
+# Page : (budget du premier rendu en secondes, bibliothèques interdites au premier rendu)
+PAGES = {
+    "Home.py": (0.5, LOURDES[1:]),          # st.image importe numpy
+    "pages/1_Rectangle_Englobant.py": (1.3, ("reportlab", "ezdxf", "fpdf")),
+    "pages/2_Forme Cintrée.py": (1.3, ("reportlab", "ezdxf", "fpdf")),
+    "pages/3_DXF.py": (0.4, LOURDES),
+    "pages/4_Toles.py": (0.4, LOURDES),
+    "pages/5_Calepinage.py": (1.3, ("reportlab", "ezdxf", "fpdf")),
+    "pages/6_Dossier.py": (0.4, LOURDES),
+}
+
+# Exécuté dans le processus neuf : premier rendu de la page passée en argument
+MESURE = """
+import json, os, sys, time
+from streamlit.testing.v1 import AppTest
+deja = {nom for nom in sys.modules}
+debut = time.perf_counter()
+at = AppTest.from_file(sys.argv[1]).run(timeout=120)
+duree = time.perf_counter() - debut
+chargees = sorted({nom.split(".")[0] for nom in sys.modules if nom not in deja})
+print(json.dumps({"duree": duree, "chargees": chargees, "erreurs": [e.message for e in at.exception]}))
+"""
+
+
+def premier_rendu(page, env):
+    """Durée du premier rendu, modules de premier niveau importés pendant celui-ci et exceptions."""
+    sortie = subprocess.run([sys.executable, "-c", MESURE, os.path.join(RACINE, page)], cwd=RACINE, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(sortie.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repetitions", type=int, default=3, help="mesures par page (la plus rapide est gardée)")
+    parser.add_argument("--facteur", type=float, default=1.0, help="multiplicateur des budgets")
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=RACINE,
+               MIROITERIE_DB=os.path.join(tempfile.mkdtemp(), "demarrage.db"))
+    echecs = []
+    for page, (budget, interdites) in PAGES.items():
+        mesures = [premier_rendu(page, env) for _ in range(args.repetitions)]
+        duree = min(m["duree"] for m in mesures)
+        chargees = [nom for nom in LOURDES if nom in mesures[0]["chargees"]]
+        budget *= args.facteur
+        print(f"{page:<34} {duree:.2f} s (budget {budget:.2f} s)  chargées : {', '.join(chargees) or '-'}")
+        if duree > budget:
+            echecs.append(f"{page} : {duree:.2f} s > {budget:.2f} s")
+        if set(chargees) & set(interdites):
+            echecs.append(f"{page} : {', '.join(sorted(set(chargees) & set(interdites)))} importé(s) au démarrage")
+        if mesures[0]["erreurs"]:
+            echecs.append(f"{page} : {mesures[0]['erreurs'][0]}")
+
+    for echec in echecs:
+        print(f"❌ {echec}")
+    sys.exit(1 if echecs else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Génération d'un dossier PDF de 500 pages : durée et pic mémoire.
+
+    python benchmarks/bench_dossier.py [nb_pieces]
+"""
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from miroiterie.dossier import PieceDossier, export_dossier  # noqa: E402
+
+
+def pieces_synthetiques(n):
+    pieces = []
+    for k in range(n):
+        if k % 3 == 2:
+            pieces.append(PieceDossier("tole", f"T{k}", tole={
+                "metal": "Aluminium", "epaisseur": "15/10ème", "coloris": "RAL 7016", "laquage": "Laquage Exterieur",
+                "finition": "Satiné", "note_finition": "", "forme": "Profil Z",
+                "dimensions": {"A": 50, "B": 30, "C": 70}, "quantite": 2, "longueur": 3000, "note": "",
+            }))
+        else:
+            nb = 200 if k % 3 else 4
+            points = [(800 * math.cos(2 * math.pi * i / nb) + k, 400 * math.sin(2 * math.pi * i / nb))
+                      for i in range(nb)]
+            pieces.append(PieceDossier("cintree" if k % 3 else "forme", f"P{k}", points=points,
+                                       attributs={"Base": "1000 mm"}))
+    return pieces
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    pieces = pieces_synthetiques(n)
+    debut = time.perf_counter()
+    chemin = export_dossier(pieces, chantier="BENCH", filename="bench_dossier.pdf")
+    print(f"{n} pièces : {time.perf_counter() - debut:.2f} s, {os.path.getsize(chemin) / 1e6:.2f} Mo")
+
+    # Pic mémoire (tracemalloc ralentit beaucoup : mesure séparée)
+    for nb in (n // 5, n):
+        tracemalloc.start()
+        export_dossier(pieces[:nb], filename="bench_dossier.pdf")
+        _, pic = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{nb} pièces : pic mémoire {pic / 1e6:.1f} Mo")
+
+if __name__ == "__main__":
+    main()
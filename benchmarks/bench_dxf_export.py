@@ -0,0 +1,84 @@
+"""
+Ajustement segments / arcs de l'export DXF (miroiterie.dxf_export) : vérifie
+que la polyligne à renflements reste à la tolérance près (distance de
+Hausdorff) de la polyligne d'origine, puis mesure le temps en fonction du
+nombre de points.
+
+    python benchmarks/bench_dxf_export.py
+"""
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import shapely
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from miroiterie.arcs import generer_arc  # noqa: E402
+from miroiterie.dxf_export import TOLERANCE_AJUSTEMENT, sommets_bulges  # noqa: E402
+
+
+def densifier(sommets, pas=0.01):
+    """Points de la polyligne à renflements (fermée), arcs échantillonnés tous les `pas` radians."""
+    points = []
+    for (x0, y0, bulge), (x1, y1, _) in zip(sommets, sommets[1:] + sommets[:1]):
+        if not bulge:
+            points.append((x0, y0))
+            continue
+        balayage = 4 * math.atan(bulge)
+        corde = math.hypot(x1 - x0, y1 - y0)
+        rayon = corde / (2 * math.sin(balayage / 2))
+        # Centre à gauche de la corde pour un arc anti-horaire (bulge > 0)
+        d = rayon * math.cos(balayage / 2)
+        cx = (x0 + x1) / 2 - d * (y1 - y0) / corde
+        cy = (y0 + y1) / 2 + d * (x1 - x0) / corde
+        debut = math.atan2(y0 - cy, x0 - cx)
+        for t in np.linspace(0, balayage, max(2, int(abs(balayage) / pas))):
+            points.append((cx + abs(rayon) * math.cos(debut + t), cy + abs(rayon) * math.sin(debut + t)))
+    return np.array(points)
+
+
+def ecart(points, tolerance=TOLERANCE_AJUSTEMENT):
+    """(nombre de sommets ajustés, distance de Hausdorff à la polyligne d'origine)."""
+    sommets = sommets_bulges(points, tolerance)
+    ajuste = densifier(sommets)
+    origine = np.vstack((points, points[:1]))
+    return len(sommets), shapely.hausdorff_distance(shapely.linestrings(np.vstack((ajuste, ajuste[:1]))),
+                                                    shapely.linestrings(origine), densify=0.01)
+
+
+def contours():
+    """Contours de test : (titre, points, tolérance)."""
+    t = np.linspace(0, math.pi, 80)
+    yield "demi-ellipse 80 points", np.column_stack((600 * np.cos(t), 250 * np.sin(t))), TOLERANCE_AJUSTEMENT
+    for type in ("cercle", "parabole"):
+        arc = generer_arc((1000.0, 800.0), (0.0, 800.0), 150.0, type, tolerance=TOLERANCE_AJUSTEMENT)
+        yield f"cintre {type} 1000 x 800", np.vstack(([(0, 0), (1000, 0)], arc[:-1])), TOLERANCE_AJUSTEMENT
+    rng = np.random.default_rng(0)
+    t = np.linspace(0, 2 * math.pi, 400, endpoint=False)
+    bruit = rng.normal(0, 0.02, (len(t), 2))
+    yield "cercle bruité 400 points", np.column_stack((300 * np.cos(t), 300 * np.sin(t))) + bruit, 0.1
+
+
+def chrono(n):
+    t = np.linspace(0, math.pi, n)
+    points = np.vstack((np.column_stack((5000 * np.cos(t), 5000 + 5000 * np.sin(t))), [(-5000, 0), (5000, 0)]))
+    debut = time.perf_counter()
+    sommets = sommets_bulges(points)
+    duree = time.perf_counter() - debut
+    print(f"demi-cercle de {n:6d} points : {len(sommets):4d} sommets, {duree * 1000:8.1f} ms")
+
+
+def main():
+    for titre, points, tolerance in contours():
+        nb, distance = ecart(points, tolerance)
+        print(f"{titre:<28} {len(points):4d} -> {nb:3d} sommets, Hausdorff {distance:.4f} mm (tolérance {tolerance})")
+        assert distance <= tolerance + 1e-6, (titre, distance)
+    for n in (1000, 10000, 100000):
+        chrono(n)
+
+
+if __name__ == "__main__":
+    main()
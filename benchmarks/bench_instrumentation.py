@@ -0,0 +1,46 @@
+"""
+Coût de l'instrumentation (miroiterie.instrumentation) : appel d'une étape
+instrumentée, coupée puis active, avec et sans pic mémoire, comparé à
+l'appel direct de la fonction.
+
+    python benchmarks/bench_instrumentation.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from miroiterie import instrumentation  # noqa: E402
+from miroiterie.rectangle import minimum_bounding_rectangle  # noqa: E402
+
+POINTS = [(0, 0), (1000, 0), (1200, 600), (200, 600)]
+
+
+def chrono(fonction, nombre):
+    """Meilleur temps par appel (µs)."""
+    return min(timeit.repeat(fonction, number=nombre, repeat=5)) / nombre * 1e6
+
+
+def main():
+    vide = instrumentation.instrumenter("vide")(lambda: None)
+    cas = [
+        ("fonction vide", lambda: None, vide),
+        ("minimum_bounding_rectangle (4 points)", lambda: minimum_bounding_rectangle.__wrapped__(POINTS),
+         lambda: minimum_bounding_rectangle(POINTS)),
+    ]
+    for nom, direct, instrumentee in cas:
+        print(f"--- {nom}")
+        reference = chrono(direct, 20000)
+        print(f"{'appel direct':<32} {reference:8.3f} µs")
+        for titre, actif, memoire in (("instrumentation coupée", False, False), ("active", True, False),
+                                      ("active + pic mémoire", True, True)):
+            instrumentation.activer(actif, memoire)
+            duree = chrono(instrumentee, 20000)
+            instrumentation.activer(False)
+            instrumentation.vider()
+            print(f"{titre:<32} {duree:8.3f} µs (+{duree - reference:.3f} µs)")
+
+
+if __name__ == "__main__":
+    main()
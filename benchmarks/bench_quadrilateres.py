@@ -0,0 +1,62 @@
+"""
+Résolution de quadrilatères (miroiterie.quadrilateres) sur des lots de pièces
+convexes aléatoires : pour chaque combinaison de mesures, part de solutions
+directes, écart maximal, pièces retrouvées à l'identique, mesures ambiguës
+(deux figures convexes possibles), figures non convexes rendues, pièces
+ni retrouvées ni signalées ambiguës (manquées) et temps.
+
+    python benchmarks/bench_quadrilateres.py [nb_pieces]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from miroiterie.quadrilateres import ANGLES, MESURES, mesures, resoudre_quadrilateres  # noqa: E402
+
+COMBINAISONS = [
+    ("ab", "bc", "cd", "da", "angle_a"),
+    ("ab", "bc", "cd", "da", "angle_c"),
+    ("ab", "bc", "cd", "da", "ac"),
+    ("ab", "bc", "da", "angle_a", "angle_b"),
+    ("ab", "cd", "angle_a", "angle_b", "angle_c"),
+    ("bc", "cd", "da", "angle_a", "angle_b"),
+    ("ac", "bd", "bc", "da", "angle_a"),
+    ("ab", "ac", "bd", "angle_a", "angle_b"),
+    ("ac", "bd", "cd", "angle_c", "angle_d"),
+    ("ab", "bc", "cd", "angle_a", "angle_b"),
+    ("ab", "bc", "cd", "da", "angle_a", "angle_b"),
+]
+
+
+def quadrilateres_convexes(n, graine=0):
+    """Mesures de n quadrilatères convexes aléatoires (300 à 1500 mm)."""
+    rng = np.random.default_rng(graine)
+    angles = np.sort(rng.uniform(0, 2 * np.pi, (3 * n, 4)), axis=1)
+    rayons = rng.uniform(300, 1500, (3 * n, 4))
+    sommets = np.stack((rayons * np.cos(angles), rayons * np.sin(angles)), axis=-1)
+    m = mesures(sommets)
+    convexes = np.all([m[nom] < 180 for nom in ANGLES], axis=0)
+    return mesures(sommets[convexes][:n])
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    reference = quadrilateres_convexes(n)
+    n = len(reference["ab"])
+    for combinaison in COMBINAISONS:
+        debut = time.perf_counter()
+        q = resoudre_quadrilateres(**{nom: reference[nom] for nom in combinaison})
+        duree = time.perf_counter() - debut
+        identiques = np.all([np.abs(q.mesures[nom] - reference[nom]) < 1e-6 for nom in MESURES], axis=0)
+        print(f"{', '.join(combinaison):<40} {n} pièces : {duree:.3f} s, directes {q.directes.mean():.0%}, "
+              f"écart max {np.nanmax(q.ecarts):.1e} mm, identiques {identiques.mean():.0%}, "
+              f"ambiguës {q.ambigues.mean():.0%}, non convexes {np.sum(~q.convexes)}, "
+              f"manquées {np.sum(~identiques & ~q.ambigues)}")
+
+
+if __name__ == "__main__":
+    main()
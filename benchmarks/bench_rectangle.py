@@ -0,0 +1,65 @@
+"""
+Rectangle minimal NumPy (miroiterie.rectangle) comparé à shapely :
+vérifie que les aires coïncident puis compare les temps.
+
+    python benchmarks/bench_rectangle.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import shapely
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from miroiterie.rectangle import rectangle_minimal, rectangles_minimaux
+
+
+def formes_aleatoires(n, nb_points, graine=0):
+    """Formes cintrées : polygones aléatoires + arcs discrétisés."""
+    rng = np.random.default_rng(graine)
+    t = np.linspace(0, np.pi, nb_points - 4)
+    formes = []
+    for _ in range(n):
+        largeur, hauteur, fleche = rng.uniform(200, 2000), rng.uniform(200, 2000), rng.uniform(0, 300)
+        arc = np.column_stack((largeur / 2 * (1 + np.cos(t)), hauteur + fleche * np.sin(t)))
+        base = np.array([(0, 0), (largeur, 0)])
+        pts = np.vstack((base, arc, rng.uniform(0, largeur, (2, 2))))
+        angle = rng.uniform(0, 2 * np.pi)
+        rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        formes.append(pts @ rotation.T)
+    return formes
+
+
+def verifier(formes):
+    coins, angles, largeurs, hauteurs = rectangles_minimaux(formes)
+    for forme, l, h in zip(formes, largeurs, hauteurs):
+        reference = shapely.MultiPoint(forme).minimum_rotated_rectangle.area
+        assert np.isclose(l * h, reference, rtol=1e-9), (l * h, reference)
+    assert np.allclose(np.hypot(*(coins[:, 1] - coins[:, 0]).T), largeurs)
+    print(f"OK : {len(formes)} rectangles identiques à shapely")
+
+
+def chronometrer(titre, fonction, repetitions=3):
+    meilleur = min(_duree(fonction) for _ in range(repetitions))
+    print(f"{titre:<40} {meilleur * 1000:9.1f} ms")
+
+
+def _duree(fonction):
+    debut = time.perf_counter()
+    fonction()
+    return time.perf_counter() - debut
+
+
+if __name__ == "__main__":
+    for n, nb_points in [(1000, 24), (1000, 104), (10000, 54)]:
+        formes = formes_aleatoires(n, nb_points)
+        print(f"--- {n} formes de {nb_points} sommets")
+        verifier(formes)
+        chronometrer("shapely minimum_rotated_rectangle",
+                     lambda: [shapely.Polygon(f).minimum_rotated_rectangle for f in formes])
+        chronometrer("rectangle_minimal (une par une)", lambda: [rectangle_minimal(f) for f in formes])
+        chronometrer("rectangles_minimaux (liste)", lambda: rectangles_minimaux(formes))
+        empilees = np.stack(formes)
+        chronometrer("rectangles_minimaux (tableau N x M x 2)", lambda: rectangles_minimaux(empilees))
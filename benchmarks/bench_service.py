@@ -0,0 +1,67 @@
+"""
+Service HTTP (miroiterie.service) par le client dans le même processus :
+débit de requêtes concurrentes toutes différentes, puis avec des doublons
+(déduplication par empreinte), comparé aux appels directs en série.
+
+    python benchmarks/bench_service.py [nb_requetes] [processus]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from miroiterie import taches  # noqa: E402
+from miroiterie.service import ClientLocal, creer_app  # noqa: E402
+
+TOLES = [{"metal": "Aluminium", "epaisseur": "15/10ème", "coloris": "RAL 7016", "laquage": "Laquage Exterieur",
+          "finition": "Satiné", "note_finition": "", "forme": "Profil Z", "dimensions": {"A": 50, "B": 30, "C": 70},
+          "quantite": 2, "longueur": 3000, "note": ""}] * 10
+
+
+def requetes(n, distinctes):
+    """n requêtes (chemin, corps JSON) : formes, rectangles et bons de commande, `distinctes` valeurs par type."""
+    for k in range(n):
+        v = k % distinctes
+        yield [("/formes/trapeze_isocele", {"parametres": {"base1": 1000 + v, "base2": 600, "hauteur": 400}}),
+               ("/rectangle", {"points": [[0, 0], [1000 + v, 0], [1200, 600], [200, 600 + v]]}),
+               ("/documents/commande-toles.pdf", {"toles": TOLES, "fournisseur": f"F{v}"})][k % 3]
+
+
+async def mesurer(client, n, distinctes):
+    debut = time.perf_counter()
+    reponses = await asyncio.gather(*(client.post(chemin, json=corps) for chemin, corps in requetes(n, distinctes)))
+    duree = time.perf_counter() - debut
+    origines = [r.entetes.get("x-origine") for r in reponses]
+    statuts = {r.statut for r in reponses}
+    print(f"{n} requêtes, {distinctes} valeurs par type : {duree:.2f} s ({n / duree:.0f} req/s), statuts {statuts}, "
+          + ", ".join(f"{o} {origines.count(o)}" for o in ("calcul", "partage", "cache")))
+
+
+def direct(n):
+    """Mêmes calculs, appels directs en série (sans service)."""
+    fonctions = {"/formes/trapeze_isocele": lambda c: taches.evaluer_formes("trapeze_isocele", c["parametres"]),
+                 "/rectangle": lambda c: taches.rectangle_points(c["points"]),
+                 "/documents/commande-toles.pdf": lambda c: taches.commande_toles_pdf(c["toles"], c["fournisseur"])}
+    debut = time.perf_counter()
+    for chemin, corps in requetes(n, n):
+        fonctions[chemin](corps)
+    duree = time.perf_counter() - debut
+    print(f"{n} appels directs en série : {duree:.2f} s ({n / duree:.0f} appels/s)")
+
+
+async def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    processus = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    taches.prechauffer()
+    direct(n)
+    async with ClientLocal(creer_app(processus=processus)) as client:
+        print(f"service : {client.app.state.file.processus} processus")
+        await mesurer(client, n, n)
+        await mesurer(client, n, 10)
+        await mesurer(client, n, 10)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
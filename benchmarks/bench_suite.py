@@ -0,0 +1,220 @@
+"""
+Suite de référence : géométrie, lecture DXF et exports, sur des corpus DXF
+synthétiques de 1 000, 10 000 et 100 000 entités générés avec ezdxf.
+
+Chaque cas est chronométré plusieurs fois (meilleur temps et médiane) ; les
+résultats sont écrits en JSON pour être comparés d'une version à l'autre :
+
+    python benchmarks/bench_suite.py --sortie avant.json
+    python benchmarks/bench_suite.py --sortie apres.json --comparer avant.json
+
+Avec --comparer, le code de sortie vaut 1 si un cas est plus lent que
+--seuil fois sa référence. --tailles et --filtre restreignent la suite.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import runpy
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from miroiterie import croquis  # noqa: E402
+from miroiterie.arcs import generer_arc  # noqa: E402
+from miroiterie.dxf_cache import lire_dxf_bytes  # noqa: E402
+from miroiterie.rectangle import minimum_bounding_rectangle  # noqa: E402
+from miroiterie.rendu_dxf import plot_dxf_interactive  # noqa: E402
+from miroiterie.toles import export_commande_pdf  # noqa: E402
+from miroiterie.toles_dxf import document_commande, dxf_bytes, flux_zip_dxf  # noqa: E402
+
+TAILLES = (1_000, 10_000, 100_000)
+
+CALQUES = ("VERRE", "PERCAGES", "ENCOCHES", "COTES")
+
+# Fonctions définies dans la page (sans exécuter son interface)
+_PAGE_RECTANGLE = runpy.run_path(os.path.join(RACINE, "pages", "1_Rectangle_Englobant.py"))
+charger_dxf_points = _PAGE_RECTANGLE["charger_dxf_points"]
+export_forme_pdf = _PAGE_RECTANGLE["export_forme_pdf"]
+export_quadrilatere_to_dxf = _PAGE_RECTANGLE["export_quadrilatere_to_dxf"]
+
+
+# --- Corpus synthétiques ---
+
+def corpus_dxf(n, graine=0):
+    """
+    Contenu (bytes) d'un DXF d'environ n entités : un cadre extérieur fermé
+    (lignes et arc) et, dans une grille, des perçages (cercles), encoches
+    (polylignes à renflements), rectangles en 4 lignes et cotes (textes).
+    Le fichier est gardé dans le répertoire temporaire entre deux exécutions.
+    """
+    chemin = os.path.join(tempfile.gettempdir(), f"bench_suite_{n}_{graine}.dxf")
+    if not os.path.exists(chemin):
+        import ezdxf
+
+        rng = np.random.default_rng(graine)
+        doc = ezdxf.new()
+        for calque in CALQUES:
+            doc.layers.add(calque)
+        msp = doc.modelspace()
+
+        # Motifs de 7 entités (cercle, polyligne, 4 lignes, texte) dans une grille carrée
+        cotes = math.ceil(math.sqrt(max(n - 4, 7) / 7))
+        pas = 100.0
+        largeur = cotes * pas
+        for k in range(max(n - 4, 7) // 7):
+            x, y = (k % cotes) * pas + 10, (k // cotes) * pas + 10
+            r, l, h = rng.uniform(5, 15), rng.uniform(20, 40), rng.uniform(20, 40)
+            msp.add_circle((x + 20, y + 20), r, dxfattribs={"layer": "PERCAGES"})
+            msp.add_lwpolyline([(x + 45, y + 5, 0.4), (x + 85, y + 5, 0), (x + 85, y + 25, -0.4), (x + 45, y + 25, 0)],
+                               format="xyb", close=True, dxfattribs={"layer": "ENCOCHES"})
+            coins = [(x + 5, y + 45), (x + 5 + l, y + 45), (x + 5 + l, y + 45 + h), (x + 5, y + 45 + h)]
+            for a, b in zip(coins, coins[1:] + coins[:1]):
+                msp.add_line(a, b, dxfattribs={"layer": "VERRE"})
+            msp.add_text(f"P{k}", dxfattribs={"layer": "COTES", "height": 5, "insert": (x + 50, y + 60)})
+
+        # Cadre : 3 lignes et un arc de sommet
+        msp.add_line((0, 0), (largeur, 0), dxfattribs={"layer": "VERRE"})
+        msp.add_line((largeur, 0), (largeur, largeur), dxfattribs={"layer": "VERRE"})
+        msp.add_line((0, largeur), (0, 0), dxfattribs={"layer": "VERRE"})
+        msp.add_arc((largeur / 2, largeur), largeur / 2, 0, 180, dxfattribs={"layer": "VERRE"})
+        doc.saveas(chemin)
+    with open(chemin, "rb") as f:
+        return f.read()
+
+
+def nuage_points(n, graine=0):
+    """Contour cintré de n sommets, tourné aléatoirement."""
+    rng = np.random.default_rng(graine)
+    t = np.linspace(0, np.pi, max(n - 2, 2))
+    pts = np.vstack(([(0, 0), (1000, 0)], np.column_stack((500 * (1 + np.cos(t)), 600 + 150 * np.sin(t)))))
+    angle = rng.uniform(0, 2 * np.pi)
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    return [tuple(p) for p in (pts @ rotation.T).tolist()]
+
+
+def toles_synthetiques(n):
+    formes = [("Cornière", {"A": 50, "B": 70}), ("Profil Z", {"A": 50, "B": 30, "C": 70}),
+              ("Seuil", {"Largeur": 120}), ("Tôle en U", {"A": 50, "B": 40, "C": 70})]
+    return [{"metal": "Aluminium", "epaisseur": "15/10ème", "coloris": "RAL 7016", "laquage": "Laquage Exterieur",
+             "finition": "Satiné", "note_finition": "", "forme": formes[k % 4][0], "dimensions": formes[k % 4][1],
+             "quantite": 2, "longueur": 3000, "note": ""} for k in range(n)]
+
+
+# --- Cas mesurés ---
+
+def cas(tailles):
+    """
+    (nom, taille, préparation, fonction) : préparation() fournit les arguments
+    de fonction, hors chronométrage.
+    """
+    for n in tailles:
+        yield "lire_dxf_bytes", n, lambda n=n: (corpus_dxf(n),), lire_dxf_bytes
+        yield ("charger_dxf_points", n, lambda n=n: (lire_dxf_bytes(corpus_dxf(n)),), charger_dxf_points)
+        yield ("plot_dxf_interactive", n, lambda n=n: (lire_dxf_bytes(corpus_dxf(n)), list(CALQUES)),
+               plot_dxf_interactive)
+        yield "minimum_bounding_rectangle", n, lambda n=n: (nuage_points(n),), minimum_bounding_rectangle
+
+    for tolerance in (1.0, 0.1, 0.01):
+        yield (f"generer_arc (tolérance {tolerance} mm)", 1, lambda t=tolerance: ((0, 600), (1000, 800), 150, "cercle", t),
+               generer_arc)
+
+    for n in (4, 1_000, 10_000):
+        yield ("export_forme_pdf", n, lambda n=n: (nuage_points(n), minimum_bounding_rectangle(nuage_points(n))),
+               lambda points, rect: export_forme_pdf(points, rect, "REF", filename="bench_suite.pdf"))
+        yield ("export_forme_pdf (échelle 1:1)", n,
+               lambda n=n: (nuage_points(n), minimum_bounding_rectangle(nuage_points(n))),
+               lambda points, rect: export_forme_pdf(points, rect, filename="bench_suite.pdf", echelle_reelle=True))
+        yield ("export_quadrilatere_to_dxf", n, lambda n=n: (nuage_points(n),),
+               lambda points: export_quadrilatere_to_dxf(points, "bench_suite.dxf", "REF"))
+
+    for n in (1, 10, 100):
+        yield "generer_pdf (tôles)", n, lambda n=n: (toles_synthetiques(n), "Fournisseur", "BENCH"), export_commande_pdf
+        yield ("croquis SVG (cache vidé)", n, lambda n=n: (toles_synthetiques(n),),
+               lambda toles: (croquis.vider_cache(), [croquis.svg(t) for t in toles]))
+        yield "croquis SVG (cache)", n, lambda n=n: (toles_synthetiques(n),), lambda toles: [croquis.svg(t) for t in toles]
+        yield ("DXF de la commande (tôles)", n, lambda n=n: (toles_synthetiques(n),),
+               lambda toles: dxf_bytes(document_commande(toles)[0]))
+        yield "zip DXF (tôles)", n, lambda n=n: (toles_synthetiques(n),), lambda toles: b"".join(flux_zip_dxf(toles))
+
+
+def chronometrer(preparation, fonction, repetitions, duree_max):
+    """Durées d'exécution (s) ; s'arrête plus tôt quand le cumul dépasse duree_max."""
+    args = preparation()
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction(*args)
+        durees.append(time.perf_counter() - debut)
+        if sum(durees) > duree_max:
+            break
+    return durees
+
+
+def environnement():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RACINE, capture_output=True,
+                                text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"date": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit, "python": platform.python_version(),
+            "machine": platform.platform(), "processeurs": os.cpu_count()}
+
+
+def comparer(resultats, reference, seuil):
+    """Affiche le rapport au résultat de référence ; renvoie les cas plus lents que seuil x référence."""
+    anciens = {(r["cas"], r["taille"]): r for r in reference["resultats"]}
+    regressions = []
+    for r in resultats:
+        ancien = anciens.get((r["cas"], r["taille"]))
+        if ancien is None:
+            continue
+        rapport = r["min"] / ancien["min"]
+        marque = "❌" if rapport > seuil else "  "
+        print(f"{marque} {r['cas']:<40} {r['taille']:>7} : {ancien['min'] * 1000:9.2f} -> "
+              f"{r['min'] * 1000:9.2f} ms (x{rapport:.2f})")
+        if rapport > seuil:
+            regressions.append(r)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sortie", help="fichier JSON des résultats")
+    parser.add_argument("--comparer", help="fichier JSON de référence")
+    parser.add_argument("--seuil", type=float, default=1.25, help="rapport de temps toléré avec --comparer")
+    parser.add_argument("--tailles", type=int, nargs="+", default=TAILLES, help="tailles des corpus DXF")
+    parser.add_argument("--filtre", default="", help="ne garder que les cas dont le nom contient ce texte")
+    parser.add_argument("--repetitions", type=int, default=7)
+    parser.add_argument("--duree-max", type=float, default=10.0, help="temps cumulé maximal par cas (s)")
+    args = parser.parse_args()
+
+    resultats = []
+    for nom, taille, preparation, fonction in cas(args.tailles):
+        if args.filtre not in nom:
+            continue
+        durees = chronometrer(preparation, fonction, args.repetitions, args.duree_max)
+        resultats.append({"cas": nom, "taille": taille, "min": min(durees), "mediane": statistics.median(durees),
+                          "repetitions": len(durees)})
+        print(f"{nom:<40} {taille:>7} : {min(durees) * 1000:9.2f} ms (médiane {statistics.median(durees) * 1000:.2f})")
+
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as f:
+            json.dump({"environnement": environnement(), "resultats": resultats}, f, ensure_ascii=False, indent=1)
+
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            regressions = comparer(resultats, json.load(f), args.seuil)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Section DXF des tôles pliées (miroiterie.toles_dxf) : vérifie que la section
+dessinée et le flan développé décrivent la même pièce. L'aire de la section
+divisée par l'épaisseur est la longueur de sa fibre moyenne, qui doit être
+la largeur développée avec k = 1 (fibre neutre à mi-épaisseur), pour chaque
+profil, épaisseur et rayon de pliage.
+
+    python benchmarks/bench_toles_dxf.py
+"""
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from miroiterie.profils import PROFILS, developper  # noqa: E402
+from miroiterie.toles_dxf import sommets_section  # noqa: E402
+
+DIMENSIONS = {"Cornière": {"A": 40, "B": 60}, "Profil Z": {"A": 40, "B": 60, "C": 20},
+              "Seuil": {"Largeur": 150}, "Tôle en U": {"A": 40, "B": 60, "C": 20}}
+
+
+def aire(contour):
+    """Aire d'une polyligne fermée à renflements : polygone des sommets plus segment circulaire de chaque arc."""
+    total = 0.0
+    for (x0, y0, bulge), (x1, y1, _) in zip(contour, contour[1:] + contour[:1]):
+        total += (x0 * y1 - x1 * y0) / 2
+        if bulge:
+            balayage = 4 * math.atan(abs(bulge))
+            rayon = math.hypot(x1 - x0, y1 - y0) / (2 * math.sin(balayage / 2))
+            total += math.copysign(rayon ** 2 * (balayage - math.sin(balayage)) / 2, bulge)
+    return abs(total)
+
+
+def largeur_k1(forme, dimensions, s, r):
+    """Largeur développée avec la fibre neutre à mi-épaisseur (k = 1)."""
+    largeur = sum(dimensions.values())
+    for angle in PROFILS[forme].plis:
+        phi = math.radians(abs(angle))
+        largeur += phi * (r + s / 2) - 2 * (r + s) * math.tan(phi / 2)
+    return largeur
+
+
+def main():
+    debut, ecart_max = time.perf_counter(), 0.0
+    for forme, dimensions in DIMENSIONS.items():
+        for epaisseur in ("10/10ème", "15/10ème", "30/10ème"):
+            for relatif in (0.5, 1.0, 2.0):
+                tole = {"forme": forme, "dimensions": dimensions, "epaisseur": epaisseur, "longueur": 1000}
+                s = developper(tole).epaisseur
+                developpe = developper(tole, rayon=relatif * s)
+                fibre = aire(sommets_section(tole, developpe)) / s
+                attendu = largeur_k1(forme, dimensions, s, developpe.rayon)
+                ecart_max = max(ecart_max, abs(fibre - attendu))
+                assert abs(fibre - attendu) < 1e-6, (forme, epaisseur, relatif, fibre, attendu)
+            print(f"{forme:<10} {epaisseur} : fibre moyenne {fibre:8.3f} mm, développé k = 1 {attendu:8.3f} mm")
+    print(f"écart max {ecart_max:.2e} mm ({(time.perf_counter() - debut) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Fonctions de calcul partagées par les pages de la ToolBox Miroiterie."""
@@ -0,0 +1,66 @@
+"""
+Aperçus matplotlib rendus une seule fois.
+
+L'image d'une forme (PNG ou SVG) est calculée à partir de la fonction de
+dessin et de ses arguments (points, rectangle...), puis gardée en mémoire :
+un rerun Streamlit ne reconstruit pas la figure.
+"""
+import hashlib
+import io
+
+import numpy as np
+
+from miroiterie.cache import CacheLRU
+from miroiterie.instrumentation import mesurer
+
+# Nombre d'images gardées en mémoire (toutes sessions confondues)
+MAX_APERCUS = 64
+
+# Résolution des aperçus PNG
+DPI = 200
+
+_cache = CacheLRU(MAX_APERCUS)
+
+
+def _empreinte_argument(valeur, h):
+    """Ajoute un argument à l'empreinte : tableau de coordonnées ou, à défaut, sa représentation."""
+    try:
+        tableau = np.asarray(valeur, dtype=float)
+    except (TypeError, ValueError):
+        h.update(repr(valeur).encode())
+    else:
+        h.update(str(tableau.shape).encode())
+        h.update(tableau.tobytes())
+    h.update(b"|")
+
+
+def cle_apercu(dessin, args, format, dpi):
+    """Empreinte de la fonction de dessin (fichier + nom) et de ses arguments."""
+    h = hashlib.sha1()
+    h.update(f"{dessin.__code__.co_filename}:{dessin.__qualname__}:{format}:{dpi}|".encode())
+    for valeur in args:
+        _empreinte_argument(valeur, h)
+    return h.hexdigest()
+
+
+def image_figure(dessin, *args, format="png", dpi=DPI):
+    """
+    Octets de l'image produite par dessin(*args) (fonction qui renvoie une
+    figure matplotlib). La figure n'est construite qu'au premier appel.
+    """
+    cle = cle_apercu(dessin, args, format, dpi)
+    image = _cache.get(cle)
+    if image is None:
+        import matplotlib.pyplot as plt
+
+        with mesurer("figure (matplotlib)"):
+            fig = dessin(*args)
+        with mesurer(f"savefig {format} (matplotlib)") as mesure:
+            tampon = io.BytesIO()
+            fig.savefig(tampon, format=format, bbox_inches="tight", dpi=dpi)
+            plt.close(fig)
+            image = tampon.getvalue()
+            mesure.taille = len(image)
+        _cache.put(cle, image)
+    return image
+
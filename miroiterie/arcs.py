@@ -0,0 +1,137 @@
+"""
+Arcs des formes cintrées, entre deux points D et C, bombés d'une flèche donnée.
+
+Deux profils :
+  - "parabole" : h(t) = 4 f t (1 - t), le profil historique de la page ;
+  - "cercle" : vrai arc de cercle de corde DC et de flèche f (une seule
+    courbure, ce que font les cintreuses et ce qu'attend une découpe CNC).
+
+Le nombre de points découle d'une tolérance de corde en mm : l'écart maximal
+entre l'arc exact et la polyligne ne la dépasse jamais. Un petit arc a donc
+peu de sommets, un grand arc en a davantage.
+"""
+import math
+
+import numpy as np
+
+# Écart maximal arc / polyligne par défaut (mm)
+TOLERANCE_CORDE = 0.1
+
+# Garde-fou sur le nombre de segments d'un arc
+SEGMENTS_MAX = 10000
+
+TYPES_ARCS = ("parabole", "cercle")
+
+
+def segments_parabole(fleche, tolerance=TOLERANCE_CORDE):
+    """
+    Segments nécessaires pour une parabole de flèche f. Sa dérivée seconde est
+    constante (|h''| = 8 f), l'écart d'une corde de pas dt vaut donc f dt²
+    partout : n = ceil(sqrt(f / tolérance)).
+    """
+    return min(max(1, math.ceil(math.sqrt(abs(fleche) / tolerance))), SEGMENTS_MAX)
+
+
+def rayon_fleche(corde, fleche):
+    """Rayon de l'arc de cercle de corde et de flèche données."""
+    return (corde * corde / 4 + fleche * fleche) / (2 * abs(fleche))
+
+
+def angle_fleche(corde, fleche):
+    """Angle au centre (radians) de l'arc de cercle de corde et de flèche données."""
+    return 4 * math.atan2(2 * abs(fleche), corde)
+
+
+def segments_cercle(corde, fleche, tolerance=TOLERANCE_CORDE):
+    """Segments tels que la flèche de chaque corde, R (1 - cos(a/2)), reste sous la tolérance."""
+    rayon = rayon_fleche(corde, fleche)
+    if tolerance >= rayon:
+        return 2
+    pas = 2 * math.acos(1 - tolerance / rayon)
+    return min(max(1, math.ceil(angle_fleche(corde, fleche) / pas)), SEGMENTS_MAX)
+
+
+def generer_arc(D, C, fleche, type="parabole", tolerance=TOLERANCE_CORDE, n_points=None):
+    """
+    Points (tableau N x 2) de l'arc de D à C, bombé de `fleche` du côté gauche
+    de DC (normale (-dy, dx)). n_points impose le nombre de points ; sinon il
+    découle de la tolérance de corde (mm).
+    """
+    D = np.asarray(D, dtype=float)
+    C = np.asarray(C, dtype=float)
+    corde = C - D
+    longueur = math.hypot(*corde)
+    if not fleche or not longueur:
+        return np.vstack((D, C))
+    normale = np.array((-corde[1], corde[0])) / longueur
+
+    if type == "parabole":
+        n = n_points or segments_parabole(fleche, tolerance) + 1
+        t = np.linspace(0.0, 1.0, n)[:, None]
+        return D + t * corde + (4 * fleche * t * (1 - t)) * normale
+
+    if type == "cercle":
+        n = n_points or segments_cercle(longueur, fleche, tolerance) + 1
+        rayon = rayon_fleche(longueur, fleche)
+        demi_angle = angle_fleche(longueur, fleche) / 2
+        psi = np.linspace(-demi_angle, demi_angle, n)[:, None]
+        # Repère local : u le long de la corde depuis son milieu, v selon la normale
+        u = rayon * np.sin(psi)
+        v = (rayon * np.cos(psi) - (rayon - abs(fleche))) * math.copysign(1, fleche)
+        arc = (D + C) / 2 + u * (corde / longueur) + v * normale
+        # Extrémités exactes : la forme se referme sans écart d'arrondi
+        arc[0], arc[-1] = D, C
+        return arc
+
+    raise ValueError(f"type d'arc inconnu : {type!r} (attendu : {', '.join(TYPES_ARCS)})")
+
+
+def segments_arcs(cordes, fleches, type="parabole", tolerance=TOLERANCE_CORDE):
+    """Version vectorisée de segments_parabole / segments_cercle (tableaux de cordes et de flèches)."""
+    cordes = np.asarray(cordes, dtype=float)
+    fleches = np.abs(np.asarray(fleches, dtype=float))
+    if type == "parabole":
+        n = np.ceil(np.sqrt(fleches / tolerance))
+    else:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rayons = (cordes * cordes / 4 + fleches * fleches) / (2 * fleches)
+            pas = 2 * np.arccos(np.clip(1 - tolerance / rayons, -1, 1))
+            n = np.where(tolerance >= rayons, 2, np.ceil(4 * np.arctan2(2 * fleches, cordes) / pas))
+        n = np.where(fleches > 0, n, 1)
+    return np.clip(n, 1, SEGMENTS_MAX).astype(int)
+
+
+def generer_arcs(D, C, fleches, type="parabole", n_points=2):
+    """
+    Arcs de plusieurs pièces d'un coup, tous avec n_points points : D et C de
+    forme (N, 2), fleches (N,). Renvoie un tableau (N, n_points, 2).
+    Une flèche nulle donne des points alignés sur la corde.
+    """
+    D = np.asarray(D, dtype=float)[:, None, :]
+    C = np.asarray(C, dtype=float)[:, None, :]
+    fleches = np.asarray(fleches, dtype=float)[:, None, None]
+    corde = C - D
+    longueurs = np.hypot(corde[..., 0:1], corde[..., 1:2])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unitaire = np.where(longueurs > 0, corde / longueurs, 0.0)
+    normale = np.concatenate((-unitaire[..., 1:2], unitaire[..., 0:1]), axis=-1)
+
+    if type == "parabole":
+        t = np.linspace(0.0, 1.0, n_points)[None, :, None]
+        return D + t * corde + 4 * fleches * t * (1 - t) * normale
+
+    if type == "cercle":
+        f = np.abs(fleches)
+        courbe = f > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rayons = np.where(courbe, (longueurs * longueurs / 4 + f * f) / (2 * f), 0.0)
+            demi_angles = 2 * np.arctan2(2 * f, longueurs)
+            psi = np.linspace(-1.0, 1.0, n_points)[None, :, None] * demi_angles
+            u = np.where(courbe, rayons * np.sin(psi), np.linspace(-0.5, 0.5, n_points)[None, :, None] * longueurs)
+            v = np.where(courbe, (rayons * np.cos(psi) - (rayons - f)) * np.sign(fleches), 0.0)
+        arcs = (D + C) / 2 + u * unitaire + v * normale
+        # Extrémités exactes : la forme se referme sans écart d'arrondi
+        arcs[:, 0], arcs[:, -1] = D[:, 0], C[:, 0]
+        return arcs
+
+    raise ValueError(f"type d'arc inconnu : {type!r} (attendu : {', '.join(TYPES_ARCS)})")
@@ -0,0 +1,38 @@
+"""Cache LRU borné, partagé entre les sessions Streamlit d'un même processus."""
+import threading
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """Dictionnaire borné : l'entrée la moins récemment utilisée est évincée."""
+
+    def __init__(self, taille_max):
+        self.taille_max = taille_max
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def get(self, cle, defaut=None):
+        with self._verrou:
+            if cle not in self._entrees:
+                return defaut
+            self._entrees.move_to_end(cle)
+            return self._entrees[cle]
+
+    def put(self, cle, valeur):
+        with self._verrou:
+            self._entrees[cle] = valeur
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+
+    def clear(self):
+        with self._verrou:
+            self._entrees.clear()
+
+    def __contains__(self, cle):
+        with self._verrou:
+            return cle in self._entrees
+
+    def __len__(self):
+        with self._verrou:
+            return len(self._entrees)
@@ -0,0 +1,318 @@
+"""
+Calepinage : placement des rectangles englobants des pièces sur des plateaux de verre.
+
+Deux heuristiques rapides :
+  - "guillotine" : étagères (first-fit decreasing height), chaque plateau se
+    découpe par coupes traversantes, comme sur une table de découpe ;
+  - "skyline" : ligne d'horizon bottom-left, plus compacte mais pas toujours
+    découpable à la guillotine.
+Les pièces peuvent porter leur polygone réel, replacé dans son rectangle.
+"""
+import math
+import os
+import tempfile
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from miroiterie.dxf_export import ajouter_contour
+from miroiterie.instrumentation import instrumenter
+from miroiterie.rectangle import rectangle_minimal
+
+# Formats de plateaux courants (mm)
+FORMATS_PLAQUES = {
+    "Plateau PLF 6000 x 3210": (6000, 3210),
+    "Demi-plateau DLF 3210 x 2250": (3210, 2250),
+    "Volume 2550 x 1605": (2550, 1605),
+}
+
+# Nombre de plaques encore ouvertes au placement (les plus anciennes sont figées)
+PLAQUES_OUVERTES = 8
+
+
+@dataclass
+class Piece:
+    reference: str
+    largeur: float
+    hauteur: float
+    polygone: np.ndarray = None      # forme réelle dans son rectangle, coin bas gauche en (0, 0)
+
+    @classmethod
+    def depuis_forme(cls, reference, points):
+        """Pièce à partir des points d'une forme : rectangle minimal + forme remise d'équerre."""
+        points = np.asarray(points, dtype=float)
+        _, angle, largeur, hauteur = rectangle_minimal(points)
+        theta = -math.radians(angle)
+        rotation = np.array([[math.cos(theta), -math.sin(theta)], [math.sin(theta), math.cos(theta)]])
+        alignes = points @ rotation.T
+        return cls(reference, largeur, hauteur, alignes - alignes.min(axis=0))
+
+
+@dataclass
+class Placement:
+    piece: int          # indice dans la liste des pièces
+    plaque: int
+    x: float
+    y: float
+    largeur: float      # dimensions une fois placée (après rotation éventuelle)
+    hauteur: float
+    tournee: bool
+
+
+@dataclass
+class Calepinage:
+    pieces: list
+    placements: list
+    format_plaque: tuple
+    nb_plaques: int
+    non_placees: list = field(default_factory=list)
+
+    @property
+    def taux_chute(self):
+        """Part de la surface des plaques utilisées qui part en chute."""
+        if not self.nb_plaques:
+            return 0.0
+        utile = sum(p.largeur * p.hauteur for p in self.placements)
+        return 1 - utile / (self.nb_plaques * self.format_plaque[0] * self.format_plaque[1])
+
+    def placements_plaque(self, plaque):
+        return [p for p in self.placements if p.plaque == plaque]
+
+    def polygone_place(self, placement):
+        """Polygone réel de la pièce à sa position sur la plaque (ou son rectangle)."""
+        piece = self.pieces[placement.piece]
+        if piece.polygone is None:
+            forme = np.array([(0, 0), (piece.largeur, 0), (piece.largeur, piece.hauteur), (0, piece.hauteur)])
+        else:
+            forme = piece.polygone
+        if placement.tournee:
+            # Rotation de 90° : (x, y) -> (hauteur - y, x)
+            forme = np.column_stack((piece.hauteur - forme[:, 1], forme[:, 0]))
+        return forme + (placement.x, placement.y)
+
+
+class _Etageres:
+    """Plaque découpée en étagères horizontales (placement guillotine)."""
+
+    def __init__(self, largeur, hauteur):
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.etageres = []       # [y, hauteur, x libre]
+        self.y_libre = 0.0
+
+    def placer(self, w, h, rotation):
+        """Cherche la meilleure étagère (moins de hauteur perdue) ; renvoie (x, y, w, h) ou None."""
+        meilleur = None
+        for orientation in ((w, h), (h, w)) if rotation else ((w, h),):
+            pw, ph = orientation
+            for etagere in self.etageres:
+                y, eh, x = etagere
+                if ph <= eh and x + pw <= self.largeur:
+                    perte = eh - ph
+                    if meilleur is None or perte < meilleur[0]:
+                        meilleur = (perte, etagere, pw, ph)
+        if meilleur is not None:
+            _, etagere, pw, ph = meilleur
+            x = etagere[2]
+            etagere[2] += pw
+            return x, etagere[0], pw, ph
+
+        # Nouvelle étagère : pièce couchée (côté le plus court en hauteur) si possible
+        orientations = sorted(((w, h), (h, w)), key=lambda o: o[1]) if rotation else [(w, h)]
+        for pw, ph in orientations:
+            if pw <= self.largeur and self.y_libre + ph <= self.hauteur:
+                self.etageres.append([self.y_libre, ph, pw])
+                self.y_libre += ph
+                return 0.0, self.etageres[-1][0], pw, ph
+        return None
+
+
+class _Skyline:
+    """Ligne d'horizon : segments [x, y, largeur] couvrant la largeur de la plaque."""
+
+    def __init__(self, largeur, hauteur):
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.segments = [[0.0, 0.0, largeur]]
+
+    def _hauteur_appui(self, i, w):
+        """Hauteur où poser une pièce de largeur w à partir du segment i, ou None."""
+        x = self.segments[i][0]
+        if x + w > self.largeur + 1e-9:
+            return None
+        y, reste, j = 0.0, w, i
+        while reste > 1e-9 and j < len(self.segments):
+            y = max(y, self.segments[j][1])
+            reste -= self.segments[j][2]
+            j += 1
+        return y
+
+    def placer(self, w, h, rotation):
+        meilleur = None
+        for pw, ph in ((w, h), (h, w)) if rotation else ((w, h),):
+            for i in range(len(self.segments)):
+                y = self._hauteur_appui(i, pw)
+                if y is None or y + ph > self.hauteur + 1e-9:
+                    continue
+                score = (y + ph, self.segments[i][0])
+                if meilleur is None or score < meilleur[0]:
+                    meilleur = (score, i, y, pw, ph)
+        if meilleur is None:
+            return None
+        _, i, y, pw, ph = meilleur
+        x = self.segments[i][0]
+        self._ajouter(i, x, y + ph, pw)
+        return x, y, pw, ph
+
+    def _ajouter(self, i, x, y, w):
+        nouveaux = [[x, y, w]]
+        fin = x + w
+        reste = self.segments[i:]
+        self.segments = self.segments[:i]
+        for sx, sy, sw in reste:
+            if sx + sw <= fin + 1e-9:
+                continue
+            if sx < fin:
+                sw -= fin - sx
+                sx = fin
+            nouveaux.append([sx, sy, sw])
+        # Fusion des segments voisins de même hauteur
+        for segment in nouveaux:
+            if self.segments and abs(self.segments[-1][1] - segment[1]) < 1e-9:
+                self.segments[-1][2] += segment[2]
+            else:
+                self.segments.append(segment)
+
+
+def calepiner(pieces, format_plaque=FORMATS_PLAQUES["Plateau PLF 6000 x 3210"], jeu=0.0, rognage=0.0,
+              rotation=True, methode="guillotine"):
+    """
+    Place les pièces (liste de Piece) sur autant de plaques que nécessaire.
+    jeu : espace entre pièces (trait de coupe), rognage : marge sur les bords de plaque.
+    """
+    largeur_utile = format_plaque[0] - 2 * rognage
+    hauteur_utile = format_plaque[1] - 2 * rognage
+    classe = _Etageres if methode == "guillotine" else _Skyline
+
+    # Plus grandes pièces d'abord (hauteur de la pièce couchée, puis surface)
+    def cle(k):
+        p = pieces[k]
+        return (min(p.largeur, p.hauteur) if rotation else p.hauteur, p.largeur * p.hauteur)
+    ordre = sorted(range(len(pieces)), key=cle, reverse=True)
+
+    plaques = []          # (numéro, plaque) des plaques encore ouvertes
+    nb_plaques = 0
+    placements, non_placees = [], []
+    for k in ordre:
+        p = pieces[k]
+        w, h = p.largeur + jeu, p.hauteur + jeu
+        place = None
+        for numero, plaque in plaques:
+            place = plaque.placer(w, h, rotation)
+            if place:
+                break
+        if place is None:
+            plaque = classe(largeur_utile + jeu, hauteur_utile + jeu)
+            place = plaque.placer(w, h, rotation)
+            if place is None:
+                non_placees.append(k)
+                continue
+            numero = nb_plaques
+            nb_plaques += 1
+            plaques.append((numero, plaque))
+            if len(plaques) > PLAQUES_OUVERTES:
+                plaques.pop(0)
+        x, y, pw, ph = place
+        placements.append(Placement(k, numero, rognage + x, rognage + y, pw - jeu, ph - jeu,
+                                    tournee=(pw, ph) != (w, h)))
+
+    placements.sort(key=lambda p: (p.plaque, p.y, p.x))
+    return Calepinage(pieces, placements, tuple(format_plaque), nb_plaques, non_placees)
+
+
+# --- Exports ---
+
+@instrumenter("DXF du calepinage (ezdxf)", taille=lambda calepinage, *args, **kwargs: len(calepinage.placements))
+def export_calepinage_dxf(calepinage, filename="calepinage.dxf", ecart=500):
+    """
+    Exporte les plaques côte à côte (espacées de `ecart` mm) : contour des plaques,
+    rectangles des pièces, formes réelles et références sur des calques séparés.
+    """
+    import ezdxf
+
+    doc = ezdxf.new()
+    for calque, couleur in (("PLAQUES", 7), ("RECTANGLES", 1), ("FORMES", 5), ("TEXTES", 3)):
+        doc.layers.add(calque, color=couleur)
+    msp = doc.modelspace()
+    lp, hp = calepinage.format_plaque
+
+    for placement in calepinage.placements:
+        dx = placement.plaque * (lp + ecart)
+        x, y = dx + placement.x, placement.y
+        msp.add_lwpolyline([(x, y), (x + placement.largeur, y), (x + placement.largeur, y + placement.hauteur),
+                            (x, y + placement.hauteur)], close=True, dxfattribs={"layer": "RECTANGLES"})
+        if calepinage.pieces[placement.piece].polygone is not None:
+            ajouter_contour(msp, calepinage.polygone_place(placement) + (dx, 0), dxfattribs={"layer": "FORMES"})
+        msp.add_text(calepinage.pieces[placement.piece].reference,
+                     dxfattribs={"layer": "TEXTES", "height": 30}).set_placement((x + 10, y + 10))
+
+    for plaque in range(calepinage.nb_plaques):
+        dx = plaque * (lp + ecart)
+        msp.add_lwpolyline([(dx, 0), (dx + lp, 0), (dx + lp, hp), (dx, hp)], close=True,
+                           dxfattribs={"layer": "PLAQUES"})
+        msp.add_text(f"Plaque {plaque + 1}", dxfattribs={"layer": "TEXTES", "height": 60}).set_placement(
+            (dx, hp + 40))
+
+    path = os.path.join(tempfile.gettempdir(), filename)
+    doc.saveas(path)
+    return path
+
+
+@instrumenter("PDF du calepinage (reportlab)", taille=lambda calepinage, *args, **kwargs: len(calepinage.placements))
+def export_calepinage_pdf(calepinage, titre="Calepinage", filename="calepinage.pdf"):
+    """Une page par plaque, dessin vectoriel à l'échelle de la page."""
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfgen import canvas
+
+    pdf_path = os.path.join(tempfile.gettempdir(), filename)
+    taille = landscape(A4)
+    c = canvas.Canvas(pdf_path, pagesize=taille)
+    width_pdf, height_pdf = taille
+    lp, hp = calepinage.format_plaque
+    marge = 40
+    echelle = min((width_pdf - 2 * marge) / lp, (height_pdf - 2 * marge - 40) / hp)
+
+    for plaque in range(calepinage.nb_plaques):
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(marge, height_pdf - marge, f"{titre} — plaque {plaque + 1} / {calepinage.nb_plaques} "
+                                                f"({lp} x {hp} mm)")
+        c.setFont("Helvetica", 9)
+        c.drawString(marge, height_pdf - marge - 15, f"Chute globale : {calepinage.taux_chute * 100:.1f} %")
+
+        c.saveState()
+        c.translate(marge, marge)
+        c.scale(echelle, echelle)
+        c.setLineWidth(1 / echelle)
+        c.rect(0, 0, lp, hp)
+        for placement in calepinage.placements_plaque(plaque):
+            c.setStrokeColorRGB(0.8, 0, 0)
+            c.rect(placement.x, placement.y, placement.largeur, placement.hauteur)
+            piece = calepinage.pieces[placement.piece]
+            if piece.polygone is not None:
+                chemin = c.beginPath()
+                forme = calepinage.polygone_place(placement)
+                chemin.moveTo(*forme[0])
+                for point in forme[1:]:
+                    chemin.lineTo(*point)
+                chemin.close()
+                c.setStrokeColorRGB(0, 0, 0.6)
+                c.drawPath(chemin, stroke=1, fill=0)
+            c.setFillColorRGB(0, 0, 0)
+            c.setFont("Helvetica", 8 / echelle)
+            c.drawString(placement.x + 4 / echelle, placement.y + 4 / echelle,
+                         f"{piece.reference} {round(piece.largeur)}x{round(piece.hauteur)}")
+        c.restoreState()
+        c.showPage()
+
+    c.save()
+    return pdf_path
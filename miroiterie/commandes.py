@@ -0,0 +1,311 @@
+"""
+Import de commandes : un tableur CSV ou XLSX, une pièce par ligne (forme,
+dimensions, référence...), traité sans interface.
+
+Le tableur est lu au fil de l'eau et découpé en paquets de lignes. Chaque paquet
+est validé puis calculé d'un bloc (miroiterie.formes, vectorisé) dans un
+processus séparé ; seuls quelques paquets sont en mémoire à la fois, quelle que
+soit la longueur de la commande. Les lignes ressortent dans l'ordre, annotées
+du rectangle englobant ou de l'erreur (avertissement si les mesures d'un
+quadrilatère admettent deux figures), avec sur demande un DXF et un PDF par
+ligne (archive zip ou dossier) :
+
+    python -m miroiterie.commandes commande.xlsx -o resultats.xlsx --pieces pieces.zip -j 8
+
+Colonnes reconnues (en-tête insensible à la casse) : « forme » (clé du registre
+ou libellé du menu : trapeze_isocele, « Trapèze isocèle »...), « reference »,
+« observation », « quantite » et les paramètres de la forme (base1, hauteur...).
+Les formes cintrées acceptent « h_base » à la place de « fleche » : la flèche est
+alors calculée depuis le milieu de la base, comme sur la page Forme cintrée.
+"""
+import argparse
+import csv
+import io
+import os
+import re
+import sys
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+
+import numpy as np
+
+from miroiterie import lot
+from miroiterie.dossier import PieceDossier, export_fiche
+from miroiterie.dxf_export import document_contour
+from miroiterie.formes import FORMES, TOLERANCE_FERMETURE, evaluer
+
+# Colonnes ajoutées à celles de la commande
+COLONNES_RESULTAT = ["largeur_mm", "hauteur_mm", "angle_deg", "ecart_fermeture_mm", "dxf", "pdf", "avertissement",
+                     "erreur"]
+
+# Lignes calculées d'un bloc par un processus
+TAILLE_PAQUET = 500
+
+# Formes d'après leur clé ou leur libellé de menu (en minuscules)
+_FORMES_PAR_NOM = {nom.lower(): f.cle for f in FORMES.values() for nom in (f.cle, f.nom)}
+
+
+@contextmanager
+def ouvrir_commande(chemin):
+    """
+    (colonnes, itérateur de lignes) d'un fichier .csv ou .xlsx, lu au fil de l'eau.
+    Chaque ligne est un dictionnaire colonne -> valeur brute. En CSV, le
+    séparateur (« ; » ou « , ») est déduit de l'en-tête.
+    """
+    if chemin.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        classeur = load_workbook(chemin, read_only=True, data_only=True)
+        try:
+            rangees = classeur.worksheets[0].iter_rows(values_only=True)
+            colonnes = ["" if c is None else str(c).strip() for c in next(rangees, ())]
+            yield colonnes, (dict(zip(colonnes, r)) for r in rangees if any(v not in (None, "") for v in r))
+        finally:
+            classeur.close()
+    else:
+        with open(chemin, newline="", encoding="utf-8-sig") as f:
+            entete = f.readline()
+            f.seek(0)
+            lecteur = csv.DictReader(f, delimiter=";" if entete.count(";") >= entete.count(",") else ",")
+            # En-têtes nettoyés avant la lecture des lignes : leurs clés sont alors les colonnes annoncées
+            lecteur.fieldnames = [c.strip() for c in lecteur.fieldnames or []]
+            yield lecteur.fieldnames, lecteur
+
+
+def _nombre(valeur):
+    """Nombre d'une cellule (« 1 250,5 » accepté) ; NaN si vide, None si illisible."""
+    if valeur is None or isinstance(valeur, (int, float)):
+        return np.nan if valeur is None else float(valeur)
+    texte = str(valeur).strip().replace("\u00a0", "").replace("\u202f", "").replace(" ", "").replace(",", ".")
+    if not texte:
+        return np.nan
+    try:
+        return float(texte)
+    except ValueError:
+        return None
+
+
+def _fleche_depuis_base(largeur, hg, hd, h_base):
+    """Flèche mesurée perpendiculairement à DC depuis le point situé h_base au-dessus du milieu de AB."""
+    corde = np.stack((largeur, hd - hg), axis=-1)
+    p = np.stack((largeur / 2, h_base - hg), axis=-1)
+    longueur2 = np.einsum("ij,ij->i", corde, corde)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.clip(np.einsum("ij,ij->i", p, corde) / longueur2, 0, 1)
+    return np.floor(np.hypot(*(p - t[:, None] * corde).T))
+
+
+def _nom_fichier(numero, reference, extension):
+    propre = re.sub(r"[^\w.-]+", "_", str(reference or "")).strip("_")
+    return f"{numero:06d}_{propre}.{extension}" if propre else f"{numero:06d}.{extension}"
+
+
+def _calculer_forme(cle, lignes, numeros, fichiers):
+    """Valide et calcule des lignes (champs en minuscules) d'une même forme ; annote et renvoie les fichiers."""
+    f = FORMES[cle]
+    n = len(lignes)
+    erreurs = np.full(n, "", dtype=object)
+    valeurs = {}
+    for p in f.parametres:
+        colonne = np.array([_nombre(ligne.get(p.nom)) for ligne in lignes], dtype=object)
+        illisibles = np.equal(colonne, None)
+        erreurs[illisibles & (erreurs == "")] = f"{p.nom} non numérique"
+        valeurs[p.nom] = np.where(illisibles, np.nan, colonne).astype(float)
+
+    if "fleche" in valeurs and any("h_base" in ligne for ligne in lignes):
+        h_base = np.array([_nombre(ligne.get("h_base")) for ligne in lignes], dtype=object)
+        h_base = np.where(np.equal(h_base, None), np.nan, h_base).astype(float)
+        depuis_base = np.isnan(valeurs["fleche"]) & np.isfinite(h_base)
+        if depuis_base.any():
+            valeurs["fleche"][depuis_base] = _fleche_depuis_base(
+                *(valeurs[nom][depuis_base] for nom in ("largeur", "hg", "hd")), h_base[depuis_base])
+
+    for p in f.parametres:
+        if not p.facultatif:
+            erreurs[np.isnan(valeurs[p.nom]) & (erreurs == "")] = f"{p.nom} manquant"
+    bornes = f.erreurs(valeurs)
+    erreurs = np.where(erreurs == "", bornes, erreurs)
+
+    valides = np.flatnonzero(erreurs == "")
+    resultats = [{"erreur": e} for e in erreurs]
+    depots = [{} for _ in range(n)]
+    if not len(valides):
+        return resultats, depots
+    formes = evaluer(cle, **{nom: v[valides] for nom, v in valeurs.items()})
+    fermees = formes.fermees
+    for j, i in enumerate(valides):
+        resultat = resultats[i]
+        if formes.ecarts is not None and np.isnan(formes.ecarts[j]):
+            resultat["erreur"] = "mesures insuffisantes ou liées : figure indéterminée"
+            continue
+        resultat.update(largeur_mm=round(float(formes.largeurs[j]), 2),
+                        hauteur_mm=round(float(formes.hauteurs[j]), 2),
+                        angle_deg=round(float(formes.angles[j]), 2))
+        if formes.ecarts is not None:
+            resultat["ecart_fermeture_mm"] = round(float(formes.ecarts[j]), 2)
+            if formes.convexes is not None and not formes.convexes[j] and formes.ecarts[j] < TOLERANCE_FERMETURE:
+                resultat["erreur"] = "aucune figure convexe ne vérifie les mesures"
+                continue
+            if not fermees[j]:
+                resultat["erreur"] = f"mesures incompatibles (écart de {formes.ecarts[j]:.2f} mm)"
+                continue
+        if formes.ambigues is not None and formes.ambigues[j]:
+            resultat["avertissement"] = "mesures ambiguës : une autre figure convexe les vérifie aussi"
+        if fichiers:
+            ligne = lignes[i]
+            reference, observation = str(ligne.get("reference") or ""), str(ligne.get("observation") or "")
+            points = [tuple(p) for p in formes.sommets[j].tolist()]
+            texte = io.StringIO()
+            document_contour(points, reference, observation).write(texte)
+            pdf = io.BytesIO()
+            quantite = _nombre(ligne.get("quantite"))
+            export_fiche(PieceDossier(
+                "cintree" if "fleche" in valeurs else "forme", reference, observation, points=points,
+                attributs=f.attributs({nom: round(float(v[i]), 2) for nom, v in valeurs.items()}),
+                quantite=int(quantite) if quantite is not None and np.isfinite(quantite) else 1,
+            ), pdf)
+            resultat["dxf"] = _nom_fichier(numeros[i], reference, "dxf")
+            resultat["pdf"] = _nom_fichier(numeros[i], reference, "pdf")
+            depots[i] = {resultat["dxf"]: texte.getvalue().encode("utf-8"), resultat["pdf"]: pdf.getvalue()}
+    return resultats, depots
+
+
+def traiter_paquet(premier, lignes, fichiers=False):
+    """
+    Calcule un paquet de lignes de commande (premier : numéro de sa première
+    ligne). Renvoie, dans l'ordre, des couples (ligne annotée, {nom: contenu})
+    où le dictionnaire contient le DXF et le PDF de la ligne si `fichiers`.
+    """
+    champs = [{str(k).strip().lower(): v for k, v in ligne.items() if k is not None} for ligne in lignes]
+    sorties = [(dict(ligne, **dict.fromkeys(COLONNES_RESULTAT, "")), {}) for ligne in lignes]
+    groupes = {}
+    for i, ligne in enumerate(champs):
+        nom = str(ligne.get("forme") or "").strip()
+        cle = _FORMES_PAR_NOM.get(nom.lower())
+        if cle is None:
+            sorties[i][0]["erreur"] = f"forme inconnue : {nom!r}" if nom else "forme manquante"
+        else:
+            groupes.setdefault(cle, []).append(i)
+
+    for cle, indices in groupes.items():
+        resultats, depots = _calculer_forme(cle, [champs[i] for i in indices],
+                                            [premier + i for i in indices], fichiers)
+        for i, resultat, depot in zip(indices, resultats, depots):
+            sorties[i][0].update(resultat)
+            sorties[i][1].update(depot)
+    return sorties
+
+
+def _traiter(args):
+    return traiter_paquet(*args)
+
+
+def executer_commande(lignes, processus=None, taille_paquet=TAILLE_PAQUET, fichiers=False, progression=None):
+    """
+    Traite les lignes par paquets dans un pool de processus et produit les
+    couples (ligne annotée, fichiers) dans l'ordre de la commande. Au plus
+    2 x processus paquets sont en cours ou en attente d'écriture.
+    progression(nb_lignes_traitees) est appelée après chaque paquet.
+    """
+    processus = processus or os.cpu_count() or 1
+    paquets = _paquets(iter(lignes), taille_paquet)
+    termines = 0
+
+    def livrer(sorties):
+        nonlocal termines
+        termines += len(sorties)
+        if progression:
+            progression(termines)
+        return sorties
+
+    if processus == 1:
+        for premier, paquet in paquets:
+            yield from livrer(traiter_paquet(premier, paquet, fichiers))
+        return
+    with ProcessPoolExecutor(max_workers=processus) as pool:
+        en_cours = deque()
+        for premier, paquet in paquets:
+            en_cours.append(pool.submit(_traiter, (premier, paquet, fichiers)))
+            if len(en_cours) >= 2 * processus:
+                yield from livrer(en_cours.popleft().result())
+        while en_cours:
+            yield from livrer(en_cours.popleft().result())
+
+
+def _paquets(lignes, taille):
+    """(numéro de la première ligne, liste de lignes) ; les lignes sont numérotées à partir de 1."""
+    premier = 1
+    while paquet := list(islice(lignes, taille)):
+        yield premier, paquet
+        premier += len(paquet)
+
+
+def deposer_fichiers(sorties, destination):
+    """
+    Écrit les fichiers de chaque ligne dans `destination` (archive .zip ou
+    dossier) au passage et ne laisse passer que les lignes annotées.
+    """
+    if destination.lower().endswith(".zip"):
+        with zipfile.ZipFile(destination, "w", zipfile.ZIP_DEFLATED) as archive:
+            for ligne, fichiers in sorties:
+                for nom, contenu in fichiers.items():
+                    archive.writestr(nom, contenu)
+                yield ligne
+    else:
+        os.makedirs(destination, exist_ok=True)
+        for ligne, fichiers in sorties:
+            for nom, contenu in fichiers.items():
+                with open(os.path.join(destination, nom), "wb") as f:
+                    f.write(contenu)
+            yield ligne
+
+
+def importer_commande(chemin, sortie, pieces=None, processus=None, taille_paquet=TAILLE_PAQUET, progression=None):
+    """
+    Lit la commande `chemin`, écrit le fichier de résultats `sortie` (.csv ou
+    .xlsx) et, si `pieces` est donné, un DXF et un PDF par ligne valide dans
+    cette archive zip ou ce dossier. Renvoie (nb de lignes, nb d'erreurs).
+    """
+    erreurs = 0
+    with ouvrir_commande(chemin) as (colonnes, lignes):
+        colonnes = colonnes + [c for c in COLONNES_RESULTAT if c not in colonnes]
+        sorties = executer_commande(lignes, processus, taille_paquet, pieces is not None, progression)
+        annotees = deposer_fichiers(sorties, pieces) if pieces is not None else (ligne for ligne, _ in sorties)
+
+        def compter(annotees):
+            nonlocal erreurs
+            for ligne in annotees:
+                erreurs += bool(ligne["erreur"])
+                yield ligne
+
+        if sortie.lower().endswith(".xlsx"):
+            nb = lot.ecrire_xlsx(compter(annotees), sortie, colonnes, "Commande")
+        else:
+            with open(sortie, "w", newline="", encoding="utf-8-sig") as f:
+                nb = lot.ecrire_csv(compter(annotees), f, colonnes)
+    return nb, erreurs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rectangles englobants d'une commande CSV / XLSX.")
+    parser.add_argument("commande", help="fichier .csv ou .xlsx, une pièce par ligne")
+    parser.add_argument("-o", "--sortie", help="résultats .csv ou .xlsx (défaut : <commande>_resultats)")
+    parser.add_argument("--pieces", help="archive .zip ou dossier recevant un DXF et un PDF par ligne")
+    parser.add_argument("-j", "--processus", type=int, default=None, help="nombre de processus (défaut : nb de cœurs)")
+    parser.add_argument("--paquet", type=int, default=TAILLE_PAQUET, help="lignes calculées d'un bloc")
+    args = parser.parse_args(argv)
+    base, extension = os.path.splitext(args.commande)
+    sortie = args.sortie or f"{base}_resultats{extension}"
+
+    def progression(n):
+        print(f"{n} ligne(s) traitée(s)", file=sys.stderr)
+
+    nb, erreurs = importer_commande(args.commande, sortie, args.pieces, args.processus, args.paquet, progression)
+    print(f"{nb} ligne(s), {erreurs} en erreur -> {sortie}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Reconstruction des contours fermés à partir d'entités DXF en vrac (LINE, ARC...).
+
+Les extrémités des entités ouvertes sont regroupées par cases de hachage de la
+taille de la tolérance, puis les entités sont chaînées de nœud en nœud jusqu'à
+refermer une boucle. Le coût est quasi linéaire en nombre d'entités.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+import shapely
+
+from miroiterie.instrumentation import instrumenter
+
+# Distance (unités du dessin) sous laquelle deux extrémités sont confondues
+TOLERANCE = 0.01
+
+
+@dataclass
+class Contours:
+    """Contour extérieur (le plus grand), ses trous et les chaînes restées ouvertes."""
+    exterieur: np.ndarray = None                     # (n, 2), premier sommet répété à la fin
+    trous: list = field(default_factory=list)
+    autres: list = field(default_factory=list)       # boucles hors du contour extérieur
+    ouverts: list = field(default_factory=list)
+
+
+def aire(boucle):
+    """Aire signée (formule du lacet)."""
+    x, y = boucle[:, 0], boucle[:, 1]
+    return 0.5 * float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]))
+
+
+def regrouper_extremites(points, tolerance=TOLERANCE):
+    """
+    Numéro de nœud de chaque point : deux points à moins de `tolerance`
+    (via les 9 cases voisines de la grille de hachage) partagent le même nœud.
+    """
+    cases = np.floor(points / tolerance).astype(np.int64)
+    parent = list(range(len(points)))
+
+    def racine(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    grille = {}
+    for i, (cx, cy) in enumerate(map(tuple, cases)):
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j in grille.get((cx + dx, cy + dy), ()):
+                    if abs(points[i, 0] - points[j, 0]) <= tolerance and abs(points[i, 1] - points[j, 1]) <= tolerance:
+                        parent[racine(i)] = racine(j)
+        grille.setdefault((cx, cy), []).append(i)
+
+    racines = np.array([racine(i) for i in range(len(points))], dtype=np.int64)
+    return np.unique(racines, return_inverse=True)[1]
+
+
+def chainer(chaines, tolerance=TOLERANCE):
+    """
+    Relie des chaînes ouvertes (tableaux (n, 2)) bout à bout.
+    Renvoie (boucles fermées, chaînes restées ouvertes).
+    """
+    if not chaines:
+        return [], []
+    extremites = np.array([(c[0], c[-1]) for c in chaines]).reshape(-1, 2)
+    noeuds = regrouper_extremites(extremites, tolerance).reshape(-1, 2)
+
+    adjacence = {}
+    for k, (a, b) in enumerate(noeuds):
+        adjacence.setdefault(a, []).append(k)
+        adjacence.setdefault(b, []).append(k)
+
+    utilisee = np.zeros(len(chaines), dtype=bool)
+    boucles, ouverts = [], []
+    for k in range(len(chaines)):
+        if utilisee[k]:
+            continue
+        utilisee[k] = True
+        depart, courant = noeuds[k]
+        morceaux = [chaines[k]]
+        while courant != depart:
+            suivante = None
+            pile = adjacence[courant]
+            while pile:
+                candidate = pile.pop()
+                if not utilisee[candidate]:
+                    suivante = candidate
+                    break
+            if suivante is None:
+                break
+            utilisee[suivante] = True
+            if noeuds[suivante, 0] == courant:
+                morceaux.append(chaines[suivante][1:])
+                courant = noeuds[suivante, 1]
+            else:
+                morceaux.append(chaines[suivante][::-1][1:])
+                courant = noeuds[suivante, 0]
+
+        chemin = np.concatenate(morceaux)
+        if courant == depart:
+            chemin[-1] = chemin[0]  # fermeture exacte malgré la tolérance
+            boucles.append(chemin)
+        else:
+            ouverts.append(chemin)
+    return boucles, ouverts
+
+
+@instrumenter("contours fermés", taille=lambda geometrie, *args, **kwargs: len(geometrie))
+def reconstruire_contours(geometrie, tolerance=TOLERANCE):
+    """
+    Construit les boucles fermées d'une GeometrieDXF et les classe en
+    contour extérieur (plus grande aire), trous et boucles isolées.
+    """
+    boucles, chaines = [], []
+    for i in range(len(geometrie)):
+        pts = geometrie.sommets_entite(i)
+        if len(pts) < 2:
+            continue
+        if geometrie.fermees[i] or np.all(np.abs(pts[0] - pts[-1]) <= tolerance):
+            if len(pts) >= 4:
+                boucles.append(pts)
+        else:
+            chaines.append(pts)
+
+    fermees, ouverts = chainer(chaines, tolerance)
+    boucles.extend(fermees)
+    aires = np.array([abs(aire(b)) for b in boucles])
+    garde = aires > tolerance * tolerance
+    boucles = [b for b, g in zip(boucles, garde) if g]
+    if not boucles:
+        return Contours(ouverts=ouverts)
+
+    aires = aires[garde]
+    i_ext = int(np.argmax(aires))
+    exterieur = boucles[i_ext]
+    polygone = shapely.Polygon(exterieur)
+    shapely.prepare(polygone)
+    autres_boucles = [b for i, b in enumerate(boucles) if i != i_ext]
+    premiers = np.array([b[0] for b in autres_boucles]).reshape(-1, 2)
+    dedans = shapely.contains_xy(polygone, premiers[:, 0], premiers[:, 1])
+
+    return Contours(
+        exterieur=exterieur,
+        trous=[b for b, d in zip(autres_boucles, dedans) if d],
+        autres=[b for b, d in zip(autres_boucles, dedans) if not d],
+        ouverts=ouverts,
+    )
+
+
+def enveloppe_convexe(points):
+    """Sommets de l'enveloppe convexe (sans répétition du premier)."""
+    enveloppe = shapely.MultiPoint(np.asarray(points, dtype=float)).convex_hull
+    if enveloppe.geom_type != "Polygon":
+        return [tuple(p) for p in np.asarray(points, dtype=float)]
+    return list(enveloppe.exterior.coords)[:-1]
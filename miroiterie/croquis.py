@@ -0,0 +1,248 @@
+"""
+Croquis vectoriel des tôles pliées : section du profil, cotes et laquage.
+
+La géométrie vient de `profils.ligne_profil` (cotes réelles, plis signés) et
+est mise à l'échelle de la zone de dessin, quelle que soit la taille du
+profil. Elle ne dépend que de la forme, des cotes et du laquage : chaque
+croquis est calculé une fois par clé (forme, dimensions, laquage) et gardé
+dans un cache LRU partagé par les sessions, de même que son SVG.
+
+Rendus : SVG pour l'écran, tracé natif fpdf (bon de commande) et reportlab
+(dossier), image PIL pour les miniatures enregistrées en base. Aucun rendu
+ne passe par un fichier.
+"""
+import html
+import math
+from dataclasses import dataclass, field
+
+from miroiterie.cache import CacheLRU
+from miroiterie.profils import PROFILS, ligne_profil
+
+# Nombre de croquis (et de SVG) gardés en mémoire
+MAX_CROQUIS = 256
+
+# Couleurs (RVB 0-255) : profil, cotes, laquage
+COULEUR_TRAIT = (0, 0, 0)
+COULEUR_COTE = (0, 0, 0)
+COULEUR_LAQUAGE = (200, 0, 0)
+
+_cache = CacheLRU(MAX_CROQUIS)
+
+
+@dataclass
+class Croquis:
+    sommets: list                               # section en arêtes vives (mm, y vers le haut)
+    cotes: list = field(default_factory=list)   # (x, y, nx, ny, texte) : milieu d'aile, normale vers l'extérieur
+    legende: str = ""                           # laquage, écrit en rouge en bas à gauche
+
+
+def cle_croquis(tole):
+    """Clé du cache : (forme, dimensions triées, laquage)."""
+    dimensions = tuple(sorted((nom, float(valeur)) for nom, valeur in tole["dimensions"].items()))
+    return tole["forme"], dimensions, tole.get("laquage", "")
+
+
+def _texte_cote(valeur):
+    return f"{valeur:g}"
+
+
+def _construire(forme, dimensions, laquage):
+    try:
+        sommets = ligne_profil(forme, dimensions)
+    except ValueError:
+        return Croquis([], [], f"{forme} - {laquage}" if laquage else forme)
+
+    # Les cotes sont écrites du côté opposé au centre du profil (au-dessus pour un profil plat)
+    cx = sum(x for x, _ in sommets) / len(sommets)
+    cy = sum(y for _, y in sommets) / len(sommets)
+    cotes = []
+    for nom, (x0, y0), (x1, y1) in zip(PROFILS[forme].cotes, sommets, sommets[1:]):
+        longueur = math.hypot(x1 - x0, y1 - y0) or 1.0
+        nx, ny = -(y1 - y0) / longueur, (x1 - x0) / longueur
+        mx, my = (x0 + x1) / 2, (y0 + y1) / 2
+        if (mx - cx) * nx + (my - cy) * ny < -1e-9:
+            nx, ny = -nx, -ny
+        cotes.append((mx, my, nx, ny, f"{nom}={_texte_cote(dimensions[nom])}"))
+    return Croquis(sommets, cotes, laquage)
+
+
+def croquis(tole):
+    """Croquis d'une tôle (dictionnaire de la page « Commande de Tôles »), depuis le cache."""
+    cle = cle_croquis(tole)
+    resultat = _cache.get(("croquis", cle))
+    if resultat is None:
+        forme, dimensions, laquage = cle
+        resultat = _construire(forme, dict(dimensions), laquage)
+        _cache.put(("croquis", cle), resultat)
+    return resultat
+
+
+def vider_cache():
+    _cache.clear()
+
+
+def mise_en_page(cr, largeur, hauteur, taille_texte, largeur_texte=None):
+    """
+    Croquis placé dans une zone (largeur x hauteur, unités de sortie, y vers
+    le bas), centré et à l'échelle la plus grande qui laisse la place des
+    cotes et de la légende. Renvoie (traits, textes, legende) : traits =
+    sommets de la section ; textes = (x, y, texte, ancre_h, ancre_v), ancre
+    « gauche », « centre » ou « droite » et « haut », « milieu » ou « bas » ;
+    legende = (x, y) du bas à gauche de la légende.
+    largeur_texte : fonction texte -> largeur ; par défaut 0,55 x taille par caractère.
+    """
+    if largeur_texte is None:
+        def largeur_texte(texte):
+            return 0.55 * taille_texte * len(texte)
+
+    ecart = 0.4 * taille_texte
+    legende = (ecart, hauteur - ecart)
+    if not cr.sommets:
+        return [], [], legende
+
+    # Place des cotes : la plus longue écrite sur le côté, une ligne de texte au-dessus ou au-dessous
+    marge_x = max((largeur_texte(c[4]) for c in cr.cotes if abs(c[2]) > 0.5), default=0) + 2 * ecart
+    marge_y = taille_texte + 2 * ecart if any(abs(c[3]) > 0.5 for c in cr.cotes) else 2 * ecart
+    utile_l = max(largeur - 2 * marge_x, largeur * 0.2)
+    utile_h = max(hauteur - 2 * marge_y - (taille_texte + ecart if cr.legende else 0), hauteur * 0.2)
+
+    xs = [x for x, _ in cr.sommets]
+    ys = [y for _, y in cr.sommets]
+    etendue_x, etendue_y = max(xs) - min(xs), max(ys) - min(ys)
+    echelles = [e for e in (utile_l / etendue_x if etendue_x > 1e-9 else None,
+                            utile_h / etendue_y if etendue_y > 1e-9 else None) if e is not None]
+    echelle = min(echelles) if echelles else 1.0
+    # Centrage dans la zone au-dessus de la légende
+    haut_utile = hauteur - (taille_texte + ecart if cr.legende else 0)
+    ox = (largeur - etendue_x * echelle) / 2 - min(xs) * echelle
+    oy = (haut_utile + etendue_y * echelle) / 2 + min(ys) * echelle
+
+    def placer(x, y):
+        return ox + x * echelle, oy - y * echelle
+
+    traits = [placer(x, y) for x, y in cr.sommets]
+    textes = []
+    for mx, my, nx, ny, texte in cr.cotes:
+        x, y = placer(mx, my)
+        # Normale en coordonnées de sortie (y vers le bas)
+        x, y = x + nx * ecart, y - ny * ecart
+        ancre_h = "gauche" if nx > 0.5 else "droite" if nx < -0.5 else "centre"
+        ancre_v = "bas" if ny > 0.5 else "haut" if ny < -0.5 else "milieu"
+        textes.append((x, y, texte, ancre_h, ancre_v))
+    return traits, textes, legende
+
+
+def _hexa(couleur):
+    return "#%02x%02x%02x" % couleur
+
+
+def svg(tole, largeur=300, hauteur=200, taille_texte=12):
+    """Croquis SVG (texte) d'une tôle, depuis le cache."""
+    cle = ("svg", cle_croquis(tole), largeur, hauteur, taille_texte)
+    resultat = _cache.get(cle)
+    if resultat is not None:
+        return resultat
+    cr = croquis(tole)
+    traits, textes, (lx, ly) = mise_en_page(cr, largeur, hauteur, taille_texte)
+    ancres_h = {"gauche": "start", "centre": "middle", "droite": "end"}
+    # Décalage vertical de la ligne de base, faute de dominant-baseline fiable partout
+    decalages = {"bas": 0.0, "milieu": 0.35 * taille_texte, "haut": 0.8 * taille_texte}
+    morceaux = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{largeur}" height="{hauteur}" '
+                f'viewBox="0 0 {largeur} {hauteur}" font-family="Helvetica, Arial, sans-serif" '
+                f'font-size="{taille_texte}">',
+                f'<rect width="{largeur}" height="{hauteur}" fill="white"/>']
+    if traits:
+        points = " ".join(f"{x:.2f},{y:.2f}" for x, y in traits)
+        morceaux.append(f'<polyline points="{points}" fill="none" stroke="{_hexa(COULEUR_TRAIT)}" '
+                        f'stroke-width="2" stroke-linejoin="miter"/>')
+    for x, y, texte, ancre_h, ancre_v in textes:
+        morceaux.append(f'<text x="{x:.2f}" y="{y + decalages[ancre_v]:.2f}" text-anchor="{ancres_h[ancre_h]}" '
+                        f'fill="{_hexa(COULEUR_COTE)}">{html.escape(texte)}</text>')
+    if cr.legende:
+        morceaux.append(f'<text x="{lx:.2f}" y="{ly:.2f}" fill="{_hexa(COULEUR_LAQUAGE)}">'
+                        f'{html.escape(cr.legende)}</text>')
+    morceaux.append("</svg>")
+    resultat = "\n".join(morceaux)
+    _cache.put(cle, resultat)
+    return resultat
+
+
+def _origine_texte(x, y, largeur, hauteur, ancre_h, ancre_v):
+    """Coin haut gauche d'un texte de largeur x hauteur ancré en (x, y), y vers le bas."""
+    x -= {"gauche": 0.0, "centre": largeur / 2, "droite": largeur}[ancre_h]
+    y -= {"haut": 0.0, "milieu": hauteur / 2, "bas": hauteur}[ancre_v]
+    return x, y
+
+
+def dessiner_fpdf(pdf, tole, x, y, largeur, hauteur, taille_police=9):
+    """Trace le croquis sur la page fpdf courante, dans la zone (x, y, largeur, hauteur) en mm (y vers le bas)."""
+    cr = croquis(tole)
+    taille = taille_police * 25.4 / 72
+    pdf.set_font("Arial", size=taille_police)
+    traits, textes, (lx, ly) = mise_en_page(cr, largeur, hauteur, taille, pdf.get_string_width)
+    if traits:
+        pdf.set_draw_color(*COULEUR_TRAIT)
+        pdf.set_line_width(0.5)
+        pdf.polyline([(x + px, y + py) for px, py in traits])
+    pdf.set_text_color(*COULEUR_COTE)
+    for tx, ty, texte, ancre_h, ancre_v in textes:
+        gx, gy = _origine_texte(tx, ty, pdf.get_string_width(texte), taille, ancre_h, ancre_v)
+        # fpdf.text écrit sur la ligne de base
+        pdf.text(x + gx, y + gy + 0.8 * taille, texte)
+    if cr.legende:
+        pdf.set_text_color(*COULEUR_LAQUAGE)
+        pdf.text(x + lx, y + ly, cr.legende)
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_draw_color(0, 0, 0)
+
+
+def dessiner_reportlab(c, tole, zone, taille_police=9):
+    """Trace le croquis sur le canvas reportlab, dans `zone` (x, y, largeur, hauteur en points PDF, y vers le haut)."""
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    cr = croquis(tole)
+    zx, zy, zl, zh = zone
+
+    def largeur_texte(texte):
+        return stringWidth(texte, "Helvetica", taille_police)
+
+    traits, textes, (lx, ly) = mise_en_page(cr, zl, zh, taille_police, largeur_texte)
+    c.saveState()
+    if traits:
+        c.setLineWidth(1.2)
+        c.setStrokeColorRGB(*(v / 255 for v in COULEUR_TRAIT))
+        chemin = c.beginPath()
+        chemin.moveTo(zx + traits[0][0], zy + zh - traits[0][1])
+        for px, py in traits[1:]:
+            chemin.lineTo(zx + px, zy + zh - py)
+        c.drawPath(chemin, stroke=1, fill=0)
+    c.setFont("Helvetica", taille_police)
+    c.setFillColorRGB(*(v / 255 for v in COULEUR_COTE))
+    for tx, ty, texte, ancre_h, ancre_v in textes:
+        gx, gy = _origine_texte(tx, ty, largeur_texte(texte), taille_police, ancre_h, ancre_v)
+        c.drawString(zx + gx, zy + zh - gy - 0.8 * taille_police, texte)
+    if cr.legende:
+        c.setFillColorRGB(*(v / 255 for v in COULEUR_LAQUAGE))
+        c.drawString(zx + lx, zy + zh - ly, cr.legende)
+    c.restoreState()
+
+
+def image(tole, largeur=300, hauteur=200):
+    """Croquis en image PIL (miniatures enregistrées en base)."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    cr = croquis(tole)
+    img = Image.new("RGB", (largeur, hauteur), "white")
+    draw = ImageDraw.Draw(img)
+    police = ImageFont.load_default()
+    taille = draw.textbbox((0, 0), "Ag", font=police)[3]
+    traits, textes, (lx, ly) = mise_en_page(cr, largeur, hauteur, taille,
+                                            lambda texte: draw.textlength(texte, font=police))
+    if len(traits) > 1:
+        draw.line(traits, fill=COULEUR_TRAIT, width=2)
+    for tx, ty, texte, ancre_h, ancre_v in textes:
+        gx, gy = _origine_texte(tx, ty, draw.textlength(texte, font=police), taille, ancre_h, ancre_v)
+        draw.text((gx, gy), texte, fill=COULEUR_COTE, font=police)
+    if cr.legende:
+        draw.text((lx, ly - taille), cr.legende, fill=COULEUR_LAQUAGE, font=police)
+    return img
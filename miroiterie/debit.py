@@ -0,0 +1,240 @@
+"""
+Débit des tôles : bandes de longueur standard coupées à la largeur
+développée, puis recoupées à la longueur des pièces (découpe 1D).
+
+Les pièces ne partagent une bande que si elles ont le même métal, la même
+épaisseur, la même teinte (coloris, laquage, finition) et la même largeur
+développée. Pour chaque groupe :
+  - first-fit decreasing : pièces de la plus longue à la plus courte, chacune
+    dans la première bande où elle tient (arbre des places libres, en
+    O(n log n)), chaque bande étant ramenée ensuite à la plus courte longueur
+    standard qui la contient ;
+  - petits groupes (au plus EXACT_MAX pièces) : séparation et évaluation
+    exacte, qui minimise la longueur totale de bandes, dans la limite de
+    NOEUDS_MAX nœuds (au-delà, la meilleure solution trouvée est gardée).
+"""
+from dataclasses import dataclass, field
+
+from miroiterie.instrumentation import instrumenter
+from miroiterie.profils import developper
+
+# Longueurs de bandes disponibles (mm) : formats de tôles courants
+LONGUEURS_STANDARD = (2000, 2500, 3000, 4000)
+
+# Taille maximale d'un groupe résolu exactement
+EXACT_MAX = 16
+
+# Nombre maximal de nœuds explorés par la recherche exacte d'un groupe
+NOEUDS_MAX = 20_000
+
+# Arrondi de la largeur développée pour regrouper les pièces (mm)
+PAS_LARGEUR = 0.1
+
+
+@dataclass
+class Bande:
+    longueur: float             # longueur standard de la bande (mm)
+    pieces: list                # indices des pièces (dans Debit.pieces), dans l'ordre de coupe
+    utilisee: float             # longueur des pièces et des traits de coupe (mm)
+
+    @property
+    def chute(self):
+        return self.longueur - self.utilisee
+
+
+@dataclass
+class GroupeDebit:
+    cle: tuple                  # (metal, épaisseur mm, coloris, laquage, finition, largeur développée)
+    largeur: float
+    bandes: list
+    optimal: bool               # solution prouvée optimale (recherche exacte complète)
+
+    @property
+    def longueur_bandes(self):
+        return sum(b.longueur for b in self.bandes)
+
+    @property
+    def taux_chute(self):
+        total = self.longueur_bandes
+        return sum(b.chute for b in self.bandes) / total if total else 0.0
+
+
+@dataclass
+class Debit:
+    pieces: list                # (indice de la tôle, longueur) de chaque pièce, quantités développées
+    groupes: list
+    non_placees: list = field(default_factory=list)   # pièces plus longues que la plus longue bande
+    erreurs: dict = field(default_factory=dict)       # indice de la tôle -> message (développé impossible)
+    poids: float = 0.0                                # kg, toutes pièces calculables
+
+    @property
+    def taux_chute(self):
+        total = sum(g.longueur_bandes * g.largeur for g in self.groupes)
+        return sum(g.taux_chute * g.longueur_bandes * g.largeur for g in self.groupes) / total if total else 0.0
+
+
+class _ArbrePlaces:
+    """Arbre des maxima des places libres : première bande où tient une longueur en O(log n)."""
+
+    def __init__(self, capacite_max, nb_max):
+        self.taille = 1
+        while self.taille < max(nb_max, 1):
+            self.taille *= 2
+        self.capacite_max = capacite_max
+        self.libre = [0.0] * (2 * self.taille)
+        self.nb = 0
+
+    def _fixer(self, i, valeur):
+        i += self.taille
+        self.libre[i] = valeur
+        i //= 2
+        while i:
+            self.libre[i] = max(self.libre[2 * i], self.libre[2 * i + 1])
+            i //= 2
+
+    def placer(self, longueur):
+        """Indice de la première bande ouverte où la longueur tient (une nouvelle bande sinon)."""
+        if self.libre[1] + 1e-9 < longueur:
+            i = self.nb
+            self.nb += 1
+            self._fixer(i, self.capacite_max - longueur)
+            return i
+        i = 1
+        while i < self.taille:
+            i = 2 * i if self.libre[2 * i] + 1e-9 >= longueur else 2 * i + 1
+        self._fixer(i - self.taille, self.libre[i] - longueur)
+        return i - self.taille
+
+
+def _longueur_standard(utilisee, longueurs, trait):
+    """Plus courte longueur standard qui contient `utilisee` (le dernier trait de coupe tombe en bout de bande)."""
+    return next(l for l in longueurs if utilisee <= l + trait + 1e-9)
+
+
+def first_fit_decreasing(longueurs_pieces, longueurs=LONGUEURS_STANDARD, trait=0.0):
+    """
+    Bandes (liste de Bande, indices dans longueurs_pieces) ; les pièces plus
+    longues que la plus longue bande sont ignorées.
+    """
+    longueurs = sorted(longueurs)
+    capacite = longueurs[-1] + trait
+    ordre = sorted((k for k, l in enumerate(longueurs_pieces) if l + trait <= capacite + 1e-9),
+                   key=lambda k: -longueurs_pieces[k])
+    arbre = _ArbrePlaces(capacite, len(ordre))
+    contenus, utilisees = [], []
+    for k in ordre:
+        taille = longueurs_pieces[k] + trait
+        i = arbre.placer(taille)
+        if i == len(contenus):
+            contenus.append([])
+            utilisees.append(0.0)
+        contenus[i].append(k)
+        utilisees[i] += taille
+    return [Bande(_longueur_standard(u, longueurs, trait), c, u) for c, u in zip(contenus, utilisees)]
+
+
+def debit_exact(longueurs_pieces, longueurs=LONGUEURS_STANDARD, trait=0.0, noeuds_max=NOEUDS_MAX):
+    """
+    Bandes de longueur totale minimale, par séparation et évaluation ; renvoie
+    (bandes, optimal). La solution first-fit decreasing sert de borne de départ.
+    """
+    longueurs = sorted(longueurs)
+    meilleures = first_fit_decreasing(longueurs_pieces, longueurs, trait)
+    meilleur_cout = sum(b.longueur for b in meilleures)
+    capacites = [l + trait for l in longueurs]
+    ordre = sorted((k for k, l in enumerate(longueurs_pieces) if l + trait <= capacites[-1] + 1e-9),
+                   key=lambda k: -longueurs_pieces[k])
+    tailles = [longueurs_pieces[k] + trait for k in ordre]
+    restes = [sum(tailles[i:]) for i in range(len(tailles) + 1)]
+    # Une longueur de pièce coûte au moins ce rapport en longueur de bande
+    rapport = min(l / c for l, c in zip(longueurs, capacites))
+
+    def niveau(utilisee):
+        """(longueur standard, capacité) du plus petit format qui contient `utilisee`."""
+        for l, c in zip(longueurs, capacites):
+            if utilisee <= c + 1e-9:
+                return l, c
+
+    contenus, utilisees = [], []
+    etat = {"noeuds": 0, "complet": True, "meilleur": meilleur_cout, "solution": None}
+
+    def chercher(i):
+        etat["noeuds"] += 1
+        if etat["noeuds"] > noeuds_max:
+            etat["complet"] = False
+            return
+        cout, marge = 0.0, 0.0
+        for u in utilisees:
+            l, c = niveau(u)
+            cout += l
+            marge += c - u
+        if cout + rapport * max(0.0, restes[i] - marge) >= etat["meilleur"] - 1e-9:
+            return
+        if i == len(tailles):
+            etat["meilleur"] = cout
+            etat["solution"] = [list(c) for c in contenus], list(utilisees)
+            return
+        taille = tailles[i]
+        essayees = set()
+        for j, u in enumerate(utilisees):
+            # Deux bandes au même remplissage donnent le même sous-arbre
+            if u + taille <= capacites[-1] + 1e-9 and round(u, 6) not in essayees:
+                essayees.add(round(u, 6))
+                contenus[j].append(ordre[i])
+                utilisees[j] += taille
+                chercher(i + 1)
+                utilisees[j] -= taille
+                contenus[j].pop()
+        contenus.append([ordre[i]])
+        utilisees.append(taille)
+        chercher(i + 1)
+        utilisees.pop()
+        contenus.pop()
+
+    chercher(0)
+    if etat["solution"] is None:
+        return meilleures, etat["complet"]
+    contenus, utilisees = etat["solution"]
+    return [Bande(niveau(u)[0], c, u) for c, u in zip(contenus, utilisees)], etat["complet"]
+
+
+def _teinte(tole):
+    return (tole.get("coloris", ""), tole.get("laquage", ""), tole.get("finition", ""), tole.get("note_finition", ""))
+
+
+@instrumenter("débit des tôles", taille=lambda toles, *args, **kwargs: len(toles))
+def debiter(toles, longueurs=LONGUEURS_STANDARD, trait=0.0, exact_max=EXACT_MAX):
+    """
+    Débit d'une liste de tôles (dictionnaires de la page « Commande de
+    Tôles », quantités comprises) sur des bandes de longueurs standard.
+    """
+    longueurs = sorted(longueurs)
+    pieces, groupes_pieces, erreurs, poids = [], {}, {}, 0.0
+    for t, tole in enumerate(toles):
+        try:
+            developpe = developper(tole)
+        except ValueError as e:
+            erreurs[t] = str(e)
+            continue
+        quantite = int(tole.get("quantite") or 1)
+        poids += (developpe.poids or 0.0) * quantite
+        largeur = round(developpe.largeur / PAS_LARGEUR) * PAS_LARGEUR
+        cle = (tole.get("metal", ""), developpe.epaisseur, *_teinte(tole), round(largeur, 1))
+        indices = groupes_pieces.setdefault(cle, [])
+        for _ in range(quantite):
+            indices.append(len(pieces))
+            pieces.append((t, float(tole["longueur"])))
+
+    groupes, non_placees = [], []
+    for cle, indices in groupes_pieces.items():
+        longueurs_groupe = [pieces[k][1] for k in indices]
+        if len(indices) <= exact_max:
+            bandes, optimal = debit_exact(longueurs_groupe, longueurs, trait)
+        else:
+            bandes, optimal = first_fit_decreasing(longueurs_groupe, longueurs, trait), False
+        for bande in bandes:
+            bande.pieces = [indices[k] for k in bande.pieces]
+        placees = {k for bande in bandes for k in bande.pieces}
+        non_placees.extend(k for k in indices if k not in placees)
+        groupes.append(GroupeDebit(cle, cle[-1], bandes, optimal))
+    return Debit(pieces, groupes, non_placees, erreurs, poids)
@@ -0,0 +1,188 @@
+"""
+Dossier PDF d'un chantier : toutes les pièces (formes, formes cintrées, tôles)
+dans un seul document, précédé d'un tableau récapitulatif.
+
+Chaque page est préparée (rectangle englobant, lignes de texte...) puis écrite
+dans le PDF aussitôt, dans l'ordre des pièces : une seule page préparée reste
+en mémoire, et les pages sont des tracés vectoriels de quelques Ko, ce qui
+garde un dossier de 500 pages léger. La préparation ne coûte que quelques
+microsecondes par pièce : tout se fait dans le processus appelant, un pool de
+processus n'y ajouterait que son démarrage et la sérialisation des pièces.
+Le récapitulatif est placé en tête grâce à des formes PDF référencées sur les
+premières pages et remplies une fois toutes les pièces traitées.
+
+reportlab et la géométrie (shapely) ne sont importés qu'à l'écriture du PDF :
+la page « Commande de Tôles » et le stockage, qui n'utilisent que
+PieceDossier, n'en paient pas le chargement.
+"""
+import math
+import os
+import tempfile
+from dataclasses import dataclass, field
+
+from miroiterie.instrumentation import instrumenter
+from miroiterie.toles import description_tole
+
+TYPES_PIECES = {"forme": "Forme", "cintree": "Forme cintrée", "tole": "Tôle"}
+
+# Lignes du tableau récapitulatif par page
+LIGNES_RECAP = 40
+
+# Colonnes du récapitulatif : (titre, abscisse en points PDF)
+COLONNES_RECAP = [("N°", 40), ("Type", 70), ("Référence", 150), ("Dimensions", 330), ("Qté", 510)]
+
+
+@dataclass
+class PieceDossier:
+    type: str                           # "forme", "cintree" ou "tole"
+    reference: str = ""
+    observation: str = ""
+    points: list = None                 # contour de la forme (formes et formes cintrées)
+    attributs: dict = field(default_factory=dict)
+    fleche: list = None                 # segment [P1, P2] de la flèche (forme cintrée)
+    tole: dict = None                   # ligne de commande (tôles)
+    quantite: int = 1
+
+
+def preparer_page(piece):
+    """
+    Contenu d'une page (données simples) :
+    titre, lignes de texte, géométrie à tracer ou tôle à croquer, ligne du récapitulatif.
+    """
+    titre = f"{TYPES_PIECES[piece.type]} {piece.reference}".strip()
+    lignes = []
+    if piece.observation:
+        lignes.append(f"Observation : {piece.observation}")
+    page = {"titre": titre, "lignes": lignes, "points": None, "rect": None, "fleche": None, "tole": None}
+
+    if piece.type == "tole":
+        tole = piece.tole
+        lignes.extend(description_tole(tole))
+        page["tole"] = tole
+        dimensions = f"L {tole['longueur']} mm, {tole['metal']} {tole['epaisseur']}"
+        quantite = tole["quantite"]
+    else:
+        from miroiterie.rectangle import dimensions_rectangle, minimum_bounding_rectangle
+
+        points = [tuple(map(float, p)) for p in piece.points]
+        rect = minimum_bounding_rectangle(points)
+        largeur, hauteur = dimensions_rectangle(rect)
+        lignes.extend(f"{cle} : {valeur}" for cle, valeur in piece.attributs.items())
+        lignes.append(f"Largeur rectangle englobant : {round(largeur, 2)} mm")
+        lignes.append(f"Hauteur rectangle englobant : {round(hauteur, 2)} mm")
+        page.update(points=points, rect=[tuple(p) for p in rect], fleche=piece.fleche)
+        dimensions = f"{round(largeur, 2)} x {round(hauteur, 2)} mm"
+        quantite = piece.quantite
+
+    page["recap"] = (TYPES_PIECES[piece.type], piece.reference, dimensions, quantite)
+    return page
+
+
+def _pied_de_page(c, numero, total):
+    from reportlab.lib.pagesizes import A4
+
+    c.setFont("Helvetica", 8)
+    c.drawRightString(A4[0] - 40, 25, f"Page {numero} / {total}")
+
+
+def _ecrire_page(c, page):
+    from reportlab.lib.pagesizes import A4
+
+    from miroiterie.croquis import dessiner_reportlab
+    from miroiterie.fiche_pdf import dessiner_forme
+
+    y = A4[1] - 40
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(40, y, page["titre"])
+    y -= 25
+    c.setFont("Helvetica", 10)
+    for ligne in page["lignes"]:
+        c.drawString(40, y, ligne)
+        y -= 15
+
+    if page["tole"] is not None:
+        dessiner_reportlab(c, page["tole"], (40, y - 220, 300, 200))
+    elif page["points"]:
+        dessiner_forme(c, page["points"], page["rect"], (80, 100, 450, min(300, y - 140)), fleche=page["fleche"])
+
+
+def _ecrire_recapitulatif(c, lignes, titre, chantier, nb_pages_recap):
+    """Remplit les formes « recap{k} » appelées sur les premières pages."""
+    from reportlab.lib.pagesizes import A4
+
+    for k in range(nb_pages_recap):
+        c.beginForm(f"recap{k}")
+        y = A4[1] - 40
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(40, y, titre)
+        y -= 18
+        c.setFont("Helvetica", 10)
+        if chantier:
+            c.drawString(40, y, f"Référence chantier : {chantier}")
+            y -= 15
+        c.drawString(40, y, f"{len(lignes)} pièce(s)")
+        y -= 25
+        c.setFont("Helvetica-Bold", 9)
+        for nom, x in COLONNES_RECAP:
+            c.drawString(x, y, nom)
+        c.line(40, y - 4, A4[0] - 40, y - 4)
+        y -= 16
+        c.setFont("Helvetica", 9)
+        for numero, ligne in enumerate(lignes[k * LIGNES_RECAP:(k + 1) * LIGNES_RECAP], start=k * LIGNES_RECAP + 1):
+            for valeur, (_, x) in zip((numero, *ligne), COLONNES_RECAP):
+                c.drawString(x, y, str(valeur)[:40])
+            y -= 15
+        c.endForm()
+
+
+@instrumenter("fiche PDF (reportlab)")
+def export_fiche(piece, fichier):
+    """Fiche d'une seule pièce, sans récapitulatif, dans `fichier` (chemin ou flux binaire)."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(fichier, pagesize=A4)
+    _ecrire_page(c, preparer_page(piece))
+    c.showPage()
+    c.save()
+
+
+@instrumenter("dossier PDF (reportlab)",
+              taille=lambda pieces, *args, **kwargs: len(pieces) if hasattr(pieces, "__len__") else None)
+def export_dossier(pieces, titre="Dossier chantier", chantier="", filename="dossier.pdf", progression=None,
+                   fichier=None):
+    """
+    Écrit le dossier PDF des pièces (liste de PieceDossier) : récapitulatif puis
+    une page par pièce. progression(nb_pages_ecrites, nb_pieces) est appelée après
+    chaque page. Renvoie le chemin du fichier, écrit dans le dossier temporaire
+    sous `filename`, ou `fichier` (chemin ou flux binaire) s'il est donné.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    pieces = list(pieces)
+    nb_pages_recap = max(1, math.ceil(len(pieces) / LIGNES_RECAP))
+    total = nb_pages_recap + len(pieces)
+
+    pdf_path = os.path.join(tempfile.gettempdir(), filename) if fichier is None else fichier
+    c = canvas.Canvas(pdf_path, pagesize=A4)
+    c.setTitle(titre)
+
+    # Pages du récapitulatif : contenu écrit à la fin, une fois les dimensions connues
+    for k in range(nb_pages_recap):
+        c.doForm(f"recap{k}")
+        _pied_de_page(c, k + 1, total)
+        c.showPage()
+
+    lignes_recap = []
+    for n, page in enumerate(map(preparer_page, pieces), start=1):
+        _ecrire_page(c, page)
+        _pied_de_page(c, nb_pages_recap + n, total)
+        c.showPage()
+        lignes_recap.append(page["recap"])
+        if progression:
+            progression(n, len(pieces))
+
+    _ecrire_recapitulatif(c, lignes_recap, titre, chantier, nb_pages_recap)
+    c.save()
+    return pdf_path
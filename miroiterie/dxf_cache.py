@@ -0,0 +1,88 @@
+"""
+Chargement des DXF en mémoire avec un cache LRU partagé par les pages.
+
+Le fichier envoyé est identifié par l'empreinte SHA-256 de son contenu : un
+rerun Streamlit (changement de calque, de widget...) retrouve le document déjà
+analysé au lieu de relancer ezdxf. Aucun fichier temporaire n'est écrit.
+ezdxf n'est importé qu'à la première lecture d'un document.
+"""
+import hashlib
+import io
+import threading
+
+from miroiterie.cache import CacheLRU
+from miroiterie.instrumentation import instrumenter
+
+# Nombre de documents gardés en mémoire (toutes sessions confondues)
+MAX_DOCUMENTS = 8
+
+SENTINELLE_BINAIRE = b"AutoCAD Binary DXF"
+
+# Taille de l'extrait lu pour détecter l'encodage dans la section HEADER
+TAILLE_ENTETE = 256 * 1024
+
+
+class DocumentDXF:
+    """Document ezdxf analysé + résultats dérivés (géométrie, calques...) mémorisés."""
+
+    def __init__(self, cle, doc):
+        self.cle = cle
+        self.doc = doc
+        self._derives = {}
+        self._verrou = threading.Lock()
+
+    def derive(self, nom, calcul, *args):
+        """
+        Renvoie calcul(doc, *args), calculé une seule fois par document.
+        Les arguments font partie de la clé : ils doivent être hachables.
+        """
+        cle = (nom, args)
+        with self._verrou:
+            if cle in self._derives:
+                return self._derives[cle]
+        resultat = calcul(self.doc, *args)
+        with self._verrou:
+            return self._derives.setdefault(cle, resultat)
+
+
+_cache = CacheLRU(MAX_DOCUMENTS)
+
+
+def empreinte(data):
+    """Empreinte SHA-256 (hexadécimale) du contenu du fichier."""
+    return hashlib.sha256(data).hexdigest()
+
+
+@instrumenter("lecture DXF (ezdxf)", taille=lambda data, *args, **kwargs: len(data))
+def lire_dxf_bytes(data, errors="surrogateescape"):
+    """Équivalent de ezdxf.readfile pour un contenu déjà en mémoire (ASCII ou binaire)."""
+    import ezdxf
+    from ezdxf.document import Drawing
+    from ezdxf.filemanagement import dxf_stream_info
+    from ezdxf.lldxf.tagger import binary_tags_loader
+
+    if data.startswith(SENTINELLE_BINAIRE):
+        return Drawing.load(binary_tags_loader(data, errors=errors))
+
+    # L'encodage est déclaré dans la section HEADER ($DWGCODEPAGE / $ACADVER)
+    entete = data[:TAILLE_ENTETE].decode("ascii", errors="ignore")
+    info = dxf_stream_info(io.StringIO(entete))
+    texte = data.decode(info.encoding, errors=errors)
+    return ezdxf.read(io.StringIO(texte))
+
+
+def document_dxf(data):
+    """
+    Renvoie le DocumentDXF correspondant au contenu `data` (bytes), en
+    l'analysant uniquement s'il n'est pas déjà dans le cache.
+    """
+    cle = empreinte(data)
+    document = _cache.get(cle)
+    if document is None:
+        document = DocumentDXF(cle, lire_dxf_bytes(data))
+        _cache.put(cle, document)
+    return document
+
+
+def vider_cache():
+    _cache.clear()
@@ -0,0 +1,179 @@
+"""
+Export DXF des contours en une seule LWPOLYLINE fermée, avec renflements (bulges).
+
+Les formes arrivent discrétisées (arcs de forme cintrée, contours de DXF
+importés...). Les suites de points alignés deviennent un seul segment, les
+suites de points cocycliques un seul arc, tant que l'écart (distance de
+Hausdorff) entre chaque segment ou arc et les cordes d'origine qu'il remplace
+reste sous la tolérance. Un contour cintré de 50+ segments devient ainsi
+4 sommets, dont un arc, si sa tolérance de corde ne dépasse pas celle de
+l'ajustement.
+
+Chaque suite est la plus longue possible : sa longueur est trouvée par
+recherche exponentielle puis dichotomie, en O(n log n) sur le contour.
+"""
+import math
+
+import numpy as np
+
+from miroiterie.instrumentation import instrumenter
+
+# Écart maximal admis entre la polyligne d'origine et la polyligne ajustée (mm)
+TOLERANCE_AJUSTEMENT = 0.05
+
+# Au-delà de cette déviation entre deux segments, le sommet est un angle vif (jamais dans un arc)
+ANGLE_MAX_ARC = math.radians(30)
+
+
+def _cercle(p, q, r):
+    """Centre et rayon du cercle passant par p, q, r (None si alignés)."""
+    ax, ay = q - p
+    bx, by = r - p
+    d = 2 * (ax * by - ay * bx)
+    if abs(d) < 1e-12:
+        return None
+    a2, b2 = ax * ax + ay * ay, bx * bx + by * by
+    centre = p + np.array(((by * a2 - ay * b2) / d, (ax * b2 - bx * a2) / d))
+    return centre, math.hypot(*(p - centre))
+
+
+def _droite(pts, tolerance):
+    """
+    Vrai si tous les points sont à moins de `tolerance` de la corde
+    premier-dernier, sans revenir en arrière ni la dépasser.
+    """
+    corde = pts[-1] - pts[0]
+    longueur = math.hypot(*corde)
+    if not longueur:
+        return False
+    relatifs = pts[1:-1] - pts[0]
+    ecarts = np.abs(corde[0] * relatifs[:, 1] - corde[1] * relatifs[:, 0]) / longueur
+    positions = relatifs @ corde
+    return bool(np.all(ecarts <= tolerance) and np.all((positions >= 0) & (positions <= longueur * longueur)))
+
+
+def _arc(pts, tolerance):
+    """
+    Balayage signé (radians) de l'arc passant par le premier, le point du
+    milieu et le dernier point, ou None si l'arc s'écarte de plus de
+    `tolerance` d'une des cordes d'origine, ou si le sens de rotation change.
+    """
+    cercle = _cercle(pts[0], pts[len(pts) // 2], pts[-1])
+    if cercle is None:
+        return None
+    centre, rayon = cercle
+    rayons = pts - centre
+    u, v = rayons[:-1], rayons[1:]
+    angles = np.arctan2(u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0], np.einsum("ij,ij->i", u, v))
+    if not (np.all(angles > 0) or np.all(angles < 0)):
+        return None
+    balayage = float(angles.sum())
+    # Au plus un demi-tour par arc : un cercle complet donne deux arcs, sans corde résiduelle
+    if abs(balayage) > math.pi + 1e-9:
+        return None
+    # Sommets rangés par angle : chaque corde fait face à sa portion d'arc, et la
+    # distance au centre le long d'une corde est convexe. L'écart arc / corde est
+    # donc majoré par l'écart des extrémités au cercle et par la flèche de la
+    # corde (rayon - distance du centre à la corde).
+    cordes = np.diff(pts, axis=0)
+    t = np.clip(-np.einsum("ij,ij->i", rayons[:-1], cordes) / np.einsum("ij,ij->i", cordes, cordes), 0, 1)
+    pieds = rayons[:-1] + t[:, None] * cordes
+    ecart = max(float(np.max(np.abs(np.hypot(rayons[:, 0], rayons[:, 1]) - rayon))),
+                float(np.max(rayon - np.hypot(pieds[:, 0], pieds[:, 1]))))
+    return balayage if ecart <= tolerance else None
+
+
+def _plus_longue(essai, debut, fin):
+    """
+    Plus grand k de [debut, fin] tel que essai(k) soit vrai, essai étant vrai
+    jusqu'à un seuil puis faux (debut - 1 si essai(debut) est faux) : recherche
+    exponentielle puis dichotomie, O(log(k - debut)) appels.
+    """
+    bon, pas, k = debut - 1, 1, debut
+    while k <= fin and essai(k):
+        bon, k, pas = k, min(k + pas, fin + 1), pas * 2
+    mauvais = k
+    while mauvais - bon > 1:
+        milieu = (bon + mauvais) // 2
+        if essai(milieu):
+            bon = milieu
+        else:
+            mauvais = milieu
+    return bon
+
+
+def sommets_bulges(points, tolerance=TOLERANCE_AJUSTEMENT, fermee=True):
+    """
+    Sommets (x, y, bulge) d'une polyligne équivalente à `points` à `tolerance`
+    près : segments droits fusionnés, arcs ajustés (bulge = tan(balayage / 4)).
+    """
+    pts = np.asarray(points, dtype=float)
+    if fermee and len(pts) > 1 and np.allclose(pts[0], pts[-1]):
+        pts = pts[:-1]
+    n = len(pts)
+    if n < 3:
+        return [(x, y, 0.0) for x, y in pts]
+
+    # Déviation à chaque sommet (contour fermé : en partant d'un angle vif, aucun arc n'est coupé)
+    avant = pts - np.roll(pts, 1, axis=0)
+    apres = np.roll(pts, -1, axis=0) - pts
+    deviations = np.abs(np.arctan2(avant[:, 0] * apres[:, 1] - avant[:, 1] * apres[:, 0],
+                                   np.einsum("ij,ij->i", avant, apres)))
+    if fermee:
+        debut = int(np.argmax(deviations))
+        pts = np.roll(pts, -debut, axis=0)
+        deviations = np.roll(deviations, -debut)
+        pts = np.vstack((pts, pts[:1]))
+        deviations = np.append(deviations, deviations[0])
+    else:
+        deviations[[0, -1]] = math.pi
+
+    # Une suite ne traverse pas d'angle vif : elle s'arrête au plus au prochain
+    vifs = np.append(np.flatnonzero(deviations > ANGLE_MAX_ARC), len(pts) - 1)
+
+    sommets = []
+    i, dernier = 0, len(pts) - 1
+    while i < dernier:
+        limite = min(int(vifs[np.searchsorted(vifs, i, side="right")]), dernier)
+        # Plus longue suite droite ou d'arc depuis i (un segment seul sinon)
+        j = max(i + 1, _plus_longue(lambda k: _droite(pts[i:k + 1], tolerance), i + 2, limite))
+        fin_arc = _plus_longue(lambda k: _arc(pts[i:k + 1], tolerance) is not None, j + 1, limite)
+        bulge = 0.0
+        if fin_arc > j:
+            j, bulge = fin_arc, math.tan(_arc(pts[i:fin_arc + 1], tolerance) / 4)
+        sommets.append((float(pts[i, 0]), float(pts[i, 1]), bulge))
+        i = j
+    if not fermee:
+        sommets.append((float(pts[-1, 0]), float(pts[-1, 1]), 0.0))
+    return sommets
+
+
+def ajouter_contour(msp, points, tolerance=TOLERANCE_AJUSTEMENT, fermee=True, dxfattribs=None):
+    """Ajoute le contour au modelspace (ou bloc) comme une seule LWPOLYLINE à renflements."""
+    return msp.add_lwpolyline(sommets_bulges(points, tolerance, fermee), format="xyb", close=fermee,
+                              dxfattribs=dxfattribs)
+
+
+@instrumenter("DXF du contour (ezdxf)", taille=lambda points, *args, **kwargs: len(points))
+def document_contour(points, ref="", observation="", tolerance=TOLERANCE_AJUSTEMENT):
+    """
+    Nouveau document DXF : le contour (une LWPOLYLINE fermée), avec la référence
+    et l'observation en texte au-dessus du premier point.
+    """
+    import ezdxf
+    from ezdxf.enums import TextEntityAlignment
+
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    ajouter_contour(msp, points, tolerance)
+
+    # Position de base pour les annotations (au-dessus du premier point)
+    base_x, base_y = points[0]
+    text_height = 2.5
+    if ref:
+        msp.add_text(f"Réf : {ref}", dxfattribs={"height": text_height}).set_placement(
+            (base_x, base_y + 10), align=TextEntityAlignment.LEFT)
+    if observation:
+        msp.add_text(f"Note : {observation}", dxfattribs={"height": text_height}).set_placement(
+            (base_x, base_y + 7), align=TextEntityAlignment.LEFT)
+    return doc
@@ -0,0 +1,389 @@
+"""
+Moteur d'extraction de la géométrie des entités DXF sous forme de tableaux NumPy.
+
+L'extraction se fait en deux temps :
+  1. collecter_primitives parcourt le modelspace une seule fois et range les
+     entités en « morceaux » : suites de points explicites (LINE, sommets de
+     polylignes, SPLINE aplatie) ou coniques paramétriques (ARC, CIRCLE,
+     ELLIPSE, segments à renflement des polylignes) ;
+  2. discretiser échantillonne toutes les coniques en une seule passe
+     trigonométrique puis assemble le tampon de sommets final.
+
+Le résultat (GeometrieDXF) est un tampon float64 (N, 2) plus les décalages de
+chaque entité dans ce tampon et de chaque calque dans la liste des entités
+(les entités sont regroupées par calque).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from miroiterie.instrumentation import instrumenter
+
+# Tolérance (unités du dessin) d'aplatissement des SPLINE
+TOLERANCE_SPLINE = 0.05
+
+# Nombre minimal et maximal de segments par conique
+SEGMENTS_MIN = 1
+SEGMENTS_MAX = 720
+
+# Types de morceaux
+_POINTS, _CONIQUE, _RENFLEMENT = 0, 1, 2
+
+TYPES_GEOMETRIQUES = ("LINE", "LWPOLYLINE", "POLYLINE", "CIRCLE", "ARC", "ELLIPSE", "SPLINE")
+
+
+@dataclass
+class PrimitivesDXF:
+    """Entités rangées en morceaux, indépendamment de la finesse de discrétisation."""
+    types: np.ndarray            # (E,) type DXF de chaque entité
+    calque_entites: np.ndarray   # (E,) indice du calque de chaque entité
+    calques: list                # noms des calques, triés
+    fermees: np.ndarray          # (E,) entité fermée (cercle, polyligne close...)
+    piece_entite: np.ndarray     # (P,) entité de chaque morceau, morceaux triés par entité
+    piece_type: np.ndarray       # (P,) _POINTS ou _CONIQUE
+    piece_ref: np.ndarray        # (P,) début dans `points` ou indice de conique
+    piece_n: np.ndarray          # (P,) nombre de points (morceaux _POINTS)
+    points: np.ndarray           # (M, 2) points explicites
+    coniques: np.ndarray         # (K, 9) cx, cy, ux, uy, vx, vy, t0, t1, interieur
+
+
+@dataclass
+class GeometrieDXF:
+    """Géométrie discrétisée : un tampon de sommets et ses décalages."""
+    sommets: np.ndarray          # (N, 2) float64
+    debuts_entites: np.ndarray   # (E + 1,) décalages des entités dans `sommets`
+    types: np.ndarray            # (E,) type DXF de chaque entité
+    fermees: np.ndarray          # (E,) entité fermée
+    calque_entites: np.ndarray   # (E,) indice du calque de chaque entité
+    calques: list                # noms des calques, triés
+    debuts_calques: np.ndarray   # (L + 1,) décalages des calques dans la liste des entités
+
+    def __len__(self):
+        return len(self.types)
+
+    def sommets_entite(self, i):
+        return self.sommets[self.debuts_entites[i]:self.debuts_entites[i + 1]]
+
+    def entites_calques(self, noms):
+        """Indices des entités appartenant aux calques `noms`."""
+        indices = [self.calques.index(nom) for nom in noms if nom in self.calques]
+        if not indices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([
+            np.arange(self.debuts_calques[i], self.debuts_calques[i + 1]) for i in sorted(indices)
+        ])
+
+    def tampon_nan(self, selection=None):
+        """
+        Sommets des entités `selection` (toutes par défaut) mis bout à bout,
+        chaque entité étant suivie d'une ligne de NaN (format attendu par Plotly).
+        """
+        if selection is None:
+            selection = np.arange(len(self))
+        selection = np.asarray(selection, dtype=np.int64)
+        debuts = self.debuts_entites[selection]
+        longueurs = self.debuts_entites[selection + 1] - debuts
+        debuts_sortie = np.concatenate(([0], np.cumsum(longueurs + 1)[:-1])).astype(np.int64)
+
+        tampon = np.full((int(longueurs.sum()) + len(selection), 2), np.nan)
+        intra = _indices_internes(longueurs)
+        tampon[np.repeat(debuts_sortie, longueurs) + intra] = self.sommets[np.repeat(debuts, longueurs) + intra]
+        return tampon
+
+
+def _indices_internes(longueurs):
+    """[0..l0-1, 0..l1-1, ...] sans boucle Python."""
+    total = int(longueurs.sum())
+    decalages = np.cumsum(longueurs) - longueurs
+    return np.arange(total, dtype=np.int64) - np.repeat(decalages, longueurs)
+
+
+def _renflements_en_coniques(renflements):
+    """
+    Convertit des segments à renflement (x0, y0, x1, y1, bulge) en arcs
+    paramétriques, en un seul calcul vectoriel.
+    """
+    p0 = renflements[:, 0:2]
+    p1 = renflements[:, 2:4]
+    b = renflements[:, 4]
+    d = p1 - p0
+    # Centre : milieu de la corde décalé vers la gauche de (1 - b²) / 4b * corde
+    milieu = (p0 + p1) / 2
+    k = (1 - b * b) / (4 * b)
+    centre = milieu + np.column_stack((-d[:, 1], d[:, 0])) * k[:, None]
+    rayon = np.hypot(*(p0 - centre).T)
+    t0 = np.arctan2(p0[:, 1] - centre[:, 1], p0[:, 0] - centre[:, 0])
+    balayage = 4 * np.arctan(b)
+    zeros = np.zeros_like(rayon)
+    return np.column_stack((
+        centre, rayon, zeros, zeros, rayon, t0, t0 + balayage, np.ones_like(rayon)
+    ))
+
+
+class _Collecteur:
+    """Accumule les morceaux d'une entité à l'autre pendant le parcours du modelspace."""
+
+    def __init__(self):
+        self.piece_entite = []
+        self.piece_type = []
+        self.piece_ref = []
+        self.piece_n = []
+        self.points = []
+        self.nb_points = 0
+        self.coniques = []
+        self.renflements = []
+
+    def ajouter_points(self, entite, pts):
+        self.piece_entite.append(entite)
+        self.piece_type.append(_POINTS)
+        self.piece_ref.append(self.nb_points)
+        self.piece_n.append(len(pts))
+        self.points.extend(pts)
+        self.nb_points += len(pts)
+
+    def ajouter_conique(self, entite, conique):
+        self.piece_entite.append(entite)
+        self.piece_type.append(_CONIQUE)
+        self.piece_ref.append(len(self.coniques))
+        self.piece_n.append(0)
+        self.coniques.append(conique)
+
+    def ajouter_polyligne(self, entite, xyb, fermee, miroir):
+        """Sommets + renflements d'une polyligne 2D ; les segments courbes deviennent des arcs."""
+        if miroir:
+            xyb = [(-x, y, -b) for x, y, b in xyb]
+        n = len(xyb)
+        nb_segments = n if fermee else n - 1
+        debut = 0
+        for i in range(nb_segments):
+            b = xyb[i][2]
+            if b:
+                self.ajouter_points(entite, [xy[:2] for xy in xyb[debut:i + 1]])
+                suivant = xyb[(i + 1) % n]
+                self.piece_entite.append(entite)
+                self.piece_type.append(_RENFLEMENT)
+                self.piece_ref.append(len(self.renflements))
+                self.piece_n.append(0)
+                self.renflements.append((xyb[i][0], xyb[i][1], suivant[0], suivant[1], b))
+                debut = i + 1
+        reste = [xy[:2] for xy in xyb[debut:]]
+        if fermee:
+            reste.append(xyb[0][:2])
+        if reste:
+            self.ajouter_points(entite, reste)
+
+
+@instrumenter("entités DXF (ezdxf)", taille=lambda doc, *args, **kwargs: len(doc.modelspace()))
+def collecter_primitives(doc, tolerance_spline=TOLERANCE_SPLINE):
+    """Parcourt une seule fois le modelspace et renvoie les PrimitivesDXF."""
+    msp = doc.modelspace()
+    collecteur = _Collecteur()
+    types, noms_calques, fermees = [], [], []
+
+    for ent in msp:
+        type_entite = ent.dxftype()
+        if type_entite not in TYPES_GEOMETRIQUES:
+            continue
+        i = len(types)
+        ferme = False
+        # Entités 2D définies dans leur OCS : une extrusion (0, 0, -1) retourne l'axe X
+        miroir = ent.dxf.hasattr("extrusion") and ent.dxf.extrusion.z < 0
+
+        if type_entite == "LINE":
+            start, end = ent.dxf.start, ent.dxf.end
+            collecteur.ajouter_points(i, [(start.x, start.y), (end.x, end.y)])
+
+        elif type_entite == "LWPOLYLINE":
+            xyb = [(x, y, b) for x, y, b in ent.get_points("xyb")]
+            if not xyb:
+                continue
+            ferme = bool(ent.closed)
+            collecteur.ajouter_polyligne(i, xyb, ferme, miroir)
+
+        elif type_entite == "POLYLINE":
+            if not (ent.is_2d_polyline or ent.is_3d_polyline):
+                continue  # maillages et polyface
+            xyb = [(v.dxf.location.x, v.dxf.location.y, v.dxf.get("bulge", 0.0)) for v in ent.vertices]
+            if not xyb:
+                continue
+            ferme = bool(ent.is_closed)
+            collecteur.ajouter_polyligne(i, xyb, ferme, miroir and ent.is_2d_polyline)
+
+        elif type_entite in ("CIRCLE", "ARC"):
+            c, r = ent.dxf.center, ent.dxf.radius
+            if type_entite == "CIRCLE":
+                t0, t1 = 0.0, 2 * np.pi
+                ferme = True
+            else:
+                t0, t1 = np.radians(ent.dxf.start_angle), np.radians(ent.dxf.end_angle)
+                if t1 <= t0:
+                    t1 += 2 * np.pi
+            sx = -1.0 if miroir else 1.0
+            collecteur.ajouter_conique(i, (sx * c.x, c.y, sx * r, 0.0, 0.0, r, t0, t1, 0.0))
+
+        elif type_entite == "ELLIPSE":
+            c, u, v = ent.dxf.center, ent.dxf.major_axis, ent.minor_axis
+            t0, t1 = ent.dxf.start_param, ent.dxf.end_param
+            if t1 <= t0:
+                t1 += 2 * np.pi
+            ferme = bool(np.isclose(t1 - t0, 2 * np.pi))
+            collecteur.ajouter_conique(i, (c.x, c.y, u.x, u.y, v.x, v.y, t0, t1, 0.0))
+
+        elif type_entite == "SPLINE":
+            pts = [(p.x, p.y) for p in ent.flattening(tolerance_spline)]
+            if not pts:
+                continue
+            ferme = bool(ent.closed)
+            collecteur.ajouter_points(i, pts)
+
+        types.append(type_entite)
+        noms_calques.append(ent.dxf.layer)
+        fermees.append(ferme)
+
+    calques = sorted(set(noms_calques))
+    rang = {nom: k for k, nom in enumerate(calques)}
+    calque_entites = np.array([rang[nom] for nom in noms_calques], dtype=np.int64)
+
+    piece_entite = np.array(collecteur.piece_entite, dtype=np.int64)
+    piece_type = np.array(collecteur.piece_type, dtype=np.int8)
+    piece_ref = np.array(collecteur.piece_ref, dtype=np.int64)
+    coniques = np.array(collecteur.coniques, dtype=np.float64).reshape(-1, 9)
+
+    # Les segments à renflement rejoignent la table des coniques
+    if collecteur.renflements:
+        renflements = np.array(collecteur.renflements, dtype=np.float64)
+        est_renflement = piece_type == _RENFLEMENT
+        piece_ref[est_renflement] += len(coniques)
+        piece_type[est_renflement] = _CONIQUE
+        coniques = np.vstack((coniques, _renflements_en_coniques(renflements)))
+
+    # Regroupement des entités par calque (tri stable : l'ordre du dessin est conservé)
+    ordre = np.argsort(calque_entites, kind="stable")
+    nouvel_indice = np.empty_like(ordre)
+    nouvel_indice[ordre] = np.arange(len(ordre))
+    piece_entite = nouvel_indice[piece_entite] if len(piece_entite) else piece_entite
+    ordre_pieces = np.argsort(piece_entite, kind="stable")
+
+    return PrimitivesDXF(
+        types=np.array(types, dtype="U10")[ordre],
+        calque_entites=calque_entites[ordre],
+        calques=calques,
+        fermees=np.array(fermees, dtype=bool)[ordre],
+        piece_entite=piece_entite[ordre_pieces],
+        piece_type=piece_type[ordre_pieces],
+        piece_ref=piece_ref[ordre_pieces],
+        piece_n=np.array(collecteur.piece_n, dtype=np.int64)[ordre_pieces],
+        points=np.array(collecteur.points, dtype=np.float64).reshape(-1, 2),
+        coniques=coniques,
+    )
+
+
+def segments_coniques(coniques, tolerance=None, segments_par_tour=None):
+    """
+    Nombre de segments de chaque conique :
+    - tolerance : écart maximal corde/arc (unités du dessin), nombre adaptatif ;
+    - segments_par_tour : nombre fixe de segments pour un tour complet.
+    """
+    balayage = np.abs(coniques[:, 7] - coniques[:, 6])
+    if tolerance is not None:
+        rayon = np.maximum(np.hypot(coniques[:, 2], coniques[:, 3]), np.hypot(coniques[:, 4], coniques[:, 5]))
+        # Flèche d'une corde d'angle a : r (1 - cos(a / 2)) <= tolerance
+        rapport = np.clip(1 - tolerance / np.maximum(rayon, 1e-12), -1.0, 1.0)
+        pas = np.maximum(2 * np.arccos(rapport), 1e-6)
+        n = np.ceil(balayage / pas)
+    else:
+        n = np.ceil(balayage * (segments_par_tour or 72) / (2 * np.pi))
+    # Au moins un triangle pour un tour complet
+    n = np.maximum(n, np.ceil(balayage * 3 / (2 * np.pi) - 1e-9))
+    return np.clip(n, SEGMENTS_MIN, SEGMENTS_MAX).astype(np.int64)
+
+
+def echantillonner_coniques(coniques, segments):
+    """
+    Échantillonne toutes les coniques en une passe : P(t) = c + u cos t + v sin t.
+    Les coniques « intérieures » (segments à renflement) omettent leurs extrémités,
+    déjà présentes comme sommets de la polyligne.
+    Renvoie les points et le nombre de points de chaque conique.
+    """
+    interieur = coniques[:, 8].astype(bool)
+    j0 = interieur.astype(np.int64)
+    nb = np.where(interieur, segments - 1, segments + 1)
+    j = np.repeat(j0, nb) + _indices_internes(nb)
+    k = np.repeat(np.arange(len(coniques)), nb)
+    c = coniques[k]
+    t = c[:, 6] + (c[:, 7] - c[:, 6]) * (j / np.repeat(segments, nb))
+    cos_t, sin_t = np.cos(t), np.sin(t)
+    points = np.column_stack((
+        c[:, 0] + c[:, 2] * cos_t + c[:, 4] * sin_t,
+        c[:, 1] + c[:, 3] * cos_t + c[:, 5] * sin_t,
+    ))
+    return points, nb
+
+
+def discretiser(primitives, tolerance=None, segments_par_tour=None):
+    """Assemble le tampon de sommets de toutes les entités."""
+    segments = segments_coniques(primitives.coniques, tolerance, segments_par_tour)
+    points_coniques, nb_coniques = echantillonner_coniques(primitives.coniques, segments)
+    debuts_coniques = np.cumsum(nb_coniques) - nb_coniques
+
+    est_points = primitives.piece_type == _POINTS
+    piece_n = np.where(est_points, primitives.piece_n, 0)
+    piece_n[~est_points] = nb_coniques[primitives.piece_ref[~est_points]]
+    piece_source = np.where(est_points, primitives.piece_ref, 0)
+    piece_source[~est_points] = debuts_coniques[primitives.piece_ref[~est_points]]
+
+    intra = _indices_internes(piece_n)
+    source = np.repeat(piece_source, piece_n) + intra
+    depuis_points = np.repeat(est_points, piece_n)
+
+    sommets = np.empty((len(source), 2))
+    sommets[depuis_points] = primitives.points[source[depuis_points]]
+    sommets[~depuis_points] = points_coniques[source[~depuis_points]]
+
+    nb_entites = len(primitives.types)
+    par_entite = np.bincount(primitives.piece_entite, weights=piece_n, minlength=nb_entites).astype(np.int64)
+    debuts_entites = np.concatenate(([0], np.cumsum(par_entite)))
+    debuts_calques = np.searchsorted(primitives.calque_entites, np.arange(len(primitives.calques) + 1))
+
+    return GeometrieDXF(
+        sommets=sommets,
+        debuts_entites=debuts_entites,
+        types=primitives.types,
+        fermees=primitives.fermees,
+        calque_entites=primitives.calque_entites,
+        calques=primitives.calques,
+        debuts_calques=debuts_calques,
+    )
+
+
+def extraire_geometrie(doc, tolerance=None, segments_par_tour=None):
+    """Raccourci : collecte puis discrétisation d'un document ezdxf."""
+    return discretiser(collecter_primitives(doc), tolerance, segments_par_tour)
+
+
+def sous_primitives(primitives, entites):
+    """Primitives réduites aux entités `entites` (indices triés), pour une discrétisation partielle."""
+    entites = np.asarray(entites, dtype=np.int64)
+    garde = np.isin(primitives.piece_entite, entites)
+    renumerotation = np.full(len(primitives.types), -1, dtype=np.int64)
+    renumerotation[entites] = np.arange(len(entites))
+
+    piece_type = primitives.piece_type[garde]
+    piece_ref = primitives.piece_ref[garde].copy()
+    est_conique = piece_type == _CONIQUE
+    # Chaque conique n'appartient qu'à un morceau : on la recopie et on renumérote
+    coniques = primitives.coniques[piece_ref[est_conique]]
+    piece_ref[est_conique] = np.arange(len(coniques))
+
+    return PrimitivesDXF(
+        types=primitives.types[entites],
+        calque_entites=primitives.calque_entites[entites],
+        calques=primitives.calques,
+        fermees=primitives.fermees[entites],
+        piece_entite=renumerotation[primitives.piece_entite[garde]],
+        piece_type=piece_type,
+        piece_ref=piece_ref,
+        piece_n=primitives.piece_n[garde],
+        points=primitives.points,
+        coniques=coniques,
+    )
@@ -0,0 +1,72 @@
+"""
+Index spatial des entités DXF et découpage par fenêtre d'affichage.
+
+L'index (STRtree shapely sur les boîtes englobantes des entités) est construit
+une fois par document. Pour une fenêtre donnée, seules les entités visibles
+et plus grandes qu'un pixel sont discrétisées, avec une tolérance corde/arc
+d'un demi-pixel : peu de segments en vue d'ensemble, davantage en gros plan.
+"""
+import numpy as np
+import shapely
+
+from miroiterie.instrumentation import instrumenter
+from miroiterie.dxf_geometrie import discretiser, sous_primitives
+
+# Largeur approximative du graphique à l'écran (pixels)
+LARGEUR_PIXELS = 1200
+
+# Discrétisation utilisée pour calculer les boîtes englobantes
+SEGMENTS_BOITES = 64
+
+
+class IndexSpatial:
+    """STRtree sur les boîtes englobantes (xmin, ymin, xmax, ymax) des entités."""
+
+    @instrumenter("index spatial (shapely)", taille=lambda self, primitives: len(primitives.types))
+    def __init__(self, primitives):
+        geometrie = discretiser(primitives, segments_par_tour=SEGMENTS_BOITES)
+        debuts = geometrie.debuts_entites[:-1]
+        if len(debuts):
+            mini = np.minimum.reduceat(geometrie.sommets, debuts, axis=0)
+            maxi = np.maximum.reduceat(geometrie.sommets, debuts, axis=0)
+        else:
+            mini = maxi = np.empty((0, 2))
+        self.boites = np.column_stack((mini, maxi))
+        self.diagonales = np.hypot(*(maxi - mini).T)
+        self.arbre = shapely.STRtree(shapely.box(*self.boites.T))
+
+    def __len__(self):
+        return len(self.boites)
+
+    def etendue(self):
+        """Boîte englobant tout le dessin."""
+        if not len(self.boites):
+            return (0.0, 0.0, 1.0, 1.0)
+        return (*self.boites[:, :2].min(axis=0), *self.boites[:, 2:].max(axis=0))
+
+    def requete(self, fenetre):
+        """Indices (triés) des entités dont la boîte touche la fenêtre."""
+        return np.sort(self.arbre.query(shapely.box(*fenetre)))
+
+    def visibles(self, fenetre, taille_pixel):
+        """Entités de la fenêtre dont la taille dépasse un pixel."""
+        entites = self.requete(fenetre)
+        return entites[self.diagonales[entites] >= taille_pixel]
+
+
+def taille_pixel(fenetre, largeur_pixels=LARGEUR_PIXELS):
+    """Taille d'un pixel en unités du dessin pour une fenêtre (xmin, ymin, xmax, ymax)."""
+    return max(fenetre[2] - fenetre[0], fenetre[3] - fenetre[1]) / largeur_pixels
+
+
+def geometrie_fenetre(primitives, index, fenetre, calques=None, largeur_pixels=LARGEUR_PIXELS):
+    """
+    Géométrie des seules entités visibles dans `fenetre`, discrétisée au
+    niveau de détail du zoom. `calques` restreint aux calques nommés.
+    """
+    pixel = taille_pixel(fenetre, largeur_pixels)
+    entites = index.visibles(fenetre, pixel)
+    if calques is not None:
+        rangs = [primitives.calques.index(nom) for nom in calques if nom in primitives.calques]
+        entites = entites[np.isin(primitives.calque_entites[entites], rangs)]
+    return discretiser(sous_primitives(primitives, entites), tolerance=pixel / 2)
@@ -0,0 +1,116 @@
+"""
+Dessin vectoriel des formes dans les fiches techniques PDF (reportlab).
+
+La forme, son rectangle englobant et les cotes sont tracés directement sur le
+canvas : le PDF reste net au zoom, léger, et peut être imprimé à l'échelle 1:1.
+"""
+import math
+
+import numpy as np
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+
+# Marge autour du dessin en mode 1:1 (points PDF)
+MARGE = 40
+
+# Hauteur réservée à l'en-tête texte de la fiche en mode 1:1 (points PDF)
+HAUTEUR_ENTETE = 250
+
+
+def etendue(points, rect):
+    """(xmin, ymin, xmax, ymax) de la forme et de son rectangle, en mm."""
+    tous = np.vstack((np.asarray(points, dtype=float), np.asarray(rect, dtype=float)))
+    return (*tous.min(axis=0), *tous.max(axis=0))
+
+
+def format_page(points, rect, echelle_reelle=False, pagesize=A4):
+    """Format de page : `pagesize`, agrandi si besoin pour contenir la forme à l'échelle 1:1."""
+    if not echelle_reelle:
+        return pagesize
+    xmin, ymin, xmax, ymax = etendue(points, rect)
+    return (max(pagesize[0], (xmax - xmin) * mm + 2 * MARGE),
+            max(pagesize[1], (ymax - ymin) * mm + 2 * MARGE + HAUTEUR_ENTETE))
+
+
+def _chemin(c, pts, ferme=True):
+    chemin = c.beginPath()
+    chemin.moveTo(*pts[0])
+    for x, y in pts[1:]:
+        chemin.lineTo(x, y)
+    if ferme:
+        chemin.close()
+    return chemin
+
+
+def _cote(c, p, q, texte, decalage=6):
+    """Texte centré sur le milieu de [p, q], parallèle au segment et décalé vers l'extérieur."""
+    angle = math.degrees(math.atan2(q[1] - p[1], q[0] - p[0]))
+    # Texte toujours lisible (jamais la tête en bas)
+    if angle > 90 or angle <= -90:
+        angle -= 180 if angle > 0 else -180
+    c.saveState()
+    c.translate((p[0] + q[0]) / 2, (p[1] + q[1]) / 2)
+    c.rotate(angle)
+    c.drawCentredString(0, decalage, texte)
+    c.restoreState()
+
+
+def dessiner_forme(c, points, rect, zone, echelle=None, fleche=None):
+    """
+    Trace la forme, son rectangle englobant et les cotes dans `zone`
+    (x, y, largeur, hauteur en points PDF), centrés.
+    echelle : points PDF par mm ; None = ajusté à la zone, `mm` = échelle 1:1.
+    fleche : segment [P1, P2] de la flèche à coter (forme cintrée).
+    Renvoie l'échelle utilisée.
+    """
+    xmin, ymin, xmax, ymax = etendue(points, rect)
+    largeur, hauteur = max(xmax - xmin, 1e-9), max(ymax - ymin, 1e-9)
+    zx, zy, zl, zh = zone
+    if echelle is None:
+        echelle = min(zl / largeur, zh / hauteur)
+    origine = np.array((zx + (zl - largeur * echelle) / 2 - xmin * echelle,
+                        zy + (zh - hauteur * echelle) / 2 - ymin * echelle))
+
+    def page(pts):
+        return np.asarray(pts, dtype=float) * echelle + origine
+
+    c.saveState()
+    c.setLineWidth(0.8)
+    c.setStrokeColorRGB(0.12, 0.47, 0.71)
+    c.setFillColorRGB(0.12, 0.47, 0.71, alpha=0.35)
+    c.drawPath(_chemin(c, page(points).tolist()), stroke=1, fill=1)
+
+    r = page(rect).tolist()
+    c.setStrokeColorRGB(0.85, 0, 0)
+    c.setDash(4, 3)
+    c.drawPath(_chemin(c, r), stroke=1, fill=0)
+    c.setDash()
+
+    c.setFillColorRGB(0.85, 0, 0)
+    c.setFont("Helvetica", 9)
+    _cote(c, r[0], r[1], f"{round(math.dist(rect[0], rect[1]), 2)} mm")
+    _cote(c, r[1], r[2], f"{round(math.dist(rect[1], rect[2]), 2)} mm")
+
+    if fleche:
+        p1, p2 = (tuple(getattr(p, "coords", [p])[0]) for p in fleche)
+        f = page([p1, p2]).tolist()
+        c.setStrokeColorRGB(0, 0, 0)
+        c.setDash(1, 2)
+        c.drawPath(_chemin(c, f, ferme=False), stroke=1, fill=0)
+        c.setDash()
+        c.setFillColorRGB(0, 0, 0)
+        _cote(c, f[0], f[1], f"Flèche {int(math.dist(p1, p2))} mm", decalage=-12)
+    c.restoreState()
+    return echelle
+
+
+def barre_controle(c, x, y, longueur_mm=100):
+    """Barre de 100 mm pour vérifier l'impression à l'échelle 1:1."""
+    c.saveState()
+    c.setLineWidth(1)
+    c.line(x, y, x + longueur_mm * mm, y)
+    c.line(x, y - 3, x, y + 3)
+    c.line(x + longueur_mm * mm, y - 3, x + longueur_mm * mm, y + 3)
+    c.setFont("Helvetica", 8)
+    c.drawString(x, y + 5, f"Contrôle d'échelle : {longueur_mm} mm")
+    c.restoreState()
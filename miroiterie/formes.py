@@ -0,0 +1,264 @@
+"""
+Bibliothèque de formes paramétriques.
+
+Chaque forme déclare ses paramètres (libellé, valeur par défaut, bornes) et une
+fonction de sommets vectorisée : avec des tableaux de N valeurs par paramètre,
+elle renvoie les sommets des N pièces d'un coup, tableau (N, M, 2). Les
+rectangles minimaux sont calculés dans la même passe (rectangles_minimaux).
+
+    lot = evaluer("trapeze_isocele", base1=[1000, 800], base2=[600, 500], hauteur=[400, 300])
+    lot.largeurs, lot.hauteurs
+
+La page « Rectangle englobant » construit ses champs de saisie à partir de ce
+registre ; un devis de plusieurs milliers de lignes se calcule sans interface.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from miroiterie.arcs import TOLERANCE_CORDE, generer_arcs, segments_arcs
+from miroiterie.quadrilateres import resoudre_quadrilateres
+from miroiterie.rectangle import rectangles_minimaux
+
+# Écart (mm) entre un quadrilatère résolu et les mesures saisies au-delà duquel elles sont signalées incompatibles
+TOLERANCE_FERMETURE = 0.9
+
+
+@dataclass(frozen=True)
+class Parametre:
+    nom: str                    # nom de l'argument
+    libelle: str                # libellé du champ de saisie
+    defaut: float
+    minimum: float = None
+    maximum: float = None
+    attribut: str = None        # clé dans les attributs de la fiche (None : non repris)
+    facultatif: bool = False    # peut rester vide (NaN) : mesure inconnue
+
+
+@dataclass(frozen=True)
+class Forme:
+    cle: str
+    nom: str                    # libellé dans les menus
+    parametres: tuple
+    sommets: callable           # (**tableaux (N,)) -> (sommets (N, M, 2), écarts de fermeture (N,) ou None,
+                                #                      mesures ambiguës (N,) ou None, figures convexes (N,) ou None)
+    options: dict = field(default_factory=dict)
+
+    def erreurs(self, valeurs):
+        """
+        Validation vectorisée : tableau (N,) de messages, vide pour une ligne
+        valide (paramètre manquant, non numérique ou hors bornes).
+        """
+        n = len(next(iter(valeurs.values()))) if valeurs else 0
+        messages = np.full(n, "", dtype=object)
+        for p in self.parametres:
+            if p.nom not in valeurs:
+                messages[:] = f"paramètre manquant : {p.nom}"
+                return messages
+            v = np.asarray(valeurs[p.nom], dtype=float)
+            faux = np.isinf(v) if p.facultatif else ~np.isfinite(v)
+            if p.minimum is not None:
+                faux |= v < p.minimum
+            if p.maximum is not None:
+                faux |= v > p.maximum
+            bornes = f"[{p.minimum if p.minimum is not None else '-∞'} ; {p.maximum if p.maximum is not None else '+∞'}]"
+            messages[faux & (messages == "")] = f"{p.nom} hors bornes {bornes}"
+        return messages
+
+    def attributs(self, valeurs):
+        """Attributs affichés dans la fiche technique d'une pièce (valeurs scalaires, mesures inconnues omises)."""
+        return {p.attribut: valeurs[p.nom] for p in self.parametres
+                if p.attribut and valeurs.get(p.nom) is not None and not np.isnan(valeurs[p.nom])}
+
+    def construire(self, **valeurs):
+        """
+        Une seule pièce : (points [(x, y), ...], attributs, écart de fermeture ou
+        None, vrai si une autre figure vérifie aussi les mesures, faux si la
+        figure obtenue n'est pas convexe).
+        """
+        sommets, ecarts, ambigues, convexes = self.sommets(
+            **{k: np.atleast_1d(np.asarray(v, dtype=float)) for k, v in valeurs.items()}, **self.options)
+        ecart = None if ecarts is None else float(ecarts[0])
+        ambigue = ambigues is not None and bool(ambigues[0])
+        convexe = convexes is None or bool(convexes[0])
+        return [tuple(p) for p in sommets[0].tolist()], self.attributs(valeurs), ecart, ambigue, convexe
+
+
+@dataclass
+class LotFormes:
+    forme: str
+    sommets: np.ndarray         # (N, M, 2)
+    rectangles: np.ndarray      # (N, 4, 2)
+    angles: np.ndarray          # (N,) degrés
+    largeurs: np.ndarray        # (N,)
+    hauteurs: np.ndarray        # (N,)
+    ecarts: np.ndarray = None   # (N,) écart aux mesures (quadrilatères résolus) ; NaN : figure indéterminée
+    ambigues: np.ndarray = None # (N,) une autre figure convexe vérifie aussi les mesures (quadrilatères résolus)
+    convexes: np.ndarray = None # (N,) figure obtenue convexe (quadrilatères résolus)
+
+    @property
+    def fermees(self):
+        """Figure qui vérifie les mesures : écart sous la tolérance, et convexe."""
+        if self.ecarts is None:
+            return np.ones(len(self.sommets), dtype=bool)
+        fermees = self.ecarts < TOLERANCE_FERMETURE
+        return fermees if self.convexes is None else fermees & self.convexes
+
+
+FORMES = {}
+
+
+def forme(cle, nom, *parametres, **options):
+    """Décorateur : enregistre une fonction de sommets vectorisée dans le registre."""
+    def enregistrer(sommets):
+        FORMES[cle] = Forme(cle, nom, tuple(parametres), sommets, options)
+        return sommets
+    return enregistrer
+
+
+def par_nom(nom):
+    """Forme d'après son libellé de menu."""
+    return next(f for f in FORMES.values() if f.nom == nom)
+
+
+def evaluer(cle, **parametres):
+    """
+    Sommets et rectangles minimaux de N pièces d'une même forme. Chaque
+    paramètre est un tableau de N valeurs (ou un scalaire, diffusé).
+    Lève ValueError à la première ligne invalide.
+    """
+    f = FORMES[cle]
+    valeurs = {k: np.asarray(v, dtype=float) for k, v in parametres.items()}
+    taille = np.broadcast_shapes(*(v.shape for v in valeurs.values()))
+    valeurs = {k: np.broadcast_to(v, taille).reshape(-1) for k, v in valeurs.items()}
+    erreurs = f.erreurs(valeurs)
+    mauvaises = np.flatnonzero(erreurs != "")
+    if len(mauvaises):
+        raise ValueError(f"{cle}, ligne {mauvaises[0]} : {erreurs[mauvaises[0]]}")
+    sommets, ecarts, ambigues, convexes = f.sommets(**valeurs, **f.options)
+    # Figures indéterminées (sommets NaN) : pas de rectangle
+    definies = np.flatnonzero(np.isfinite(sommets).all(axis=(1, 2)))
+    rectangles, angles = np.full((len(sommets), 4, 2), np.nan), np.full(len(sommets), np.nan)
+    largeurs, hauteurs = np.full(len(sommets), np.nan), np.full(len(sommets), np.nan)
+    rectangles[definies], angles[definies], largeurs[definies], hauteurs[definies] = rectangles_minimaux(
+        sommets[definies])
+    return LotFormes(cle, sommets, rectangles, angles, largeurs, hauteurs, ecarts, ambigues, convexes)
+
+
+def _empiler(*points):
+    """Sommets (N, len(points), 2) à partir de couples (x, y) de tableaux (N,) ou de scalaires."""
+    return np.stack([np.stack((x, y), axis=-1) for x, y in _diffuser(points)], axis=-2)
+
+
+def _diffuser(points):
+    """Diffuse toutes les coordonnées à la même taille (les constantes 0 deviennent des tableaux)."""
+    taille = np.broadcast_shapes(*(np.shape(c) for p in points for c in p))
+    return [tuple(np.broadcast_to(np.asarray(c, dtype=float), taille) for c in p) for p in points]
+
+
+# --- Formes ---
+
+@forme("losange_cote_angle", "Losange (côté + angle)",
+       Parametre("cote", "Longueur du côté (mm)", 1000, 1),
+       Parametre("angle", "Angle en degrés", 60.0, 1.0, 179.0))
+def _losange_cote_angle(cote, angle):
+    demi = np.radians(angle) / 2
+    dx = cote * np.cos(demi)
+    dy = cote * np.sin(demi)
+    return _empiler((-dx, 0), (0, dy), (dx, 0), (0, -dy)), None, None, None
+
+
+@forme("losange_diagonales", "Losange (2 diagonales)",
+       Parametre("d1", "Diagonale 1 (mm)", 1000, 1, attribut="Diagonale 1 (mm)"),
+       Parametre("d2", "Diagonale 2 (mm)", 600, 1, attribut="Diagonale 2 (mm)"))
+def _losange_diagonales(d1, d2):
+    return _empiler((-d1 / 2, 0), (0, d2 / 2), (d1 / 2, 0), (0, -d2 / 2)), None, None, None
+
+
+@forme("trapeze_isocele", "Trapèze isocèle",
+       Parametre("base1", "Grande base (mm)", 1000, 1, attribut="Base 1 (mm)"),
+       Parametre("base2", "Petite base (mm)", 600, 1, attribut="Base 2 (mm)"),
+       Parametre("hauteur", "Hauteur (mm)", 400, 1, attribut="Hauteur (mm)"))
+def _trapeze_isocele(base1, base2, hauteur):
+    return _empiler((-base1 / 2, 0), (base1 / 2, 0), (base2 / 2, hauteur), (-base2 / 2, hauteur)), None, None, None
+
+
+@forme("trapeze_rectangle", "Trapèze rectangle",
+       Parametre("hauteur1", "Hauteur 1 (mm)", 1000, 1, attribut="Hauteur 1 (mm)"),
+       Parametre("hauteur2", "Hauteur 2 (mm)", 700, 1, attribut="Hauteur 2 (mm)"),
+       Parametre("base", "Base (mm)", 400, 1, attribut="Base (mm)"))
+def _trapeze_rectangle(hauteur1, hauteur2, base):
+    # Angle droit en bas à gauche : A, B, C, D
+    return _empiler((0, 0), (base, 0), (base, hauteur2), (0, hauteur1)), None, None, None
+
+
+@forme("parallelogramme", "Parallélogramme",
+       Parametre("base", "Longueur de la base (mm)", 1000, 1),
+       Parametre("cote", "Longueur du côté adjacent (mm)", 600, 1),
+       Parametre("angle", "Angle entre base et côté (°)", 60.0, 1.0, 179.0))
+def _parallelogramme(base, cote, angle):
+    a = np.radians(angle)
+    dx = cote * np.cos(a)
+    dy = cote * np.sin(a)
+    return _empiler((0, 0), (base, 0), (base + dx, dy), (dx, dy)), None, None, None
+
+
+def _parametres_quadrilatere(*defauts):
+    """Mesures d'un quadrilatère, toutes facultatives (vide = inconnue), avec leurs valeurs par défaut."""
+    return tuple(Parametre(nom, libelle, defaut, minimum, maximum, attribut, facultatif=True)
+                 for (nom, libelle, minimum, maximum, attribut), defaut in zip(_MESURES_QUADRILATERE, defauts))
+
+
+_MESURES_QUADRILATERE = (
+    ("ab", "Longueur AB", 0.1, None, "AB (mm)"),
+    ("bc", "Longueur BC", 0.1, None, "BC (mm)"),
+    ("cd", "Longueur CD", 0.1, None, "CD (mm)"),
+    ("da", "Longueur DA", 0.1, None, "DA (mm)"),
+    ("angle_a", "Angle A (en degrés)", 0.0, 360.0, "Angle A (°)"),
+    ("angle_b", "Angle B (en degrés)", 0.0, 360.0, "Angle B (°)"),
+    ("angle_c", "Angle C (en degrés)", 0.0, 360.0, "Angle C (°)"),
+    ("angle_d", "Angle D (en degrés)", 0.0, 360.0, "Angle D (°)"),
+    ("ac", "Diagonale AC", 0.1, None, "AC (mm)"),
+    ("bd", "Diagonale BD", 0.1, None, "BD (mm)"),
+)
+
+
+@forme("quadrilatere_ab_parallele_cd", "Quadrilatère avec côtés opposés parallèles (AB ‖ CD)",
+       *_parametres_quadrilatere(1000.0, None, 600.0, None, 60.0, 60.0)[:6])
+def _quadrilatere_ab_parallele_cd(**mesures):
+    """Trapèze AB ‖ CD : quatre mesures suffisent ; l'écart mesure la contradiction entre les mesures."""
+    quadrilateres = resoudre_quadrilateres(parallele=True, **mesures)
+    return quadrilateres.sommets, quadrilateres.ecarts, quadrilateres.ambigues, quadrilateres.convexes
+
+
+@forme("quadrilatere_general", "Quadrilatère général",
+       *_parametres_quadrilatere(10.0, 6.0, 10.0, 6.0, 60.0, None, None, None, None, None))
+def _quadrilatere_general(**mesures):
+    """
+    Côtés, angles et diagonales au choix (cinq mesures indépendantes) ; écart NaN
+    si la figure est indéterminée, ambiguë si deux figures conviennent.
+    """
+    quadrilateres = resoudre_quadrilateres(**mesures)
+    return quadrilateres.sommets, quadrilateres.ecarts, quadrilateres.ambigues, quadrilateres.convexes
+
+
+def _forme_cintree(largeur, hg, hd, fleche, type, tolerance=TOLERANCE_CORDE):
+    """Trapèze A B C D dont le côté DC est cintré ; même nombre de points pour tout le lot."""
+    n = len(largeur)
+    zeros = np.zeros(n)
+    D = np.column_stack((zeros, hg))
+    C = np.column_stack((largeur, hd))
+    segments = segments_arcs(np.hypot(largeur, hd - hg), fleche, type, tolerance)
+    arcs = generer_arcs(D, C, fleche, type, int(segments.max(initial=1)) + 1)
+    base = _empiler((0, 0), (largeur, 0))
+    return np.concatenate((base, arcs[:, ::-1]), axis=1), None, None, None
+
+
+_PARAMETRES_CINTRE = (
+    Parametre("largeur", "Largeur de la base AB (mm)", 1000, 1, attribut="Base (mm)"),
+    Parametre("hg", "Hauteur côté gauche (AD) (mm)", 600, 0, attribut="Côté gauche (mm)"),
+    Parametre("hd", "Hauteur côté droit (BC) (mm)", 800, 0, attribut="Côté droit (mm)"),
+    Parametre("fleche", "Flèche (mm)", 50.0, 0.0, attribut="Flèche (mm)"),
+)
+forme("forme_cintree", "Forme cintrée (parabolique)", *_PARAMETRES_CINTRE, type="parabole")(_forme_cintree)
+forme("forme_cintree_cercle", "Forme cintrée (arc de cercle)", *_PARAMETRES_CINTRE, type="cercle")(_forme_cintree)
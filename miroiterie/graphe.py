@@ -0,0 +1,76 @@
+"""
+Graphe de calcul incrémental pour les pages Streamlit.
+
+Une page déclare ses étapes (fonction + noms des entrées ou étapes dont elle
+dépend). À chaque rerun, seules les étapes situées en aval d'une entrée
+modifiée sont recalculées ; les autres reprennent leur dernier résultat.
+L'état (valeurs, versions, temps) est un simple dictionnaire, à ranger dans
+st.session_state pour survivre aux reruns de la session.
+"""
+import time
+
+
+class Graphe:
+    def __init__(self, etat=None):
+        self.etat = {} if etat is None else etat
+        self.etat.setdefault("valeurs", {})
+        self.etat.setdefault("versions", {})
+        self.etat.setdefault("signatures", {})
+        self.etat.setdefault("temps", {})
+        self._etapes = []
+
+    def etape(self, nom, *dependances):
+        """Décorateur : déclare une étape. Les étapes sont évaluées dans l'ordre de déclaration."""
+        def declarer(calcul):
+            self._etapes.append((nom, calcul, dependances))
+            return calcul
+        return declarer
+
+    def _definir_entree(self, nom, valeur):
+        valeurs, versions = self.etat["valeurs"], self.etat["versions"]
+        if nom not in valeurs or not _egales(valeurs[nom], valeur):
+            valeurs[nom] = valeur
+            versions[nom] = versions.get(nom, 0) + 1
+
+    def evaluer(self, **entrees):
+        """Met à jour les entrées puis recalcule les étapes dont une dépendance a changé."""
+        for nom, valeur in entrees.items():
+            self._definir_entree(nom, valeur)
+        valeurs, versions = self.etat["valeurs"], self.etat["versions"]
+        for nom, calcul, dependances in self._etapes:
+            signature = tuple(versions.get(d, 0) for d in dependances)
+            if self.etat["signatures"].get(nom) == signature and nom in valeurs:
+                # Durée conservée pour savoir ce que coûterait un recalcul
+                self.etat["temps"][nom] = (self.etat["temps"].get(nom, (0.0, False))[0], False)
+                continue
+            debut = time.perf_counter()
+            resultat = calcul(*(valeurs[d] for d in dependances))
+            self.etat["temps"][nom] = (time.perf_counter() - debut, True)
+            self.etat["signatures"][nom] = signature
+            # Résultat inchangé : l'aval n'a pas à être recalculé
+            self._definir_entree(nom, resultat)
+        return self
+
+    def __getitem__(self, nom):
+        return self.etat["valeurs"][nom]
+
+    def temps(self):
+        """Lignes (étape, recalculée au dernier rerun, durée de son dernier calcul en ms)."""
+        return [{"Étape": nom, "Recalculée": recalculee, "Durée (ms)": round(duree * 1000, 2)}
+                for nom, (duree, recalculee) in self.etat["temps"].items()]
+
+
+def _egales(a, b):
+    """Égalité tolérante aux tableaux NumPy, y compris dans des tuples, listes ou dictionnaires."""
+    if hasattr(a, "shape") or hasattr(b, "shape"):
+        import numpy as np
+
+        return np.array_equal(a, b)
+    if isinstance(a, (tuple, list)) and isinstance(b, (tuple, list)):
+        return type(a) is type(b) and len(a) == len(b) and all(map(_egales, a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_egales(a[k], b[k]) for k in a)
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return a is b
@@ -0,0 +1,231 @@
+"""
+Instrumentation des étapes coûteuses : lecture ezdxf, géométrie shapely,
+rendu matplotlib, écriture reportlab / ezdxf, sérialisation Plotly.
+
+Une étape est mesurée par le décorateur `instrumenter` ou le gestionnaire
+de contexte `mesurer` : durée, pic mémoire (tracemalloc, en option) et
+taille de l'entrée (points, entités, octets...). Les mesures des dernières
+étapes sont gardées en mémoire, affichées par `panneau_debug` dans la barre
+latérale des pages et exportables en JSON lines.
+
+Désactivée (par défaut), une étape ne coûte qu'un test de drapeau : aucune
+horloge, aucun tracemalloc, et la taille de l'entrée n'est pas calculée.
+Variable d'environnement MIROITERIE_INSTRUMENTATION=1 (ou « memoire ») pour
+l'activer dès le démarrage, par exemple dans un lot.
+
+L'activation vaut pour tout le processus : avec plusieurs sessions
+Streamlit, les mesures de toutes les sessions se mêlent, et le pic mémoire
+d'une étape inclut les allocations des autres threads pendant celle-ci.
+"""
+import functools
+import io
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+# Nombre de mesures gardées en mémoire (les plus anciennes sont oubliées)
+MAX_MESURES = 2000
+
+_mesures = deque(maxlen=MAX_MESURES)
+_pile = threading.local()
+_etat = {"actif": False, "memoire": False}
+
+
+def activer(actif=True, memoire=False):
+    """
+    Active ou coupe l'instrumentation. memoire=True démarre tracemalloc, qui
+    ralentit nettement le code mesuré : les durées relevées en même temps
+    sont alors surestimées.
+    """
+    _etat["actif"] = bool(actif)
+    _etat["memoire"] = bool(actif and memoire)
+    if _etat["memoire"] and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not _etat["memoire"] and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+if os.environ.get("MIROITERIE_INSTRUMENTATION"):
+    activer(True, memoire=os.environ["MIROITERIE_INSTRUMENTATION"] == "memoire")
+
+
+def est_actif():
+    return _etat["actif"]
+
+
+def memoire_mesuree():
+    return _etat["memoire"]
+
+
+class Mesure:
+    """Étape en cours ; `taille` peut être renseignée dans le bloc `with` quand elle n'est connue qu'à la fin."""
+
+    __slots__ = ("etape", "taille", "_debut", "_memoire", "_pic")
+
+    def __init__(self, etape, taille=None):
+        self.etape = etape
+        self.taille = taille
+
+    def __enter__(self):
+        if _etat["memoire"] and tracemalloc.is_tracing():
+            # Le pic courant revient à l'étape englobante avant d'être remis à zéro pour celle-ci
+            pile = _etapes_en_cours()
+            if pile:
+                pile[-1]._pic = max(pile[-1]._pic, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._memoire = self._pic = tracemalloc.get_traced_memory()[0]
+            pile.append(self)
+        else:
+            self._memoire = None
+        self._debut = time.perf_counter()
+        return self
+
+    def __exit__(self, type_erreur, erreur, trace):
+        duree = time.perf_counter() - self._debut
+        pic = None
+        if self._memoire is not None:
+            pile = _etapes_en_cours()
+            if pile and pile[-1] is self:
+                pile.pop()
+            if tracemalloc.is_tracing():
+                self._pic = max(self._pic, tracemalloc.get_traced_memory()[1])
+                if pile:
+                    pile[-1]._pic = max(pile[-1]._pic, self._pic)
+            pic = self._pic - self._memoire
+        _mesures.append({
+            "etape": self.etape,
+            "horodatage": time.time(),
+            "duree_ms": duree * 1000,
+            "pic_memoire_ko": None if pic is None else pic / 1024,
+            "taille": self.taille,
+            "erreur": type_erreur.__name__ if type_erreur else None,
+        })
+        return False
+
+
+class _MesureInactive:
+    """Remplace Mesure quand l'instrumentation est coupée : ne fait rien."""
+
+    __slots__ = ("taille",)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erreur):
+        return False
+
+
+_INACTIVE = _MesureInactive()
+
+
+def _etapes_en_cours():
+    if not hasattr(_pile, "etapes"):
+        _pile.etapes = []
+    return _pile.etapes
+
+
+def mesurer(etape, taille=None):
+    """Gestionnaire de contexte : `with mesurer("lecture DXF", len(data)): ...`."""
+    if not _etat["actif"]:
+        return _INACTIVE
+    return Mesure(etape, taille)
+
+
+def instrumenter(etape=None, taille=None):
+    """
+    Décorateur : chaque appel de la fonction est une étape mesurée. etape :
+    nom affiché (par défaut module.fonction) ; taille : fonction des mêmes
+    arguments qui renvoie la taille de l'entrée, appelée seulement si
+    l'instrumentation est active.
+    """
+    def decorer(fonction):
+        nom = etape or f"{fonction.__module__.rsplit('.', 1)[-1]}.{fonction.__qualname__}"
+
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            if not _etat["actif"]:
+                return fonction(*args, **kwargs)
+            with Mesure(nom, taille(*args, **kwargs) if taille else None):
+                return fonction(*args, **kwargs)
+        return enveloppe
+    return decorer
+
+
+def mesures():
+    """Mesures gardées, de la plus ancienne à la plus récente."""
+    return list(_mesures)
+
+
+def vider():
+    _mesures.clear()
+
+
+def resume(lignes=None):
+    """Par étape : nombre d'appels, durées totale et maximale, plus grand pic mémoire et plus grande entrée."""
+    etapes = {}
+    for m in mesures() if lignes is None else lignes:
+        r = etapes.setdefault(m["etape"], {"etape": m["etape"], "appels": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                           "pic_memoire_ko": None, "taille_max": None})
+        r["appels"] += 1
+        r["total_ms"] += m["duree_ms"]
+        r["max_ms"] = max(r["max_ms"], m["duree_ms"])
+        for cle, valeur in (("pic_memoire_ko", m["pic_memoire_ko"]), ("taille_max", m["taille"])):
+            if isinstance(valeur, (int, float)):
+                r[cle] = valeur if r[cle] is None else max(r[cle], valeur)
+    return sorted(etapes.values(), key=lambda r: -r["total_ms"])
+
+
+def exporter_jsonl(fichier, lignes=None):
+    """Écrit une mesure JSON par ligne dans `fichier` (chemin ou flux texte)."""
+    if isinstance(fichier, (str, bytes)) or hasattr(fichier, "__fspath__"):
+        with open(fichier, "w", encoding="utf-8") as f:
+            return exporter_jsonl(f, lignes)
+    for m in mesures() if lignes is None else lignes:
+        fichier.write(json.dumps(m, ensure_ascii=False, default=str) + "\n")
+
+
+def panneau_debug():
+    """
+    Panneau « Instrumentation » de la barre latérale (Streamlit) : activation,
+    mesures du dernier affichage et cumul par étape, export JSON lines. À
+    appeler en fin de page, pour voir les étapes de l'affichage courant.
+    """
+    import streamlit as st
+
+    with st.sidebar.expander("⏱️ Instrumentation"):
+        def basculer():
+            activer(st.session_state["instrumentation_active"], st.session_state["instrumentation_memoire"])
+
+        st.session_state["instrumentation_active"] = est_actif()
+        st.session_state["instrumentation_memoire"] = memoire_mesuree()
+        st.checkbox("Mesurer les étapes", key="instrumentation_active", on_change=basculer)
+        st.checkbox("Pic mémoire (tracemalloc, plus lent)", key="instrumentation_memoire", on_change=basculer,
+                    disabled=not est_actif())
+        lignes = mesures()
+        if not lignes:
+            st.caption("Aucune mesure.")
+            return
+
+        debut_affichage = st.session_state.get("instrumentation_rerun", 0.0)
+        st.session_state["instrumentation_rerun"] = time.time()
+        recentes = [m for m in lignes if m["horodatage"] >= debut_affichage]
+        st.markdown("**Dernier affichage**")
+        st.dataframe([{"Étape": m["etape"], "Durée (ms)": round(m["duree_ms"], 2),
+                       "Pic mémoire (Ko)": None if m["pic_memoire_ko"] is None else round(m["pic_memoire_ko"]),
+                       "Taille": m["taille"]} for m in reversed(recentes)], use_container_width=True)
+        st.markdown("**Cumul par étape**")
+        st.dataframe([{"Étape": r["etape"], "Appels": r["appels"], "Total (ms)": round(r["total_ms"], 1),
+                       "Max (ms)": round(r["max_ms"], 1),
+                       "Pic mémoire (Ko)": None if r["pic_memoire_ko"] is None else round(r["pic_memoire_ko"]),
+                       "Taille max": r["taille_max"]} for r in resume(lignes)], use_container_width=True)
+
+        texte = io.StringIO()
+        exporter_jsonl(texte, lignes)
+        st.download_button("📥 Mesures (JSON lines)", texte.getvalue(), file_name="mesures.jsonl",
+                           mime="application/jsonl")
+        if st.button("Effacer les mesures"):
+            vider()
+            st.rerun()
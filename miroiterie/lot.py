@@ -0,0 +1,161 @@
+"""
+Rectangle englobant minimal d'un lot de fichiers DXF (dossier, archive zip...).
+
+Chaque fichier est analysé dans un processus séparé ; les résultats sont écrits
+au fil de l'eau dans un fichier CSV ou XLSX. Utilisation sans interface :
+
+    python -m miroiterie.lot pieces/ autres.zip -o resultats.xlsx -j 8
+"""
+import argparse
+import csv
+import os
+import sys
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from miroiterie.contours import aire, enveloppe_convexe, reconstruire_contours
+from miroiterie.dxf_cache import lire_dxf_bytes
+from miroiterie.dxf_geometrie import extraire_geometrie
+from miroiterie.rectangle import dimensions_rectangle, minimum_bounding_rectangle
+
+COLONNES = ["fichier", "largeur_mm", "hauteur_mm", "aire_rectangle_mm2", "aire_forme_mm2",
+            "taux_chute", "trous", "erreur"]
+
+
+def analyser_dxf(nom, data, resolution=20):
+    """Analyse d'un fichier DXF (contenu en bytes) -> une ligne du tableau de résultats."""
+    ligne = dict.fromkeys(COLONNES, "")
+    ligne["fichier"] = nom
+    try:
+        geometrie = extraire_geometrie(lire_dxf_bytes(data), segments_par_tour=resolution)
+        contours = reconstruire_contours(geometrie)
+        if contours.exterieur is None:
+            raise ValueError("aucun contour fermé")
+        rect = minimum_bounding_rectangle(enveloppe_convexe(contours.exterieur))
+        largeur, hauteur = dimensions_rectangle(rect)
+        aire_rectangle = largeur * hauteur
+        aire_forme = abs(aire(contours.exterieur)) - sum(abs(aire(t)) for t in contours.trous)
+        ligne.update({
+            "largeur_mm": round(largeur, 2),
+            "hauteur_mm": round(hauteur, 2),
+            "aire_rectangle_mm2": round(aire_rectangle, 2),
+            "aire_forme_mm2": round(aire_forme, 2),
+            "taux_chute": round(1 - aire_forme / aire_rectangle, 4) if aire_rectangle else "",
+            "trous": len(contours.trous),
+        })
+    except Exception as e:
+        ligne["erreur"] = " ".join(str(e).split()) or type(e).__name__
+    return ligne
+
+
+def _analyser(args):
+    return analyser_dxf(*args)
+
+
+def sources_dxf(chemins):
+    """
+    Parcourt fichiers, dossiers (récursivement) et archives zip ; produit des
+    couples (nom, contenu) un par un pour ne pas tout charger en mémoire.
+    """
+    for chemin in chemins:
+        if os.path.isdir(chemin):
+            for dossier, _, fichiers in os.walk(chemin):
+                yield from sources_dxf(os.path.join(dossier, f) for f in sorted(fichiers)
+                                       if f.lower().endswith((".dxf", ".zip")))
+        elif chemin.lower().endswith(".zip"):
+            with zipfile.ZipFile(chemin) as archive:
+                yield from sources_zip(archive)
+        else:
+            with open(chemin, "rb") as f:
+                yield os.path.basename(chemin), f.read()
+
+
+def sources_zip(archive):
+    """Couples (nom, contenu) des fichiers .dxf d'une archive zip ouverte."""
+    for membre in archive.infolist():
+        if not membre.is_dir() and membre.filename.lower().endswith(".dxf"):
+            yield membre.filename, archive.read(membre)
+
+
+def executer_lot(sources, processus=None, resolution=20, progression=None):
+    """
+    Analyse les sources (nom, contenu) dans un pool de processus et produit
+    les lignes de résultat dans l'ordre où elles se terminent. Le nombre de
+    fichiers en attente est borné pour garder une mémoire constante.
+    progression(nb_termines, ligne) est appelée après chaque fichier.
+    """
+    processus = processus or os.cpu_count() or 1
+    en_attente_max = 2 * processus
+    sources = iter(sources)
+    termines = 0
+    with ProcessPoolExecutor(max_workers=processus) as pool:
+        en_cours = set()
+        epuise = False
+        while en_cours or not epuise:
+            while not epuise and len(en_cours) < en_attente_max:
+                try:
+                    nom, data = next(sources)
+                except StopIteration:
+                    epuise = True
+                    break
+                en_cours.add(pool.submit(_analyser, (nom, data, resolution)))
+            if not en_cours:
+                break
+            faits, en_cours = wait(en_cours, return_when=FIRST_COMPLETED)
+            for futur in faits:
+                ligne = futur.result()
+                termines += 1
+                if progression:
+                    progression(termines, ligne)
+                yield ligne
+
+
+def ecrire_csv(lignes, fichier, colonnes=COLONNES):
+    """Écrit les lignes dans un flux texte CSV (séparateur « ; » pour Excel FR)."""
+    writer = csv.DictWriter(fichier, fieldnames=colonnes, delimiter=";", extrasaction="ignore")
+    writer.writeheader()
+    nb = 0
+    for ligne in lignes:
+        writer.writerow(ligne)
+        nb += 1
+    return nb
+
+
+def ecrire_xlsx(lignes, fichier, colonnes=COLONNES, nom_feuille="Rectangles"):
+    """Écrit les lignes dans un classeur XLSX en mode flux (openpyxl write_only)."""
+    from openpyxl import Workbook
+
+    classeur = Workbook(write_only=True)
+    feuille = classeur.create_sheet(nom_feuille)
+    feuille.append(colonnes)
+    nb = 0
+    for ligne in lignes:
+        feuille.append([ligne.get(c, "") for c in colonnes])
+        nb += 1
+    classeur.save(fichier)
+    return nb
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rectangle englobant minimal d'un lot de DXF.")
+    parser.add_argument("chemins", nargs="+", help="fichiers .dxf, dossiers ou archives .zip")
+    parser.add_argument("-o", "--sortie", default="rectangles.csv", help="fichier .csv ou .xlsx")
+    parser.add_argument("-j", "--processus", type=int, default=None, help="nombre de processus (défaut : nb de cœurs)")
+    parser.add_argument("--resolution", type=int, default=20, help="segments par tour complet pour les arcs")
+    args = parser.parse_args(argv)
+
+    def progression(n, ligne):
+        etat = ligne["erreur"] or f"{ligne['largeur_mm']} x {ligne['hauteur_mm']}"
+        print(f"[{n}] {ligne['fichier']} : {etat}", file=sys.stderr)
+
+    lignes = executer_lot(sources_dxf(args.chemins), args.processus, args.resolution, progression)
+    if args.sortie.lower().endswith(".xlsx"):
+        nb = ecrire_xlsx(lignes, args.sortie)
+    else:
+        with open(args.sortie, "w", newline="", encoding="utf-8-sig") as f:
+            nb = ecrire_csv(lignes, f)
+    print(f"{nb} fichier(s) -> {args.sortie}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Profils de tôles pliées : géométrie, largeur développée et poids.
+
+Un profil est une suite d'ailes (cotes A, B, C... de la page « Commande de
+Tôles ») reliées par des plis. Les cotes sont extérieures, prises jusqu'à
+l'intersection virtuelle des faces extérieures (arête vive). La largeur
+développée retranche à leur somme la compensation de chaque pli
+(DIN 6935) :
+
+    v = φ (r + k s / 2) - 2 (r + s) tan(φ / 2)
+
+φ angle de pliage (90° pour une équerre), r rayon intérieur, s épaisseur,
+k facteur de correction de la fibre neutre, k = 0,65 + 0,5 log10(r / s)
+borné à [0,5 ; 1]. Le rayon intérieur vaut par défaut l'épaisseur (outil
+standard de presse plieuse).
+"""
+import math
+import re
+from dataclasses import dataclass, field
+
+# Masse volumique (kg/dm³)
+DENSITES = {"Aluminium": 2.70, "Acier": 7.85, "Inox": 7.93}
+
+# Rayon intérieur de pliage par défaut, en nombre d'épaisseurs
+RAYON_RELATIF = 1.0
+
+
+@dataclass
+class Profil:
+    cotes: tuple                # noms des cotes, dans l'ordre des ailes
+    plis: tuple = ()            # angle de chaque pli en degrés, signé (+ : à gauche, - : à droite)
+    orientation: float = 0.0    # direction de la première aile en degrés (0 : vers la droite), pour le dessin
+
+
+PROFILS = {
+    "Cornière": Profil(("A", "B"), (90,), orientation=180),
+    "Profil Z": Profil(("A", "B", "C"), (90, -90)),
+    "Seuil": Profil(("Largeur",)),
+    "Tôle en U": Profil(("A", "B", "C"), (90, 90), orientation=-90),
+}
+
+
+@dataclass
+class Developpe:
+    largeur: float              # largeur développée (mm)
+    epaisseur: float            # mm
+    rayon: float                # rayon intérieur de pliage (mm)
+    lignes_pli: list = field(default_factory=list)   # position de l'axe de chaque pli sur le flan (mm)
+    poids: float = None         # kg par pièce (None si métal inconnu)
+
+
+def epaisseur_mm(tole):
+    """Épaisseur en mm : « 15/10ème » -> 1.5, « Autre » -> valeur saisie (epaisseur_mm), sinon None."""
+    texte = str(tole.get("epaisseur", ""))
+    dixiemes = re.match(r"\s*(\d+(?:[.,]\d+)?)\s*/\s*10", texte)
+    if dixiemes:
+        return float(dixiemes.group(1).replace(",", ".")) / 10
+    valeur = tole.get("epaisseur_mm")
+    if valeur is None:
+        try:
+            valeur = float(texte.replace(",", "."))
+        except ValueError:
+            return None
+    return float(valeur) if valeur and valeur > 0 else None
+
+
+def facteur_k(rayon, epaisseur):
+    """Facteur de correction de la fibre neutre (DIN 6935)."""
+    if rayon <= 0:
+        return 0.5
+    return min(max(0.65 + 0.5 * math.log10(rayon / epaisseur), 0.5), 1.0)
+
+
+def _retrait(angle, epaisseur, rayon):
+    """Longueur d'aile absorbée de chaque côté du pli (de l'arête vive à la fin de la partie plane)."""
+    return (rayon + epaisseur) * math.tan(math.radians(abs(angle)) / 2)
+
+
+def _longueur_pli(angle, epaisseur, rayon):
+    """Longueur de la fibre neutre dans le pli."""
+    return math.radians(abs(angle)) * (rayon + facteur_k(rayon, epaisseur) * epaisseur / 2)
+
+
+def compensation(angle, epaisseur, rayon):
+    """Compensation v d'un pli (négative pour un pli ordinaire), à ajouter à la somme des cotes."""
+    return _longueur_pli(angle, epaisseur, rayon) - 2 * _retrait(angle, epaisseur, rayon)
+
+
+def ligne_profil(forme, dimensions):
+    """
+    Section du profil en arêtes vives : liste des n + 1 sommets (x, y) en mm,
+    y vers le haut, une aile par segment. Lève ValueError si la forme ou une
+    cote manque.
+    """
+    profil = PROFILS.get(forme)
+    if profil is None:
+        raise ValueError(f"forme inconnue : {forme}")
+    try:
+        cotes = [float(dimensions[nom]) for nom in profil.cotes]
+    except KeyError as e:
+        raise ValueError(f"cote manquante : {e.args[0]}") from None
+    sommets, direction = [(0.0, 0.0)], profil.orientation
+    for i, cote in enumerate(cotes):
+        if i > 0:
+            direction += profil.plis[i - 1]
+        x, y = sommets[-1]
+        # Arrondi : plis droits sans résidu de cos / sin (0,000...01 mm)
+        sommets.append((round(x + cote * math.cos(math.radians(direction)), 9),
+                        round(y + cote * math.sin(math.radians(direction)), 9)))
+    return sommets
+
+
+def developper(tole, rayon=None):
+    """
+    Développé d'une tôle (dictionnaire de la page « Commande de Tôles ») :
+    largeur du flan, position des lignes de pli et poids d'une pièce.
+    Lève ValueError si la forme, une cote ou l'épaisseur manque.
+    """
+    profil = PROFILS.get(tole["forme"])
+    if profil is None:
+        raise ValueError(f"forme inconnue : {tole['forme']}")
+    epaisseur = epaisseur_mm(tole)
+    if epaisseur is None:
+        raise ValueError(f"épaisseur inconnue : {tole.get('epaisseur')}")
+    try:
+        cotes = [float(tole["dimensions"][nom]) for nom in profil.cotes]
+    except KeyError as e:
+        raise ValueError(f"cote manquante : {e.args[0]}") from None
+    rayon = RAYON_RELATIF * epaisseur if rayon is None else rayon
+
+    # Parcours du flan : partie plane de chaque aile, puis le pli qui la suit
+    lignes_pli, position = [], 0.0
+    for i, cote in enumerate(cotes):
+        plane = cote
+        if i > 0:
+            plane -= _retrait(profil.plis[i - 1], epaisseur, rayon)
+        if i < len(profil.plis):
+            plane -= _retrait(profil.plis[i], epaisseur, rayon)
+        position += plane
+        if i < len(profil.plis):
+            longueur_pli = _longueur_pli(profil.plis[i], epaisseur, rayon)
+            lignes_pli.append(position + longueur_pli / 2)
+            position += longueur_pli
+
+    densite = DENSITES.get(tole.get("metal"))
+    poids = None if densite is None else position * float(tole["longueur"]) * epaisseur * densite * 1e-6
+    return Developpe(position, epaisseur, rayon, lignes_pli, poids)
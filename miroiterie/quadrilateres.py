@@ -0,0 +1,558 @@
+"""
+Résolution de quadrilatères ABCD à partir de mesures au choix : côtés (ab, bc,
+cd, da), angles intérieurs (angle_a ... angle_d, en degrés) et diagonales (ac, bd).
+
+Cinq mesures indépendantes fixent un quadrilatère (8 coordonnées moins 3 pour
+la position). La figure est d'abord construite directement quand c'est
+possible : quatrième angle déduit des trois autres, diagonales par la loi des
+cosinus, puis B, C et D placés par intersection de cercles ou de demi-droites.
+Une demi-droite peut couper un cercle deux fois : chaque combinaison
+d'intersections est construite, et la figure exacte et convexe retenue. Les
+autres combinaisons sont résolues par Newton amorti (Levenberg-Marquardt),
+toutes les lignes d'un lot à la fois. Avec plus de cinq mesures, la solution
+est celle des moindres carrés : l'écart résiduel dit si les données se
+contredisent. Avec moins, ou des mesures liées, la figure est indéterminée
+(écart NaN).
+
+Newton essaie plusieurs figures de départ tant qu'il ne trouve pas de figure
+exacte et convexe ; s'il n'a trouvé qu'une figure exacte non convexe, une
+grille plus fine d'angles et de côtés de départ est essayée avant de s'en
+contenter. Une figure non convexe (sommet rentrant, côtés croisés) est alors
+rendue marquée comme telle (convexes) : les mesures ne décrivent pas la pièce
+attendue.
+
+Certaines mesures admettent deux figures convexes (trois côtés et les angles A
+et B : la demi-droite du côté manquant coupe deux fois un cercle). L'une est
+rendue, et la ligne est marquée ambiguë : à l'utilisateur d'ajouter une mesure
+(diagonale...) qui les départage.
+
+    q = resoudre_quadrilateres(ab=[1000, 800], bc=600, cd=[1000, 700], da=600, angle_a=[60, 75])
+    q.sommets, q.ecarts, q.ambigues, q.convexes, q.mesures["angle_c"]
+
+Repère : A à l'origine, B sur l'axe x, C et D au-dessus (sens trigonométrique,
+figure convexe quand les mesures le permettent).
+"""
+import itertools
+from dataclasses import dataclass
+
+import numpy as np
+
+COTES = ("ab", "bc", "cd", "da")
+DIAGONALES = ("ac", "bd")
+ANGLES = ("angle_a", "angle_b", "angle_c", "angle_d")
+MESURES = COTES + DIAGONALES + ANGLES
+
+ITERATIONS_MAX = 60
+
+# Écart relatif (à l'échelle de la pièce) sous lequel une solution est exacte
+PRECISION = 1e-10
+
+# Rapport des valeurs singulières extrêmes du jacobien sous lequel la figure est indéterminée
+CONDITIONNEMENT_MIN = 1e-7
+
+# Figures de départ de Newton, essayées tour à tour : angles A et B (degrés) et côtés inconnus (fraction de l'échelle)
+DEPARTS = tuple((a, b, f) for f in (1.0, 0.5, 1.5) for a, b in ((90.0, 90.0), (60.0, 60.0), (120.0, 120.0),
+                                                               (60.0, 120.0), (120.0, 60.0), (45.0, 45.0),
+                                                               (135.0, 135.0), (45.0, 135.0), (135.0, 45.0)))
+
+# Pénalité (relative à l'échelle) d'une solution non convexe : à écart égal, la figure convexe l'emporte
+PENALITE_NON_CONVEXE = 1e-6
+
+# Grille de départs quand les DEPARTS ne donnent qu'une figure exacte non convexe : valeurs de chaque
+# inconnue parmi les angles A, B (degrés) et les côtés AB, BC, DA (fraction de l'échelle)
+VALEURS_ANGLES = (30.0, 60.0, 90.0, 120.0, 150.0)
+VALEURS_LONGUEURS = (0.1, 0.25, 0.5, 1.0, 1.5)
+
+# Écart relatif (à l'échelle) sous lequel une autre figure vérifie aussi les mesures, et distance relative
+# entre sommets au-delà de laquelle elle est bien une autre figure : mesures ambiguës
+ECART_AMBIGUITE = 1e-7
+DISTANCE_AMBIGUITE = 1e-4
+
+# Recherche d'une seconde figure (lignes résolues par Newton) : décalages de départ (fraction de l'échelle)
+# et itérations de Newton par départ
+PAS_AMBIGUITE = (0.05, 0.2, 0.5)
+ITERATIONS_AMBIGUITE = 15
+
+
+@dataclass
+class Quadrilateres:
+    sommets: np.ndarray     # (N, 4, 2) A, B, C, D
+    ecarts: np.ndarray      # (N,) plus grand écart aux mesures données (mm, angles ramenés à l'échelle) ; NaN : indéterminé
+    mesures: dict           # nom -> (N,) toutes les mesures de la figure obtenue
+    directes: np.ndarray    # (N,) figure construite directement (sinon Newton)
+    ambigues: np.ndarray    # (N,) une autre figure convexe vérifie aussi les mesures (sommets : l'une d'elles)
+    convexes: np.ndarray    # (N,) figure obtenue convexe (sinon aucune figure convexe trouvée : sommet rentrant
+                            #      ou côtés croisés, même à écart nul)
+
+
+def mesures(sommets):
+    """Côtés, diagonales et angles intérieurs (degrés) de quadrilatères (N, 4, 2)."""
+    A, B, C, D = (sommets[:, k] for k in range(4))
+    resultat = {nom: np.hypot(*(Q - P).T) for nom, (P, Q) in zip(
+        COTES + DIAGONALES, ((A, B), (B, C), (C, D), (D, A), (A, C), (B, D)))}
+    for nom, (O, P, Q) in zip(ANGLES, ((D, A, B), (A, B, C), (B, C, D), (C, D, A))):
+        # Angle de P->Q à P->O dans le sens trigonométrique : > 180° pour un sommet rentrant
+        u, v = Q - P, O - P
+        angle = np.arctan2(u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0], np.einsum("ij,ij->i", u, v))
+        resultat[nom] = np.degrees(np.mod(angle, 2 * np.pi))
+    return resultat
+
+
+def _sommets(x):
+    """Inconnues (N, 5) = (ab, cx, cy, dx, dy) -> sommets (N, 4, 2)."""
+    zeros = np.zeros(len(x))
+    return np.stack((np.stack((zeros, zeros), -1), np.stack((x[:, 0], zeros), -1), x[:, 1:3], x[:, 3:5]), axis=1)
+
+
+def _residus(x, donnees, connues, echelle, parallele, racines=None):
+    """
+    Écarts (N, m) entre la figure x et les mesures données (0 pour les inconnues).
+    racines (N, 5) : solutions déjà trouvées, écartées par déflation (écarts
+    multipliés par 1 + (échelle / distance à la racine)², infinis sur elle).
+    """
+    obtenues = mesures(_sommets(x))
+    colonnes = []
+    for k, nom in enumerate(MESURES):
+        ecart = obtenues[nom] - np.where(connues[:, k], donnees[:, k], 0.0)
+        if nom in ANGLES:
+            # Écart d'angle ramené dans ]-180, 180] puis converti en longueur à l'échelle de la pièce
+            ecart = np.radians((ecart + 180) % 360 - 180) * echelle
+        colonnes.append(np.where(connues[:, k], ecart, 0.0))
+    if parallele:
+        colonnes.append(x[:, 2] - x[:, 4])
+    ecarts = np.column_stack(colonnes)
+    if racines is not None:
+        with np.errstate(divide="ignore"):
+            ecarts = ecarts * (1 + (echelle / np.hypot.reduce(x - racines, axis=1)) ** 2)[:, None]
+    return ecarts
+
+
+# --- Construction directe ---
+
+def _cercles(P, r1, Q, r2, cote):
+    """Point à r1 de P et r2 de Q, à gauche (cote > 0) ou à droite de P->Q ; NaN si les cercles sont disjoints."""
+    u = Q - P
+    d = np.hypot(*u.T)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = (r1 * r1 - r2 * r2 + d * d) / (2 * d)
+        h = np.sqrt(r1 * r1 - a * a)
+        u = u / d[:, None]
+    normale = np.column_stack((-u[:, 1], u[:, 0]))
+    return P + a[:, None] * u + (np.sign(cote) * h)[:, None] * normale
+
+
+def _demi_droites(P, angle_p, Q, angle_q):
+    """Intersection des demi-droites issues de P et Q (directions en radians) ; NaN si elles ne se coupent pas."""
+    u = np.column_stack((np.cos(angle_p), np.sin(angle_p)))
+    v = np.column_stack((np.cos(angle_q), np.sin(angle_q)))
+    w = Q - P
+    with np.errstate(divide="ignore", invalid="ignore"):
+        det = u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]
+        t = (w[:, 0] * v[:, 1] - w[:, 1] * v[:, 0]) / det
+        s = (w[:, 0] * u[:, 1] - w[:, 1] * u[:, 0]) / det
+    return np.where(((t > 0) & (s > 0))[:, None], P + t[:, None] * u, np.nan)
+
+
+def _polaire(origine, longueur, angle):
+    return origine + longueur[:, None] * np.column_stack((np.cos(angle), np.sin(angle)))
+
+
+def _cote(P, Q, R):
+    """Signe du côté de R par rapport à P->Q (> 0 : à gauche)."""
+    return np.sign((Q - P)[:, 0] * (R - P)[:, 1] - (Q - P)[:, 1] * (R - P)[:, 0])
+
+
+def _direction(P, Q):
+    return np.arctan2(Q[:, 1] - P[:, 1], Q[:, 0] - P[:, 0])
+
+
+def _demi_droite_cercle(P, angle, Q, r):
+    """
+    Abscisses t > 0 (proche, loin) des points P + t (cos, sin)(angle) à la
+    distance r de Q ; NaN pour une intersection absente ou derrière P.
+    """
+    u = np.column_stack((np.cos(angle), np.sin(angle)))
+    w = Q - P
+    projection = np.einsum("ij,ij->i", w, u)
+    with np.errstate(invalid="ignore"):
+        demi_corde = np.sqrt(r * r - np.einsum("ij,ij->i", w, w) + projection * projection)
+    t = np.column_stack((projection - demi_corde, projection + demi_corde))
+    return np.where(t > 0, t, np.nan)
+
+
+def _sur_demi_droite(P, angle, Q, r, branche):
+    """
+    Point de la demi-droite issue de P (direction en radians) à r de Q :
+    intersection proche (branche 0) ou lointaine (1), la seule s'il n'y en a
+    qu'une. Renvoie aussi (N,) : les deux intersections existent.
+    """
+    t = _demi_droite_cercle(P, angle, Q, r)
+    t = np.where(np.isnan(t[:, :1]), t[:, ::-1], t)
+    return _polaire(P, t[:, branche], angle), np.isfinite(t).all(axis=1)
+
+
+def _cote_manquant(m, ambigues):
+    """
+    Côté DA ou AB seul inconnu, avec les trois autres côtés et les angles A et B
+    (cinq mesures exactement) : demi-droite et cercle, jusqu'à deux solutions.
+    Chaque solution est construite ; la figure convexe est retenue, et les
+    lignes où les deux le sont sont marquées dans `ambigues`. Complète m.
+    """
+    n = len(m["ab"])
+    nb_connues = np.sum([np.isfinite(m[nom]) for nom in MESURES], axis=0)
+    a, b = np.radians(m["angle_a"]), np.radians(m["angle_b"])
+    for cote, autres in (("da", ("ab", "bc", "cd")), ("ab", ("bc", "cd", "da"))):
+        lignes = np.isnan(m[cote]) & (nb_connues == 5) & np.all([np.isfinite(m[nom]) for nom in autres + ANGLES[:2]],
+                                                                axis=0)
+        if not lignes.any():
+            continue
+        v = np.column_stack((np.cos(np.pi - b), np.sin(np.pi - b)))
+        if cote == "da":
+            # D sur la demi-droite d'angle A, à cd de C
+            C = np.column_stack((m["ab"], np.zeros(n))) + m["bc"][:, None] * v
+            t = _demi_droite_cercle(np.zeros((n, 2)), a, C, m["cd"])
+        else:
+            # B sur l'axe x, C = B + bc v à cd de D : B à cd de D - bc v
+            D = _polaire(np.zeros((n, 2)), m["da"], a)
+            t = _demi_droite_cercle(np.zeros((n, 2)), np.zeros(n), D - m["bc"][:, None] * v, m["cd"])
+        convexes = []
+        for k in range(2):
+            essai = dict(m)
+            essai[cote] = np.where(lignes, t[:, k], m[cote])
+            sommets = _construire(essai, False, cote_manquant=False)[0]
+            convexes.append(np.isfinite(t[:, k]) & np.isfinite(sommets).all(axis=(1, 2))
+                            & np.all([angle < 180 for nom, angle in mesures(sommets).items() if nom in ANGLES], axis=0))
+        choisi = np.where(convexes[0] | np.isnan(t[:, 1]), t[:, 0], t[:, 1])
+        m[cote] = np.where(lignes, choisi, m[cote])
+        ambigues |= lignes & convexes[0] & convexes[1]
+    return m
+
+
+def _premier(*candidats):
+    """Premier point défini (sans NaN) parmi les candidats, ligne par ligne."""
+    point = candidats[0]
+    for candidat in candidats[1:]:
+        point = np.where(np.isnan(point).any(axis=1)[:, None], candidat, point)
+    return point
+
+
+def _deduire(m):
+    """Complète les mesures qui se déduisent des autres : quatrième angle, diagonales (loi des cosinus)."""
+    angles = np.column_stack([m[nom] for nom in ANGLES])
+    manquants = np.isnan(angles)
+    un_seul = manquants.sum(axis=1) == 1
+    for k, nom in enumerate(ANGLES):
+        m[nom] = np.where(un_seul & manquants[:, k], 360 - np.nansum(angles, axis=1), m[nom])
+    for diagonale, angle, cote1, cote2 in (("bd", "angle_a", "ab", "da"), ("ac", "angle_b", "ab", "bc"),
+                                          ("bd", "angle_c", "bc", "cd"), ("ac", "angle_d", "cd", "da")):
+        with np.errstate(invalid="ignore"):
+            deduite = np.sqrt(m[cote1] ** 2 + m[cote2] ** 2
+                              - 2 * m[cote1] * m[cote2] * np.cos(np.radians(m[angle])))
+        m[diagonale] = np.where(np.isnan(m[diagonale]), deduite, m[diagonale])
+    return m
+
+
+def _construire(m, parallele, cote_manquant=True, branches=(0, 0, 0)):
+    """
+    Sommets (N, 4, 2) construits règle et compas à partir des mesures
+    (nom -> tableau, NaN pour une inconnue) ; NaN là où c'est impossible.
+    B, C ou D placé sur une demi-droite à une distance donnée d'un autre
+    sommet prend l'intersection proche ou lointaine selon `branches` (B, C, D).
+    Renvoie aussi (N,) : deux figures convexes possibles (mesures ambiguës),
+    et (N,) : une demi-droite a coupé son cercle deux fois (les autres
+    branches donnent une autre figure).
+    """
+    n = len(m["ab"])
+    ambigues = np.zeros(n, dtype=bool)
+    doubles = np.zeros(n, dtype=bool)
+    if cote_manquant and not parallele:
+        m = _cote_manquant(dict(m), ambigues)
+    m = _deduire(dict(m))
+    A = np.zeros((n, 2))
+    a, b, c, d = (np.radians(m[nom]) for nom in ANGLES)
+    if not parallele:
+        # AB inconnu : B sur l'axe x, à bd de D placé depuis A
+        B, deux = _sur_demi_droite(A, np.zeros(n), _polaire(A, m["da"], a), m["bd"], branches[0])
+        libre = np.isnan(m["ab"]) & np.isfinite(B[:, 0])
+        doubles |= libre & deux
+        m["ab"] = np.where(libre, B[:, 0], m["ab"])
+        m = _deduire(m)
+    B = np.column_stack((m["ab"], np.zeros(n)))
+
+    if parallele:
+        # AB ‖ CD : triangle de base ab - cd et de côtés da, bc, ou hauteur par les angles A et B
+        e = m["ab"] - m["cd"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dx = (m["da"] ** 2 - m["bc"] ** 2 + e * e) / (2 * e)
+            h = _premier(np.sqrt(m["da"] ** 2 - dx * dx)[:, None],
+                         (e / (1 / np.tan(a) + 1 / np.tan(b)))[:, None])[:, 0]
+            dx = np.where(np.isnan(dx), h / np.tan(a), dx)
+        D = np.column_stack((dx, h))
+        return np.stack((A, B, D + np.column_stack((m["cd"], np.zeros(n))), D), axis=1), ambigues, doubles
+
+    # C et D depuis A et B
+    C = _premier(_cercles(A, m["ac"], B, m["bc"], 1), _polaire(B, m["bc"], np.pi - b))
+    D = _premier(_cercles(A, m["da"], B, m["bd"], 1), _polaire(A, m["da"], a))
+    # Le sommet manquant depuis l'autre : du côté qui garde la figure convexe
+    C = _premier(C,
+                 _cercles(B, m["bc"], D, m["cd"], -_cote(B, D, A)),
+                 _cercles(A, m["ac"], D, m["cd"], _cote(A, D, B)),
+                 _demi_droites(B, np.pi - b, D, _direction(D, A) + d))
+    D = _premier(D,
+                 _cercles(A, m["da"], C, m["cd"], -_cote(A, C, B)),
+                 _cercles(B, m["bd"], C, m["cd"], _cote(B, C, A)),
+                 _demi_droites(A, a, C, _direction(C, B) - c))
+    # Sinon sur la demi-droite de l'angle B (C) ou A (D), à une distance donnée d'un sommet placé
+    for Q, r in ((A, m["ac"]), (D, m["cd"])):
+        point, deux = _sur_demi_droite(B, np.pi - b, Q, r, branches[1])
+        libre = np.isnan(C).any(axis=1) & np.isfinite(point).all(axis=1)
+        C = np.where(libre[:, None], point, C)
+        doubles |= libre & deux
+    for Q, r in ((B, m["bd"]), (C, m["cd"])):
+        point, deux = _sur_demi_droite(A, a, Q, r, branches[2])
+        libre = np.isnan(D).any(axis=1) & np.isfinite(point).all(axis=1)
+        D = np.where(libre[:, None], point, D)
+        doubles |= libre & deux
+
+    # Quatre angles, AB et CD : D = t u sur AD, C = B + s v sur BC et C - D = cd w (système linéaire)
+    u = np.column_stack((np.cos(a), np.sin(a)))
+    v = np.column_stack((np.cos(np.pi - b), np.sin(np.pi - b)))
+    w = m["cd"][:, None] * np.column_stack((np.cos(a + np.pi + d), np.sin(a + np.pi + d)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        det = -v[:, 0] * u[:, 1] + v[:, 1] * u[:, 0]
+        second = w - B
+        s = (-second[:, 0] * u[:, 1] + second[:, 1] * u[:, 0]) / det
+        t = (v[:, 0] * second[:, 1] - v[:, 1] * second[:, 0]) / det
+    angles = ((s > 0) & (t > 0) & np.isnan(C).any(axis=1) & np.isnan(D).any(axis=1))[:, None]
+    C = np.where(angles, B + s[:, None] * v, C)
+    D = np.where(angles, t[:, None] * u, D)
+    return np.stack((A, B, C, D), axis=1), ambigues, doubles
+
+
+def _meilleure_branche(m, donnees, connues, echelle, parallele):
+    """
+    Figure construite selon chaque combinaison de branches (intersections
+    proches ou lointaines) : la plus proche des mesures, convexe de
+    préférence. Renvoie (sommets (N, 4, 2), ambiguës (N,) : une autre branche
+    donne une autre figure exacte et convexe).
+    """
+    candidats = np.stack([_construire(m, parallele, branches=branches)[0]
+                          for branches in itertools.product((0, 1), repeat=3)])
+    x = np.concatenate((candidats[:, :, 1, :1], candidats[:, :, 2], candidats[:, :, 3]), axis=-1)
+    ecarts = np.stack([np.abs(_residus(xk, donnees, connues, echelle, parallele)).max(axis=1) for xk in x])
+    convexes = np.stack([_convexes(xk) for xk in x])
+    notes = np.where(np.isfinite(ecarts), ecarts / echelle + np.where(convexes, 0.0, PENALITE_NON_CONVEXE), np.inf)
+    choix = np.argmin(notes, axis=0)
+    lignes = np.arange(len(choix))
+    sommets = candidats[choix, lignes]
+    distances = np.abs(candidats - sommets).max(axis=(2, 3))
+    autres = (ecarts <= ECART_AMBIGUITE * echelle) & convexes & (distances > DISTANCE_AMBIGUITE * echelle)
+    return sommets, autres.any(axis=0) & convexes[choix, lignes]
+
+
+# --- Newton ---
+
+def _depart(donnees, connues, echelle, parallele, angle_a, angle_b, fraction):
+    """
+    Figure de départ de Newton : les mesures connues, les angles proposés et
+    une fraction de l'échelle pour les côtés inconnus (la même pour tous, ou
+    une par côté AB, BC, DA).
+    """
+    def valeur(nom, defaut):
+        k = MESURES.index(nom)
+        return np.where(connues[:, k], donnees[:, k], defaut)
+
+    ab, bc, da = (valeur(nom, f * echelle) for nom, f in zip(("ab", "bc", "da"), np.broadcast_to(fraction, 3)))
+    a, b = np.radians(valeur("angle_a", angle_a)), np.radians(valeur("angle_b", angle_b))
+    D = _polaire(np.zeros((len(ab), 2)), da, a)
+    C = _polaire(np.column_stack((ab, np.zeros(len(ab)))), bc, np.pi - b)
+    if parallele:
+        C[:, 1] = D[:, 1] = (C[:, 1] + D[:, 1]) / 2
+    return np.column_stack((ab, C, D))
+
+
+def _departs_grille(donnees, connues, echelle, parallele):
+    """
+    Départs de Newton en grille : chaque inconnue parmi les angles A, B
+    (VALEURS_ANGLES) et les côtés AB, BC, DA (VALEURS_LONGUEURS) prise
+    indépendamment, les mesures connues telles quelles. Renvoie (lignes,
+    départs (K, 5)).
+    """
+    parametres = ("angle_a", "angle_b", "ab", "bc", "da")
+    inconnues = ~connues[:, [MESURES.index(nom) for nom in parametres]]
+    lignes, departs = [], []
+    for motif in np.unique(inconnues, axis=0):
+        indices = np.flatnonzero((inconnues == motif).all(axis=1))
+        # Une mesure connue n'a qu'une valeur (ignorée par _depart)
+        grilles = [(VALEURS_ANGLES if nom in ANGLES else VALEURS_LONGUEURS) if inconnu else (1.0,)
+                   for nom, inconnu in zip(parametres, motif)]
+        for angle_a, angle_b, *fractions in itertools.product(*grilles):
+            lignes.append(indices)
+            departs.append(_depart(donnees[indices], connues[indices], echelle[indices], parallele, angle_a, angle_b,
+                                   fractions))
+    return np.concatenate(lignes), np.concatenate(departs)
+
+
+def _jacobienne(x, r, donnees, connues, echelle, parallele, racines=None):
+    """Jacobien (N, m, 5) des écarts par différences finies."""
+    colonnes = []
+    h = 1e-7 * echelle
+    for k in range(5):
+        decale = x.copy()
+        decale[:, k] += h
+        colonnes.append((_residus(decale, donnees, connues, echelle, parallele, racines) - r) / h[:, None])
+    return np.stack(colonnes, axis=-1)
+
+
+def _newton(x, donnees, connues, echelle, parallele, racines=None, iterations=ITERATIONS_MAX):
+    """
+    Levenberg-Marquardt vectorisé depuis x (N, 5) ; renvoie (inconnues, écarts (N, m)).
+    racines : voir _residus (les écarts renvoyés sont alors ceux de la déflation).
+    """
+    def cout(r):
+        return np.einsum("ij,ij->i", r, r)
+
+    x = x.copy()
+    r = _residus(x, donnees, connues, echelle, parallele, racines)
+    c = cout(r)
+    amortissement = np.full(len(x), 1e-3)
+    actives = np.ones(len(x), dtype=bool)
+    for _ in range(iterations):
+        actives &= c > (PRECISION * echelle) ** 2
+        if not actives.any():
+            break
+        indices = np.flatnonzero(actives)
+        xa, ra, ea = x[indices], r[indices], echelle[indices]
+        ra_ = None if racines is None else racines[indices]
+        J = _jacobienne(xa, ra, donnees[indices], connues[indices], ea, parallele, ra_)
+        JtJ = np.einsum("nmi,nmj->nij", J, J)
+        g = np.einsum("nmi,nm->ni", J, ra)
+        diagonale = np.einsum("nii->ni", JtJ) + 1e-12 * ea[:, None] ** 2
+        systeme = JtJ + (amortissement[indices, None] * diagonale)[:, :, None] * np.eye(5)
+        pas = -np.linalg.solve(systeme, g[..., None])[..., 0]
+        essai = xa + pas
+        r_essai = _residus(essai, donnees[indices], connues[indices], ea, parallele, ra_)
+        c_essai = cout(r_essai)
+        mieux = c_essai < c[indices]
+        acceptes = indices[mieux]
+        x[acceptes], r[acceptes], c[acceptes] = essai[mieux], r_essai[mieux], c_essai[mieux]
+        amortissement[indices] = np.where(mieux, amortissement[indices] / 3, amortissement[indices] * 4)
+        # Pas négligeable ou amortissement saturé : plus rien à gagner
+        actives[indices] &= (np.abs(pas).max(axis=1) > PRECISION * ea) & (amortissement[indices] < 1e12)
+    return x, r
+
+
+def _convexes(x):
+    return np.all([angle < 180 for nom, angle in mesures(_sommets(x)).items() if nom in ANGLES], axis=0)
+
+
+def _ambigues(x, donnees, connues, echelle, parallele):
+    """
+    (N,) vrai si Newton trouve une autre figure convexe qui vérifie les mesures
+    aussi bien que x (exacte et convexe). Départs : x décalé le long de sa
+    direction la plus libre (plus petite valeur singulière du jacobien), de
+    part et d'autre ; la déflation écarte Newton de x. Recherche bornée : une
+    seconde figure très éloignée peut échapper.
+    """
+    n = len(x)
+    r = _residus(x, donnees, connues, echelle, parallele)
+    direction = np.linalg.svd(_jacobienne(x, r, donnees, connues, echelle, parallele))[2][:, -1]
+    departs = np.concatenate([x + signe * pas * echelle[:, None] * direction
+                              for pas in PAS_AMBIGUITE for signe in (1, -1)])
+    lignes = np.tile(np.arange(n), 2 * len(PAS_AMBIGUITE))
+    x_essai, _ = _newton(departs, donnees[lignes], connues[lignes], echelle[lignes], parallele, x[lignes],
+                         ITERATIONS_AMBIGUITE)
+    ecarts = np.abs(_residus(x_essai, donnees[lignes], connues[lignes], echelle[lignes], parallele)).max(axis=1)
+    distances = np.abs(_sommets(x_essai) - _sommets(x[lignes])).max(axis=(1, 2))
+    autres = ((ecarts <= ECART_AMBIGUITE * echelle[lignes]) & _convexes(x_essai)
+              & (distances > DISTANCE_AMBIGUITE * echelle[lignes]))
+    return np.bincount(lignes[autres], minlength=n) > 0
+
+
+def resoudre_quadrilateres(parallele=False, **donnees):
+    """
+    Quadrilatères fermés à partir des mesures données (noms de MESURES, angles
+    en degrés). Chaque mesure est un scalaire ou un tableau de N valeurs ; NaN
+    (ou une mesure absente) signifie inconnue, ligne par ligne.
+    parallele : impose AB ‖ CD (trapèze) ; quatre mesures suffisent alors.
+    """
+    inconnues = set(donnees) - set(MESURES)
+    if inconnues:
+        raise ValueError(f"mesure(s) inconnue(s) : {', '.join(sorted(inconnues))} (attendu : {', '.join(MESURES)})")
+    valeurs = [np.asarray(donnees.get(nom, np.nan), dtype=float) for nom in MESURES]
+    taille = np.broadcast_shapes(*(v.shape for v in valeurs))
+    donnees = np.column_stack([np.broadcast_to(v, taille).reshape(-1) for v in valeurs])
+    connues = np.isfinite(donnees)
+    n = len(donnees)
+
+    longueurs = np.where(connues[:, :6], donnees[:, :6], 0.0)
+    echelle = longueurs.max(axis=1, initial=0.0)
+    echelle = np.where(echelle > 0, echelle, 1.0)
+
+    # Construction directe quand les mesures s'y prêtent
+    m = {nom: donnees[:, k] for k, nom in enumerate(MESURES)}
+    sommets, ambigues, doubles = _construire(m, parallele)
+    lignes = np.flatnonzero(doubles)
+    if len(lignes):
+        sommets[lignes], deux = _meilleure_branche({nom: v[lignes] for nom, v in m.items()}, donnees[lignes],
+                                                   connues[lignes], echelle[lignes], parallele)
+        ambigues[lignes] |= deux
+    directes = np.isfinite(sommets).all(axis=(1, 2))
+    x = np.column_stack((sommets[:, 1, 0], sommets[:, 2], sommets[:, 3]))
+
+    # Newton partout : immédiat si la construction vérifie déjà toutes les mesures (sinon moindres
+    # carrés depuis la construction), depuis plusieurs figures de départ pour les autres lignes
+    # tant que la solution n'est pas exacte et convexe
+    meilleurs = np.full(n, np.inf)
+    notes = np.full(n, np.inf)
+    residus = np.zeros((n, len(MESURES) + parallele))
+
+    def essayer(lignes, depart):
+        """Newton depuis depart (K, 5) pour les lignes (K,), éventuellement répétées ; garde la meilleure note."""
+        x_essai, r_essai = _newton(depart, donnees[lignes], connues[lignes], echelle[lignes], parallele)
+        ecarts = np.abs(r_essai).max(axis=1)
+        note = ecarts / echelle[lignes] + np.where(_convexes(x_essai), 0.0, PENALITE_NON_CONVEXE)
+        # Meilleur essai de chaque ligne : tri par note, premier indice de chaque ligne
+        ordre = np.lexsort((note, lignes))
+        premiers = ordre[np.unique(lignes[ordre], return_index=True)[1]]
+        garder = premiers[note[premiers] < notes[lignes[premiers]]]
+        mieux = lignes[garder]
+        x[mieux], residus[mieux] = x_essai[garder], r_essai[garder]
+        meilleurs[mieux], notes[mieux] = ecarts[garder], note[garder]
+
+    for k, (angle_a, angle_b, fraction) in enumerate(DEPARTS):
+        lignes = np.flatnonzero(notes > PRECISION)
+        if k:
+            lignes = lignes[~directes[lignes]]
+        if not len(lignes):
+            break
+        depart = _depart(donnees[lignes], connues[lignes], echelle[lignes], parallele, angle_a, angle_b,
+                         fraction)
+        if not k:
+            depart = np.where(directes[lignes, None], x[lignes], depart)
+        essayer(lignes, depart)
+
+    # Figure exacte mais non convexe : avant de s'en contenter, grille de départs plus fine
+    restantes = np.flatnonzero((notes > PRECISION) & (meilleurs <= PRECISION * echelle) & ~directes)
+    if len(restantes):
+        lignes, depart = _departs_grille(donnees[restantes], connues[restantes], echelle[restantes], parallele)
+        essayer(restantes[lignes], depart)
+
+    # Figure indéterminée : mesures insuffisantes ou liées (jacobien de rang < 5)
+    J = _jacobienne(x, residus, donnees, connues, echelle, parallele)
+    valeurs_singulieres = np.linalg.svd(J, compute_uv=False)
+    indeterminees = valeurs_singulieres[:, -1] < CONDITIONNEMENT_MIN * valeurs_singulieres[:, 0]
+    ecarts = np.where(indeterminees, np.nan, meilleurs)
+
+    # Deux figures convexes exactes possibles : signalé. Les constructions directes le savent déjà (deux
+    # intersections d'une demi-droite et d'un cercle) ; les lignes résolues par Newton cherchent une autre
+    # solution en s'écartant de la première.
+    ambigues &= directes & ~indeterminees
+    a_verifier = np.flatnonzero(~directes & ~indeterminees & (notes <= PRECISION))
+    if len(a_verifier):
+        ambigues[a_verifier] = _ambigues(x[a_verifier], donnees[a_verifier], connues[a_verifier],
+                                         echelle[a_verifier], parallele)
+    x[indeterminees] = np.nan
+
+    sommets = _sommets(x)
+    return Quadrilateres(sommets, ecarts, mesures(sommets), directes & ~indeterminees, ambigues, _convexes(x))
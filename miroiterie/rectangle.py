@@ -0,0 +1,128 @@
+"""
+Rectangle englobant de surface minimale d'une forme.
+
+Méthode des pieds à coulisse tournants (rotating calipers) : le rectangle
+minimal a un côté porté par une arête de l'enveloppe convexe. Pour chaque
+arête, les sommets d'appui dans les trois autres directions sont retrouvés
+par recherche dichotomique sur les angles des arêtes (triés sur une enveloppe
+convexe). Toutes les arêtes de toutes les formes sont évaluées en une seule
+passe NumPy (rectangles_minimaux).
+"""
+import math
+
+import numpy as np
+import shapely
+
+from miroiterie.instrumentation import instrumenter
+
+DEUX_PI = 2 * np.pi
+
+
+def _enveloppes(formes):
+    """
+    Enveloppes convexes (shapely, vectorisé) de plusieurs formes, parcourues
+    dans le sens trigonométrique, sans répétition du premier sommet.
+    Renvoie (sommets (S, 2), indice de forme de chaque sommet (S,)).
+    """
+    # Une polyligne par forme (bien plus rapide à créer qu'un nuage de points shapely) ;
+    # une forme réduite à un point est doublée pour former une polyligne valide
+    if isinstance(formes, np.ndarray):
+        if formes.shape[1] == 1:
+            formes = np.concatenate((formes, formes), axis=1)
+        coords = formes.reshape(-1, 2).astype(float, copy=False)
+        indices = np.repeat(np.arange(len(formes)), formes.shape[1])
+    else:
+        formes = [np.asarray(f, dtype=float).reshape(-1, 2) for f in formes]
+        formes = [np.vstack((f, f)) if len(f) == 1 else f for f in formes]
+        coords = np.concatenate(formes)
+        indices = np.repeat(np.arange(len(formes)), [len(f) for f in formes])
+    enveloppes = shapely.convex_hull(shapely.linestrings(coords, indices=indices))
+    enveloppes = shapely.orient_polygons(enveloppes, exterior_cw=False)
+    sommets, appartenance = shapely.get_coordinates(enveloppes, return_index=True)
+
+    # Les polygones répètent leur premier sommet à la fin (segments et points non)
+    nb = np.bincount(appartenance, minlength=len(formes))
+    fins = np.cumsum(nb) - 1
+    polygones = shapely.get_type_id(enveloppes) == 3
+    garde = np.ones(len(sommets), dtype=bool)
+    garde[fins[polygones]] = False
+    return sommets[garde], appartenance[garde]
+
+
+def _calipers(sommets, appartenance, nb_formes):
+    """Évalue toutes les arêtes de toutes les enveloppes et garde la meilleure par forme."""
+    nb = np.bincount(appartenance, minlength=nb_formes)
+    debuts = np.cumsum(nb) - nb
+    rang = np.arange(len(sommets)) - debuts[appartenance]
+    suivant = debuts[appartenance] + (rang + 1) % nb[appartenance]
+
+    # Angle de chaque arête, relatif à la première arête de la forme : croissant sur [0, 2π)
+    aretes = sommets[suivant] - sommets
+    phi = np.arctan2(aretes[:, 1], aretes[:, 0])
+    phi_rel = np.mod(phi - phi[debuts][appartenance], DEUX_PI)
+    phi_rel[rang == 0] = 0.0
+    # Clé globale triée : chaque forme occupe sa propre plage d'angles
+    cle = appartenance * 2 * DEUX_PI + phi_rel
+
+    def appui(decalage):
+        """Sommet le plus loin dans la direction d'angle phi + decalage - π/2, pour chaque arête."""
+        alpha = np.mod(phi_rel + decalage, DEUX_PI)
+        r = np.searchsorted(cle, appartenance * 2 * DEUX_PI + alpha, side="left") - debuts[appartenance]
+        return sommets[debuts[appartenance] + r % nb[appartenance]]
+
+    # u : direction de l'arête (sommet réduit à un point : horizontale), n : normale intérieure
+    u = np.column_stack((np.cos(phi), np.sin(phi)))
+    n = np.column_stack((-u[:, 1], u[:, 0]))
+    a_max = np.einsum("ij,ij->i", u, appui(np.pi / 2))
+    b_max = np.einsum("ij,ij->i", n, appui(np.pi))
+    a_min = np.einsum("ij,ij->i", u, appui(3 * np.pi / 2))
+    b_min = np.einsum("ij,ij->i", n, sommets)
+    aires = (a_max - a_min) * (b_max - b_min)
+
+    # Meilleure arête de chaque forme : première après tri par (forme, aire)
+    ordre = np.lexsort((aires, appartenance))
+    k = ordre[debuts]
+    u, n = u[k], n[k]
+    a_min, a_max, b_min, b_max = a_min[k], a_max[k], b_min[k], b_max[k]
+
+    coins = np.stack((
+        a_min[:, None] * u + b_min[:, None] * n,
+        a_max[:, None] * u + b_min[:, None] * n,
+        a_max[:, None] * u + b_max[:, None] * n,
+        a_min[:, None] * u + b_max[:, None] * n,
+    ), axis=1)
+    angles = np.degrees(phi[k])
+    return coins, angles, a_max - a_min, b_max - b_min
+
+
+def rectangles_minimaux(formes):
+    """
+    Rectangles minimaux de plusieurs formes d'un coup.
+    formes : tableau (N, M, 2) ou liste de N tableaux (Mi, 2).
+    Renvoie (coins (N, 4, 2), angles en degrés (N,), largeurs (N,), hauteurs (N,)) ;
+    la largeur est le côté coins[0]-coins[1], orienté selon l'angle.
+    """
+    if not isinstance(formes, np.ndarray):
+        formes = list(formes)
+    if not len(formes):
+        return np.empty((0, 4, 2)), np.empty(0), np.empty(0), np.empty(0)
+    sommets, appartenance = _enveloppes(formes)
+    return _calipers(sommets, appartenance, len(formes))
+
+
+def rectangle_minimal(points):
+    """(coins (4, 2), angle en degrés, largeur, hauteur) du rectangle minimal d'une forme."""
+    coins, angles, largeurs, hauteurs = rectangles_minimaux([points])
+    return coins[0], float(angles[0]), float(largeurs[0]), float(hauteurs[0])
+
+
+@instrumenter("rectangle englobant", taille=lambda points: len(points))
+def minimum_bounding_rectangle(points):
+    """Rectangle minimal sous forme de 4 sommets [p0, p1, p2, p3]."""
+    coins = rectangle_minimal(points)[0]
+    return [tuple(p) for p in coins.tolist()]
+
+
+def dimensions_rectangle(rect):
+    """(largeur, hauteur) d'un rectangle [p0, p1, p2, p3] : largeur = p0p1, hauteur = p1p2."""
+    return math.dist(rect[0], rect[1]), math.dist(rect[1], rect[2])
@@ -0,0 +1,114 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from miroiterie.dxf_geometrie import extraire_geometrie
+from miroiterie.instrumentation import instrumenter
+
+# Au-delà de ce nombre de sommets dans une trace, on passe en WebGL (Scattergl)
+SEUIL_WEBGL = 20000
+
+# Une trace par groupe de types d'entités
+GROUPES = {
+    "LINE": (("LINE",), "blue"),
+    "CIRCLE": (("CIRCLE",), "green"),
+    "ARC": (("ARC",), "red"),
+    "POLYLINE": (("LWPOLYLINE", "POLYLINE"), "magenta"),
+    "ELLIPSE": (("ELLIPSE",), "darkorange"),
+    "SPLINE": (("SPLINE",), "purple"),
+}
+
+
+def trace_lignes(tampon, nom, couleur, seuil_webgl=SEUIL_WEBGL):
+    """Une seule trace Plotly pour tout un tampon séparé par des NaN."""
+    classe = go.Scattergl if len(tampon) > seuil_webgl else go.Scatter
+    return classe(
+        x=tampon[:, 0], y=tampon[:, 1],
+        mode='lines',
+        line=dict(color=couleur),
+        name=nom,
+        connectgaps=False,
+        hoverinfo='skip',
+        showlegend=False
+    )
+
+
+def collecter_textes(msp, selected_layers, fenetre=None):
+    """Textes (TEXT / MTEXT) des calques sélectionnés : (x, y, contenu)."""
+    calques = set(selected_layers)
+    textes = []
+    for entity in msp.query("TEXT MTEXT"):
+        if entity.dxf.layer not in calques:
+            continue
+        insert = entity.dxf.insert
+        if fenetre and not (fenetre[0] <= insert.x <= fenetre[2] and fenetre[1] <= insert.y <= fenetre[3]):
+            continue
+        contenu = entity.dxf.text if entity.dxftype() == "TEXT" else entity.text
+        textes.append((insert.x, insert.y, contenu))
+    return textes
+
+
+def trace_selection(fenetre, n=20):
+    """
+    Grille de points invisibles couvrant la fenêtre : la sélection rectangulaire
+    de Plotly n'est renvoyée à Streamlit que si elle contient des points.
+    """
+    x, y = np.meshgrid(np.linspace(fenetre[0], fenetre[2], n), np.linspace(fenetre[1], fenetre[3], n))
+    return go.Scatter(
+        x=x.ravel(), y=y.ravel(),
+        mode="markers",
+        marker=dict(size=1, opacity=0),
+        hoverinfo="skip",
+        showlegend=False
+    )
+
+
+@instrumenter("figure Plotly",
+              taille=lambda doc, calques, geometrie=None, *a, **k: None if geometrie is None else len(geometrie))
+def plot_dxf_interactive(doc, selected_layers, geometrie=None, seuil_webgl=SEUIL_WEBGL, fenetre=None):
+    """
+    Construit la figure Plotly du DXF avec une trace par type d'entité
+    (et non plus une trace par entité) : le temps de construction et la
+    taille envoyée au navigateur dépendent du nombre de sommets seulement.
+    geometrie : GeometrieDXF déjà extraite (voir miroiterie.dxf_geometrie).
+    fenetre : (xmin, ymin, xmax, ymax) affichée ; la géométrie est alors
+    supposée déjà découpée (voir miroiterie.dxf_index.geometrie_fenetre).
+    """
+    if geometrie is None:
+        geometrie = extraire_geometrie(doc, segments_par_tour=100)
+    fig = go.Figure()
+
+    selection = geometrie.entites_calques(selected_layers)
+    types = geometrie.types[selection]
+    for nom, (types_groupe, couleur) in GROUPES.items():
+        entites = selection[np.isin(types, types_groupe)]
+        if len(entites):
+            fig.add_trace(trace_lignes(geometrie.tampon_nan(entites), nom, couleur, seuil_webgl))
+
+    textes = collecter_textes(doc.modelspace(), selected_layers, fenetre)
+    if textes:
+        x, y, contenus = zip(*textes)
+        fig.add_trace(go.Scatter(
+            x=x, y=y,
+            mode="text",
+            text=contenus,
+            textposition="top right",
+            textfont=dict(size=12, color="black"),
+            showlegend=False
+        ))
+
+    fig.update_layout(
+        title="DXF interactif (zoom/pan)",
+        xaxis=dict(scaleanchor="y"),
+        yaxis=dict(scaleanchor="x"),
+        dragmode="pan",
+        margin=dict(l=10, r=10, t=40, b=10)
+    )
+
+    if fenetre is not None:
+        fig.add_trace(trace_selection(fenetre))
+        fig.update_layout(
+            xaxis=dict(range=[fenetre[0], fenetre[2]]),
+            yaxis=dict(range=[fenetre[1], fenetre[3]]),
+        )
+
+    return fig
@@ -0,0 +1,440 @@
+"""
+Service HTTP sans interface : évaluation de formes, analyse DXF et
+génération de documents pour l'ERP, sans navigateur ni Streamlit.
+
+    python -m miroiterie.service --port 8000 -j 4
+
+Application ASGI (Starlette, servie par uvicorn) :
+
+    GET  /sante                          état de la file et du cache
+    GET  /formes                         registre des formes paramétriques
+    POST /formes/{cle}                   {"parametres": {nom: valeur ou [valeurs]}}
+    POST /rectangle                      {"points": [[x, y], ...]}
+    POST /dxf/analyse?resolution=20&contour=1    corps : le fichier DXF
+    POST /documents/{nom}                corps JSON, réponse : le document
+                                         (fiche.pdf, contour.dxf, dossier.pdf,
+                                         commande-toles.pdf, commande-toles.dxf,
+                                         commande-toles.zip)
+
+Les calculs (tâches de miroiterie.taches) passent par une file asyncio
+bornée vers un pool de processus : la boucle d'événements reste libre et
+sert les autres requêtes pendant un calcul. Chaque tâche est identifiée par
+l'empreinte SHA-256 de ses entrées : une requête identique à une tâche en
+cours attend le même résultat au lieu de relancer le calcul, et les
+résultats récents sont gardés dans un cache LRU. File pleine : réponse 503.
+En-têtes X-Empreinte et X-Origine (calcul, partage, cache) de chaque réponse.
+L'archive commande-toles.zip fait exception : validée à la réception, elle est
+envoyée au fil de sa production (une tôle à la fois en mémoire), hors de la
+file et du cache.
+
+`ClientLocal` appelle l'application dans le même processus, sans réseau :
+
+    async with ClientLocal(creer_app(processus=2)) as client:
+        reponse = await client.post("/rectangle", json={"points": [[0, 0], [2, 0], [1, 1]]})
+        reponse.json()
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from urllib.parse import urlencode
+
+from miroiterie import taches
+from miroiterie.cache import CacheLRU
+
+# Tâches en attente au-delà desquelles le service répond 503
+MAX_FILE = 1000
+
+# Résultats gardés en mémoire, et taille maximale d'un résultat gardé (octets)
+MAX_RESULTATS = 128
+TAILLE_RESULTAT_CACHE = 8 * 1024 * 1024
+
+# Taille maximale du corps d'une requête (octets)
+MAX_CORPS = 64 * 1024 * 1024
+
+# Erreurs d'une tâche dues aux données envoyées (réponse 422)
+ERREURS_DONNEES = (ValueError, KeyError, TypeError)
+
+# Documents : nom -> (tâche, type MIME, champs JSON passés en arguments avec leur valeur par défaut)
+DOCUMENTS = {
+    "fiche.pdf": (taches.fiche_pdf, "application/pdf", (("piece", None),)),
+    "contour.dxf": (taches.contour_dxf, "application/dxf",
+                    (("points", None), ("reference", ""), ("observation", ""))),
+    "dossier.pdf": (taches.dossier_pdf, "application/pdf",
+                    (("pieces", None), ("titre", "Dossier chantier"), ("chantier", ""))),
+    "commande-toles.pdf": (taches.commande_toles_pdf, "application/pdf",
+                           (("toles", None), ("fournisseur", ""), ("reference_chantier", ""))),
+    "commande-toles.dxf": (taches.commande_toles_dxf, "application/dxf",
+                           (("toles", None), ("reference_chantier", ""))),
+}
+
+# Documents envoyés au fil de leur production : la tâche valide les données et renvoie un itérateur d'octets
+FLUX = {
+    "commande-toles.zip": (taches.commande_toles_zip, "application/zip", (("toles", None),)),
+}
+
+
+class FileSaturee(Exception):
+    """Plus de MAX_FILE tâches en attente."""
+
+
+def empreinte(nom, *args):
+    """SHA-256 d'une tâche et de ses arguments (octets tels quels, le reste en JSON canonique)."""
+    h = hashlib.sha256(nom.encode())
+    for arg in args:
+        if isinstance(arg, (bytes, bytearray)):
+            h.update(b"\x00o%d\x00" % len(arg))
+            h.update(arg)
+        else:
+            texte = json.dumps(arg, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+            h.update(b"\x00j%d\x00" % len(texte))
+            h.update(texte.encode())
+    return h.hexdigest()
+
+
+@dataclass
+class _Tache:
+    cle: str
+    fonction: callable
+    args: tuple
+    resultat: asyncio.Future
+
+
+class FileTaches:
+    """
+    File asyncio bornée devant un pool de processus : un ouvrier (coroutine)
+    par processus prend la tâche suivante et attend son résultat dans le pool.
+    """
+
+    def __init__(self, processus=None, taille_file=MAX_FILE, taille_cache=MAX_RESULTATS):
+        self.processus = processus or os.cpu_count() or 1
+        self.taille_file = taille_file
+        self._resultats = CacheLRU(taille_cache)
+        self._en_cours = {}
+        self._file = None
+        self._pool = None
+        self._ouvriers = []
+        self.compteurs = dict.fromkeys(("calcul", "partage", "cache", "erreur", "saturee"), 0)
+
+    def _nouveau_pool(self):
+        return ProcessPoolExecutor(max_workers=self.processus, initializer=taches.prechauffer)
+
+    async def demarrer(self):
+        self._file = asyncio.Queue(self.taille_file)
+        self._pool = self._nouveau_pool()
+        self._ouvriers = [asyncio.create_task(self._ouvrier()) for _ in range(self.processus)]
+
+    async def arreter(self):
+        for ouvrier in self._ouvriers:
+            ouvrier.cancel()
+        await asyncio.gather(*self._ouvriers, return_exceptions=True)
+        self._ouvriers = []
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def etat(self):
+        return {"processus": self.processus, "en_attente": self._file.qsize() if self._file else 0,
+                "en_cours": len(self._en_cours), "resultats_en_cache": len(self._resultats), **self.compteurs}
+
+    async def soumettre(self, fonction, *args):
+        """
+        Résultat de fonction(*args), calculé dans le pool ; renvoie (résultat,
+        empreinte, origine). Lève FileSaturee si la file est pleine.
+        """
+        cle = empreinte(fonction.__name__, *args)
+        resultat = self._resultats.get(cle)
+        if resultat is not None:
+            self.compteurs["cache"] += 1
+            return resultat, cle, "cache"
+        tache = self._en_cours.get(cle)
+        origine = "partage"
+        if tache is None:
+            tache = _Tache(cle, fonction, args, asyncio.get_running_loop().create_future())
+            # Erreur marquée comme lue même si toutes les requêtes ont été abandonnées
+            tache.resultat.add_done_callback(lambda f: f.cancelled() or f.exception())
+            try:
+                self._file.put_nowait(tache)
+            except asyncio.QueueFull:
+                self.compteurs["saturee"] += 1
+                raise FileSaturee() from None
+            self._en_cours[cle] = tache
+            origine = "calcul"
+        self.compteurs[origine] += 1
+        # Une requête abandonnée n'annule pas le calcul partagé avec les autres
+        return await asyncio.shield(tache.resultat), cle, origine
+
+    async def _ouvrier(self):
+        boucle = asyncio.get_running_loop()
+        while True:
+            tache = await self._file.get()
+            try:
+                resultat = await boucle.run_in_executor(self._pool, tache.fonction, *tache.args)
+            except BrokenProcessPool as e:
+                # Processus tué (mémoire...) : le pool est remplacé pour les tâches suivantes
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._nouveau_pool()
+                self.compteurs["erreur"] += 1
+                tache.resultat.set_exception(e)
+            except Exception as e:
+                self.compteurs["erreur"] += 1
+                tache.resultat.set_exception(e)
+            else:
+                if not isinstance(resultat, bytes) or len(resultat) <= TAILLE_RESULTAT_CACHE:
+                    self._resultats.put(tache.cle, resultat)
+                tache.resultat.set_result(resultat)
+            finally:
+                self._en_cours.pop(tache.cle, None)
+                self._file.task_done()
+
+
+# --- Application ASGI ---
+
+def creer_app(processus=None, taille_file=MAX_FILE, taille_cache=MAX_RESULTATS):
+    """Application Starlette ; le pool de processus vit le temps de l'application (lifespan)."""
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, Response, StreamingResponse
+    from starlette.routing import Route
+
+    file = FileTaches(processus, taille_file, taille_cache)
+
+    @contextlib.asynccontextmanager
+    async def cycle_de_vie(app):
+        await file.demarrer()
+        try:
+            yield
+        finally:
+            await file.arreter()
+
+    def erreur(message, statut, **entetes):
+        return JSONResponse({"erreur": message}, status_code=statut, headers=entetes)
+
+    def erreur_donnees(e):
+        return erreur(f"champ manquant : {e.args[0]}" if isinstance(e, KeyError) else str(e), 422)
+
+    async def corps(request):
+        """Corps de la requête, ou None s'il dépasse MAX_CORPS."""
+        morceaux, taille = [], 0
+        async for morceau in request.stream():
+            taille += len(morceau)
+            if taille > MAX_CORPS:
+                return None
+            morceaux.append(morceau)
+        return b"".join(morceaux)
+
+    async def json_requete(request):
+        donnees = await corps(request)
+        if donnees is None:
+            raise _ErreurRequete(f"corps de plus de {MAX_CORPS} octets", 413)
+        try:
+            valeur = json.loads(donnees or b"{}")
+        except ValueError:
+            raise _ErreurRequete("corps JSON invalide", 400) from None
+        if not isinstance(valeur, dict):
+            raise _ErreurRequete("objet JSON attendu", 400)
+        return valeur
+
+    async def executer(fonction, *args, media_type=None):
+        try:
+            resultat, cle, origine = await file.soumettre(fonction, *args)
+        except FileSaturee:
+            return erreur("service saturé, réessayer plus tard", 503, **{"Retry-After": "1"})
+        except ERREURS_DONNEES as e:
+            return erreur_donnees(e)
+        except Exception as e:
+            return erreur(f"{type(e).__name__} : {e}", 500)
+        entetes = {"X-Empreinte": cle, "X-Origine": origine}
+        if media_type is None:
+            return JSONResponse(resultat, headers=entetes)
+        return Response(resultat, media_type=media_type, headers=entetes)
+
+    def route(gestionnaire):
+        """Erreurs de la requête elle-même (corps illisible, trop gros...) en réponses JSON."""
+        async def enveloppe(request):
+            try:
+                return await gestionnaire(request)
+            except _ErreurRequete as e:
+                return erreur(*e.args)
+        return enveloppe
+
+    async def sante(request):
+        return JSONResponse({"etat": "ok", **file.etat()})
+
+    async def liste_formes(request):
+        from miroiterie.formes import FORMES
+
+        return JSONResponse([{"cle": f.cle, "nom": f.nom, "parametres": [
+            {"nom": p.nom, "libelle": p.libelle, "defaut": p.defaut, "minimum": p.minimum, "maximum": p.maximum,
+             "facultatif": p.facultatif} for p in f.parametres]} for f in FORMES.values()])
+
+    @route
+    async def evaluer_forme(request):
+        donnees = await json_requete(request)
+        return await executer(taches.evaluer_formes, request.path_params["cle"], donnees.get("parametres", {}))
+
+    @route
+    async def rectangle(request):
+        donnees = await json_requete(request)
+        return await executer(taches.rectangle_points, donnees.get("points"))
+
+    @route
+    async def analyse_dxf(request):
+        data = await corps(request)
+        if data is None:
+            return erreur(f"fichier de plus de {MAX_CORPS} octets", 413)
+        if not data:
+            return erreur("corps vide : le fichier DXF est attendu", 400)
+        try:
+            resolution = int(request.query_params.get("resolution", 20))
+        except ValueError:
+            return erreur("resolution : entier attendu", 400)
+        contour = request.query_params.get("contour", "0").lower() in ("1", "oui", "true")
+        return await executer(taches.analyser_dxf, data, resolution, contour)
+
+    @route
+    async def document(request):
+        nom = request.path_params["nom"]
+        if nom not in DOCUMENTS and nom not in FLUX:
+            return erreur(f"document inconnu : {nom} (disponibles : {', '.join([*DOCUMENTS, *FLUX])})", 404)
+        fonction, media_type, champs = DOCUMENTS.get(nom) or FLUX[nom]
+        donnees = await json_requete(request)
+        args = (donnees.get(champ, defaut) for champ, defaut in champs)
+        if nom in DOCUMENTS:
+            return await executer(fonction, *args, media_type=media_type)
+        try:
+            morceaux = fonction(*args)
+        except ERREURS_DONNEES as e:
+            return erreur_donnees(e)
+        # Itérateur synchrone : Starlette le parcourt dans un thread, la boucle d'événements reste libre
+        return StreamingResponse(morceaux, media_type=media_type)
+
+    app = Starlette(routes=[
+        Route("/sante", sante),
+        Route("/formes", liste_formes),
+        Route("/formes/{cle}", evaluer_forme, methods=["POST"]),
+        Route("/rectangle", rectangle, methods=["POST"]),
+        Route("/dxf/analyse", analyse_dxf, methods=["POST"]),
+        Route("/documents/{nom}", document, methods=["POST"]),
+    ], lifespan=cycle_de_vie)
+    app.state.file = file
+    return app
+
+
+class _ErreurRequete(Exception):
+    """(message, statut) : requête refusée avant tout calcul."""
+
+
+# --- Client dans le même processus ---
+
+@dataclass
+class Reponse:
+    statut: int
+    entetes: dict = field(default_factory=dict)
+    contenu: bytes = b""
+
+    def json(self):
+        return json.loads(self.contenu)
+
+
+class ClientLocal:
+    """
+    Client HTTP minimal qui appelle l'application ASGI directement (même
+    processus, sans réseau). `async with` déclenche le démarrage et l'arrêt
+    de l'application (lifespan), donc du pool de processus.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._evenements = None
+        self._reponses_cycle = None
+        self._cycle = None
+
+    async def __aenter__(self):
+        self._evenements, self._reponses_cycle = asyncio.Queue(), asyncio.Queue()
+        self._cycle = asyncio.create_task(self.app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}},
+                                                   self._evenements.get, self._reponses_cycle.put))
+        await self._evenements.put({"type": "lifespan.startup"})
+        message = await self._reponses_cycle.get()
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(message.get("message", "démarrage de l'application impossible"))
+        return self
+
+    async def __aexit__(self, *erreur):
+        await self._evenements.put({"type": "lifespan.shutdown"})
+        await self._reponses_cycle.get()
+        await self._cycle
+
+    async def requete(self, methode, chemin, json=None, contenu=b"", params=None, entetes=None):
+        """Envoie une requête ; json (objet) ou contenu (octets) forme le corps."""
+        entetes = {k.lower(): v for k, v in (entetes or {}).items()}
+        if json is not None:
+            contenu = _json_dumps(json)
+            entetes.setdefault("content-type", "application/json")
+        entetes["content-length"] = str(len(contenu))
+        chemin, _, requete = chemin.partition("?")
+        if params:
+            requete = "&".join(filter(None, (requete, urlencode(params))))
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": methode.upper(),
+            "scheme": "http", "path": chemin, "raw_path": chemin.encode(), "query_string": requete.encode(),
+            "root_path": "", "headers": [(k.encode(), v.encode()) for k, v in entetes.items()],
+            "client": ("127.0.0.1", 0), "server": ("local", 80), "state": {},
+        }
+        fin = asyncio.Event()
+        envoye = False
+
+        async def recevoir():
+            nonlocal envoye
+            if not envoye:
+                envoye = True
+                return {"type": "http.request", "body": contenu, "more_body": False}
+            await fin.wait()
+            return {"type": "http.disconnect"}
+
+        reponse = Reponse(0)
+        morceaux = []
+
+        async def emettre(message):
+            if message["type"] == "http.response.start":
+                reponse.statut = message["status"]
+                reponse.entetes = {k.decode().lower(): v.decode() for k, v in message.get("headers", [])}
+            elif message["type"] == "http.response.body":
+                morceaux.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    fin.set()
+
+        await self.app(scope, recevoir, emettre)
+        fin.set()
+        reponse.contenu = b"".join(morceaux)
+        return reponse
+
+    async def get(self, chemin, **kwargs):
+        return await self.requete("GET", chemin, **kwargs)
+
+    async def post(self, chemin, **kwargs):
+        return await self.requete("POST", chemin, **kwargs)
+
+
+def _json_dumps(valeur):
+    return json.dumps(valeur, ensure_ascii=False).encode()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service HTTP de calcul et d'export (formes, DXF, documents).")
+    parser.add_argument("--hote", default="127.0.0.1", help="adresse d'écoute (défaut : 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("-j", "--processus", type=int, default=None,
+                        help="processus de calcul (défaut : nombre de cœurs)")
+    parser.add_argument("--file", type=int, default=MAX_FILE, help="tâches en attente avant de répondre 503")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    uvicorn.run(creer_app(args.processus, args.file), host=args.hote, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
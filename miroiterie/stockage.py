@@ -0,0 +1,218 @@
+"""
+Stockage persistant des chantiers : projets, pièces (formes, formes cintrées)
+et lignes de tôles, dans une base SQLite locale.
+
+Chaque ajout ou suppression est une écriture d'une seule ligne : rien n'est
+réécrit en bloc, et un rafraîchissement du navigateur ne perd plus rien. Les
+recherches par référence chantier et par fournisseur passent par des index.
+La miniature PNG de chaque pièce est calculée une fois, à l'enregistrement, et
+rangée dans la même ligne.
+
+Emplacement de la base : variable d'environnement MIROITERIE_DB, sinon
+~/.miroiterie/miroiterie.db. Le mode WAL permet à plusieurs processus
+(workers Streamlit, lots) de lire pendant une écriture.
+"""
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+
+from PIL import Image, ImageDraw
+
+from miroiterie.dossier import PieceDossier
+from miroiterie.toles import dessiner_schema
+
+CHEMIN_DEFAUT = os.path.join(os.path.expanduser("~"), ".miroiterie", "miroiterie.db")
+
+# Côté (pixels) des miniatures de formes
+TAILLE_MINIATURE = 160
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projets (
+    id INTEGER PRIMARY KEY,
+    chantier TEXT NOT NULL COLLATE NOCASE UNIQUE,
+    titre TEXT NOT NULL DEFAULT '',
+    cree REAL NOT NULL,
+    modifie REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pieces (
+    id INTEGER PRIMARY KEY,
+    projet_id INTEGER NOT NULL REFERENCES projets(id) ON DELETE CASCADE,
+    type TEXT NOT NULL,
+    reference TEXT NOT NULL DEFAULT '',
+    fournisseur TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+    quantite INTEGER NOT NULL DEFAULT 1,
+    donnees TEXT NOT NULL,
+    miniature BLOB,
+    cree REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS projets_modifie ON projets(modifie);
+CREATE INDEX IF NOT EXISTS pieces_projet ON pieces(projet_id, type);
+CREATE INDEX IF NOT EXISTS pieces_fournisseur ON pieces(fournisseur, projet_id);
+"""
+
+
+def miniature(piece):
+    """PNG de la pièce : croquis pour une tôle, silhouette du contour pour une forme."""
+    if piece.type == "tole":
+        image = dessiner_schema(piece.tole)
+    else:
+        image = Image.new("RGB", (TAILLE_MINIATURE, TAILLE_MINIATURE), "white")
+        xs, ys = zip(*piece.points)
+        etendue = max(max(xs) - min(xs), max(ys) - min(ys)) or 1
+        echelle = (TAILLE_MINIATURE - 10) / etendue
+        # Axe y de l'image vers le bas
+        contour = [(5 + (x - min(xs)) * echelle, TAILLE_MINIATURE - 5 - (y - min(ys)) * echelle)
+                   for x, y in piece.points]
+        ImageDraw.Draw(image).polygon(contour, fill=(158, 196, 222), outline=(31, 119, 180))
+    tampon = io.BytesIO()
+    image.save(tampon, format="PNG", optimize=True)
+    return tampon.getvalue()
+
+
+def _vers_json(piece):
+    donnees = asdict(piece)
+    for cle in ("type", "reference", "quantite"):
+        del donnees[cle]
+    return json.dumps(donnees, ensure_ascii=False)
+
+
+def _depuis_ligne(type, reference, quantite, donnees):
+    donnees = json.loads(donnees)
+    # JSON ne connaît que les listes : les points redeviennent des tuples
+    for cle in ("points", "fleche"):
+        if donnees.get(cle) is not None:
+            donnees[cle] = [tuple(p) for p in donnees[cle]]
+    return PieceDossier(type, reference, quantite=quantite, **donnees)
+
+
+class Stockage:
+    """Accès à la base ; une connexion partagée entre les threads, protégée par un verrou."""
+
+    def __init__(self, chemin=None):
+        chemin = chemin or os.environ.get("MIROITERIE_DB") or CHEMIN_DEFAUT
+        if chemin != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(chemin)), exist_ok=True)
+        self.chemin = chemin
+        self._connexion = sqlite3.connect(chemin, check_same_thread=False, timeout=30)
+        self._verrou = threading.Lock()
+        with self._verrou, self._connexion as cx:
+            cx.execute("PRAGMA journal_mode=WAL")
+            cx.execute("PRAGMA synchronous=NORMAL")
+            cx.execute("PRAGMA foreign_keys=ON")
+            cx.executescript(SCHEMA)
+
+    def _executer(self, requete, parametres=()):
+        with self._verrou, self._connexion as cx:
+            return cx.execute(requete, parametres).fetchall()
+
+    def fermer(self):
+        self._connexion.close()
+
+    # --- Projets ---
+
+    def projet(self, chantier, titre=""):
+        """Identifiant du projet de ce chantier (créé au besoin)."""
+        maintenant = time.time()
+        with self._verrou, self._connexion as cx:
+            cx.execute("INSERT OR IGNORE INTO projets (chantier, titre, cree, modifie) VALUES (?, ?, ?, ?)",
+                       (chantier, titre, maintenant, maintenant))
+            return cx.execute("SELECT id FROM projets WHERE chantier = ?", (chantier,)).fetchone()[0]
+
+    def trouver_projet(self, chantier):
+        """Identifiant du projet de ce chantier, None s'il n'existe pas (lecture seule)."""
+        ligne = self._executer("SELECT id FROM projets WHERE chantier = ?", (chantier,))
+        return ligne[0][0] if ligne else None
+
+    def projets(self, recherche="", fournisseur="", limite=50):
+        """
+        Projets les plus récemment modifiés dont la référence chantier commence
+        par `recherche` et, si `fournisseur` est donné, qui ont des tôles chez lui.
+        Renvoie des tuples (id, chantier, titre, nb_pieces).
+        """
+        motif = recherche.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        requete = """
+            SELECT p.id, p.chantier, p.titre, (SELECT COUNT(*) FROM pieces WHERE projet_id = p.id)
+            FROM projets p WHERE p.chantier LIKE ? ESCAPE '\\'"""
+        parametres = [motif]
+        if fournisseur:
+            requete += " AND p.id IN (SELECT projet_id FROM pieces WHERE fournisseur = ?)"
+            parametres.append(fournisseur)
+        requete += " ORDER BY p.modifie DESC LIMIT ?"
+        return self._executer(requete, (*parametres, limite))
+
+    def fournisseurs(self):
+        return [f for (f,) in self._executer("SELECT DISTINCT fournisseur FROM pieces WHERE fournisseur != ''"
+                                             " ORDER BY fournisseur")]
+
+    def supprimer_projet(self, projet_id):
+        self._executer("DELETE FROM projets WHERE id = ?", (projet_id,))
+
+    # --- Pièces ---
+
+    def ajouter_piece(self, projet_id, piece, fournisseur=""):
+        """Enregistre une pièce (PieceDossier) et sa miniature ; renvoie son identifiant."""
+        image = miniature(piece)
+        maintenant = time.time()
+        with self._verrou, self._connexion as cx:
+            curseur = cx.execute(
+                "INSERT INTO pieces (projet_id, type, reference, fournisseur, quantite, donnees, miniature, cree)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (projet_id, piece.type, piece.reference, fournisseur, piece.quantite, _vers_json(piece), image,
+                 maintenant))
+            cx.execute("UPDATE projets SET modifie = ? WHERE id = ?", (maintenant, projet_id))
+            return curseur.lastrowid
+
+    def supprimer_piece(self, piece_id):
+        self._executer("DELETE FROM pieces WHERE id = ?", (piece_id,))
+
+    def vider(self, projet_id, type=None, fournisseur=None):
+        requete, parametres = "DELETE FROM pieces WHERE projet_id = ?", [projet_id]
+        if type:
+            requete += " AND type = ?"
+            parametres.append(type)
+        if fournisseur is not None:
+            requete += " AND fournisseur = ?"
+            parametres.append(fournisseur)
+        self._executer(requete, parametres)
+
+    def pieces(self, projet_id, type=None, fournisseur=None, avec_fournisseur=False):
+        """
+        Pièces du projet dans l'ordre d'ajout : couples (id, PieceDossier), ou
+        triplets (id, PieceDossier, fournisseur) si avec_fournisseur.
+        """
+        requete = "SELECT id, fournisseur, type, reference, quantite, donnees FROM pieces WHERE projet_id = ?"
+        parametres = [projet_id]
+        if type:
+            requete += " AND type = ?"
+            parametres.append(type)
+        if fournisseur is not None:
+            requete += " AND fournisseur = ?"
+            parametres.append(fournisseur)
+        lignes = self._executer(requete + " ORDER BY id", parametres)
+        if avec_fournisseur:
+            return [(ligne[0], _depuis_ligne(*ligne[2:]), ligne[1]) for ligne in lignes]
+        return [(ligne[0], _depuis_ligne(*ligne[2:])) for ligne in lignes]
+
+    def miniatures(self, ids):
+        """Miniatures PNG des pièces demandées : {id: bytes}."""
+        ids = list(ids)
+        if not ids:
+            return {}
+        marques = ",".join("?" * len(ids))
+        return dict(self._executer(f"SELECT id, miniature FROM pieces WHERE id IN ({marques})", ids))
+
+
+_stockages = {}
+_verrou_stockages = threading.Lock()
+
+
+def stockage(chemin=None):
+    """Instance partagée (une par fichier de base) pour tout le processus."""
+    with _verrou_stockages:
+        if chemin not in _stockages:
+            _stockages[chemin] = Stockage(chemin)
+        return _stockages[chemin]
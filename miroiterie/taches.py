@@ -0,0 +1,212 @@
+"""
+Tâches de calcul du service (miroiterie.service), sans interface.
+
+Chaque tâche est une fonction de module : elle reçoit des données simples
+(JSON décodé, octets d'un DXF) et renvoie un dictionnaire sérialisable en
+JSON ou les octets d'un document. Elle s'exécute dans un processus du pool
+du service : arguments et résultat traversent la frontière des processus.
+Une donnée invalide lève ValueError, ou KeyError / TypeError quand un champ
+manque ou n'a pas le bon type (réponse 422 du service).
+
+Exception : commande_toles_zip valide la commande puis renvoie un itérateur
+d'octets, que le service parcourt au fil de l'envoi de la réponse.
+"""
+import io
+import math
+
+from miroiterie.dossier import TYPES_PIECES, PieceDossier
+
+
+def _nombre(valeur):
+    """Flottant JSON : None pour NaN ou l'infini."""
+    valeur = float(valeur)
+    return valeur if math.isfinite(valeur) else None
+
+
+def _points(points, minimum=3):
+    """Liste de couples (x, y) de flottants ; ValueError si la liste est mal formée."""
+    try:
+        resultat = [(float(x), float(y)) for x, y in points]
+    except (TypeError, ValueError):
+        raise ValueError("points : liste de couples [x, y] numériques attendue") from None
+    if len(resultat) < minimum:
+        raise ValueError(f"points : au moins {minimum} points attendus")
+    if not all(math.isfinite(v) for p in resultat for v in p):
+        raise ValueError("points : coordonnées non finies")
+    return resultat
+
+
+def _piece(donnees):
+    """PieceDossier d'après un dictionnaire JSON (mêmes champs que la dataclass)."""
+    if not isinstance(donnees, dict):
+        raise ValueError("pièce : objet JSON attendu")
+    type_piece = donnees.get("type")
+    if type_piece not in TYPES_PIECES:
+        raise ValueError(f"pièce : type inconnu {type_piece!r} (attendu : {', '.join(TYPES_PIECES)})")
+    champs = {k: donnees[k] for k in ("reference", "observation", "attributs", "fleche", "tole", "quantite")
+              if donnees.get(k) is not None}
+    if type_piece == "tole":
+        if not isinstance(donnees.get("tole"), dict):
+            raise ValueError("pièce : « tole » attendu pour une tôle")
+    else:
+        champs["points"] = _points(donnees.get("points") or [])
+    return PieceDossier(type_piece, **champs)
+
+
+# --- Évaluation de formes ---
+
+def evaluer_formes(cle, parametres):
+    """
+    Sommets et rectangles minimaux de pièces d'une forme du registre
+    (formes.FORMES). parametres : nom -> valeur ou liste de valeurs.
+    """
+    from miroiterie.formes import FORMES, evaluer
+
+    if cle not in FORMES:
+        raise ValueError(f"forme inconnue : {cle}")
+    if not isinstance(parametres, dict):
+        raise ValueError("parametres : objet JSON attendu")
+    # Mesure inconnue (quadrilatères) : null en JSON, NaN pour le registre
+    valeurs = {nom: [math.nan if v is None else v for v in valeur] if isinstance(valeur, list)
+               else math.nan if valeur is None else valeur for nom, valeur in parametres.items()}
+    lot = evaluer(cle, **valeurs)
+    pieces = []
+    for j in range(len(lot.sommets)):
+        piece = {
+            "sommets": [[_nombre(x), _nombre(y)] for x, y in lot.sommets[j].tolist()],
+            "rectangle": [[_nombre(x), _nombre(y)] for x, y in lot.rectangles[j].tolist()],
+            "largeur_mm": _nombre(lot.largeurs[j]),
+            "hauteur_mm": _nombre(lot.hauteurs[j]),
+            "angle_deg": _nombre(lot.angles[j]),
+        }
+        if lot.ecarts is not None:
+            piece["ecart_fermeture_mm"] = _nombre(lot.ecarts[j])
+            piece["fermee"] = bool(lot.fermees[j])
+        if lot.convexes is not None:
+            piece["convexe"] = bool(lot.convexes[j])
+        if lot.ambigues is not None:
+            piece["ambigue"] = bool(lot.ambigues[j])
+        pieces.append(piece)
+    return {"forme": cle, "pieces": pieces}
+
+
+def rectangle_points(points):
+    """Rectangle englobant minimal d'un nuage de points."""
+    from miroiterie.rectangle import dimensions_rectangle, minimum_bounding_rectangle
+
+    rect = minimum_bounding_rectangle(_points(points))
+    largeur, hauteur = dimensions_rectangle(rect)
+    return {"rectangle": [[float(x), float(y)] for x, y in rect], "largeur_mm": float(largeur),
+            "hauteur_mm": float(hauteur), "aire_mm2": float(largeur * hauteur)}
+
+
+# --- Analyse DXF ---
+
+def analyser_dxf(data, resolution=20, contour=False):
+    """
+    Rectangle englobant minimal du contour extérieur d'un DXF (octets), comme
+    une ligne de `python -m miroiterie.lot` ; contour=True ajoute les points
+    du contour extérieur (premier point répété à la fin). ValueError si le
+    fichier est illisible ou sans contour fermé.
+    """
+    from miroiterie.lot import analyser_dxf as analyser
+
+    ligne = analyser("", data, resolution)
+    if ligne["erreur"]:
+        raise ValueError(f"DXF illisible : {ligne['erreur']}")
+    resultat = {cle: (None if valeur == "" else valeur) for cle, valeur in ligne.items()
+                if cle not in ("fichier", "erreur")}
+    if contour:
+        from miroiterie.contours import reconstruire_contours
+        from miroiterie.dxf_cache import lire_dxf_bytes
+        from miroiterie.dxf_geometrie import extraire_geometrie
+
+        contours = reconstruire_contours(extraire_geometrie(lire_dxf_bytes(data), segments_par_tour=resolution))
+        resultat["contour"] = contours.exterieur.tolist()
+    return resultat
+
+
+# --- Documents ---
+
+def fiche_pdf(piece):
+    """Fiche technique PDF d'une pièce."""
+    from miroiterie.dossier import export_fiche
+
+    pdf = io.BytesIO()
+    export_fiche(_piece(piece), pdf)
+    return pdf.getvalue()
+
+
+def contour_dxf(points, reference="", observation=""):
+    """DXF d'un contour fermé, avec référence et observation."""
+    from miroiterie.dxf_export import document_contour
+
+    texte = io.StringIO()
+    document_contour(_points(points), reference, observation).write(texte)
+    return texte.getvalue().encode("utf-8")
+
+
+def dossier_pdf(pieces, titre="Dossier chantier", chantier=""):
+    """Dossier PDF d'un chantier : récapitulatif puis une page par pièce."""
+    from miroiterie.dossier import export_dossier
+
+    if not isinstance(pieces, list) or not pieces:
+        raise ValueError("pieces : liste non vide attendue")
+    pdf = io.BytesIO()
+    export_dossier([_piece(p) for p in pieces], titre, chantier, fichier=pdf)
+    return pdf.getvalue()
+
+
+def _toles(toles):
+    if not isinstance(toles, list) or not toles or not all(isinstance(t, dict) for t in toles):
+        raise ValueError("toles : liste non vide d'objets attendue")
+    return toles
+
+
+def commande_toles_pdf(toles, fournisseur="", reference_chantier=""):
+    """Bon de commande PDF de tôles pliées."""
+    from miroiterie.toles import export_commande_pdf
+
+    return export_commande_pdf(_toles(toles), fournisseur, reference_chantier)
+
+
+def commande_toles_dxf(toles, reference_chantier=""):
+    """DXF d'une commande de tôles : une présentation par tôle."""
+    from miroiterie.toles_dxf import document_commande, dxf_bytes
+
+    toles = _toles(toles)
+    doc, erreurs = document_commande(toles, reference_chantier)
+    if len(erreurs) == len(toles):
+        raise ValueError(f"aucune tôle exportable : {erreurs[0]}")
+    return dxf_bytes(doc)
+
+
+def commande_toles_zip(toles):
+    """
+    Archive zip d'un DXF par tôle, produite morceau par morceau (itérateur
+    d'octets, flux_zip_dxf). Lève ValueError d'emblée si aucune tôle n'a de
+    développé ; les autres tôles sans développé sont sautées.
+    """
+    from miroiterie.profils import developper
+    from miroiterie.toles_dxf import flux_zip_dxf
+
+    toles = _toles(toles)
+    erreurs = []
+    for tole in toles:
+        try:
+            developper(tole)
+        except ValueError as e:
+            erreurs.append(str(e))
+    if len(erreurs) == len(toles):
+        raise ValueError(f"aucune tôle exportable : {erreurs[0]}")
+    return flux_zip_dxf(toles)
+
+
+def prechauffer():
+    """Charge les bibliothèques des tâches (initialisation d'un processus du pool)."""
+    import ezdxf  # noqa: F401
+    import fpdf  # noqa: F401
+    import reportlab.pdfgen.canvas  # noqa: F401
+
+    import miroiterie.formes  # noqa: F401
+    import miroiterie.lot  # noqa: F401
@@ -0,0 +1,88 @@
+"""
+Tôles pliées : description d'une ligne de commande, croquis et bon de commande.
+
+Une tôle est un dictionnaire (metal, epaisseur, coloris, laquage, finition,
+note_finition, forme, dimensions, quantite, longueur, note), tel que saisi sur
+la page « Commande de Tôles ».
+"""
+import io
+
+from miroiterie import croquis
+from miroiterie.instrumentation import instrumenter
+from miroiterie.profils import developper
+
+# Zone du croquis dans le bon de commande (mm)
+LARGEUR_CROQUIS = 100
+HAUTEUR_CROQUIS = 66
+
+
+def finition_tole(tole):
+    """Finition affichée : texte libre si « Autre »."""
+    return tole['note_finition'] if tole['finition'] == "Autre" else tole['finition']
+
+
+def epaisseur_tole(tole):
+    """Épaisseur affichée : valeur saisie si « Autre »."""
+    if tole['epaisseur'] == "Autre" and tole.get('epaisseur_mm'):
+        return f"{tole['epaisseur_mm']} mm"
+    return tole['epaisseur']
+
+
+def description_tole(tole):
+    """Lignes de texte décrivant la tôle (fiche PDF, dossier)."""
+    lignes = [
+        f"Métal : {tole['metal']}",
+        f"Épaisseur : {epaisseur_tole(tole)}",
+        f"Coloris : {tole['coloris']}",
+        f"Laquage : {tole['laquage']}",
+        f"Finition : {finition_tole(tole)}",
+        f"Dimensions : {tole['dimensions']}",
+        f"Quantité : {tole['quantite']} x {tole['longueur']} mm",
+        f"Note : {tole['note']}",
+    ]
+    try:
+        developpe = developper(tole)
+    except ValueError:
+        return lignes
+    lignes.append(f"Largeur développée : {developpe.largeur:.1f} mm")
+    if developpe.poids is not None:
+        lignes.append(f"Poids : {developpe.poids:.2f} kg par pièce, "
+                      f"{developpe.poids * tole['quantite']:.2f} kg au total")
+    return lignes
+
+
+def dessiner_schema(tole):
+    """Croquis en image PIL 300 x 200 (miniatures), mis à l'échelle du profil."""
+    return croquis.image(tole)
+
+
+@instrumenter("commande de tôles PDF (fpdf)", taille=lambda toles, *args, **kwargs: len(toles))
+def export_commande_pdf(toles, fournisseur="", reference_chantier=""):
+    """Bon de commande PDF (octets) : en-tête puis description et croquis vectoriel de chaque tôle."""
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    pdf.cell(200, 10, f"Fournisseur : {fournisseur}", ln=True)
+    pdf.cell(200, 10, f"Référence chantier : {reference_chantier}", ln=True)
+    pdf.ln(10)
+
+    for idx, tole in enumerate(toles):
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(200, 10, f"Tôle {idx+1} - {tole['forme']}", ln=True)
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 8, "\n".join(description_tole(tole)) + "\n")
+
+        # Croquis tracé directement sur la page, à l'échelle de sa zone
+        if pdf.get_y() + HAUTEUR_CROQUIS > pdf.h - pdf.b_margin:
+            pdf.add_page()
+        y = pdf.get_y()
+        croquis.dessiner_fpdf(pdf, tole, pdf.l_margin, y, LARGEUR_CROQUIS, HAUTEUR_CROQUIS)
+        pdf.set_font("Arial", size=11)
+        pdf.set_y(y + HAUTEUR_CROQUIS)
+        pdf.ln(10)
+
+    buffer = io.BytesIO()
+    pdf.output(buffer)
+    return buffer.getvalue()
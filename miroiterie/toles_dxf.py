@@ -0,0 +1,284 @@
+"""
+Export DXF des tôles pliées pour la presse plieuse : section du profil et
+flan développé avec ses lignes de pli.
+
+La section a l'épaisseur et les rayons de pliage réels : une LWPOLYLINE
+fermée dont les plis sont des arcs (renflements). La face de référence est
+la face extérieure du premier pli, la matière est à sa gauche dans le sens
+de parcours des ailes. Les cotes de la commande sont extérieures à chaque
+pli, comme pour profils.developper : à un pli à droite (Profil Z),
+l'extérieur est la face opposée et l'aile est plus courte de s tan(φ / 2)
+sur la face de référence. Le flan est un
+rectangle longueur x largeur développée (profils.developper), vu face de
+référence dessus ; chaque ligne de pli porte son angle, son sens et le rayon
+intérieur.
+
+Une commande s'exporte d'un bloc :
+  - un seul DXF, une présentation (onglet) par tôle et toutes les tôles en
+    colonne dans l'espace objet, chaque tôle étant un bloc inséré ;
+  - ou une archive zip d'un DXF par tôle, produite morceau par morceau
+    (`flux_zip_dxf`) : une seule tôle est en mémoire à la fois, quelle que
+    soit la taille de la commande.
+"""
+import io
+import math
+import zipfile
+
+from miroiterie.instrumentation import instrumenter
+from miroiterie.profils import PROFILS, developper, ligne_profil
+
+# Calques : (nom, couleur ACI, type de ligne)
+CALQUES = (("SECTION", 7, "CONTINUOUS"), ("FLAN", 5, "CONTINUOUS"), ("PLIS", 1, "DASHED"),
+           ("COTES", 3, "CONTINUOUS"), ("TEXTES", 3, "CONTINUOUS"))
+
+# Espace entre la section et le flan, et entre deux tôles dans l'espace objet (mm)
+ECART = 100
+
+# Hauteur des textes (mm)
+HAUTEUR_TEXTE = 5
+
+
+def _normale(dx, dy):
+    """Normale unitaire à gauche de la direction (dx, dy)."""
+    longueur = math.hypot(dx, dy)
+    return -dy / longueur, dx / longueur
+
+
+def _face_reference(tole, epaisseur):
+    """
+    Face de référence en arêtes vives (sommets), et pour chaque aile les deux
+    points de cette face entre lesquels se lit sa cote extérieure.
+    """
+    profil = PROFILS[tole["forme"]]
+    # Retrait de la face de référence à chaque pli : nul si elle est à l'extérieur du pli
+    retraits = [0.0 if angle > 0 else epaisseur * math.tan(math.radians(-angle) / 2) for angle in profil.plis]
+    avant, apres = [0.0] + retraits, retraits + [0.0]
+    dimensions = {nom: float(tole["dimensions"][nom]) - avant[i] - apres[i] for i, nom in enumerate(profil.cotes)
+                  if nom in tole["dimensions"]}
+    sommets = ligne_profil(tole["forme"], dimensions)
+    cotes = []
+    for i, ((x0, y0), (x1, y1)) in enumerate(zip(sommets, sommets[1:])):
+        longueur = math.hypot(x1 - x0, y1 - y0)
+        dx, dy = (x1 - x0) / longueur, (y1 - y0) / longueur
+        cotes.append(((x0 - dx * avant[i], y0 - dy * avant[i]), (x1 + dx * apres[i], y1 + dy * apres[i])))
+    return sommets, cotes
+
+
+def sommets_section(tole, developpe=None):
+    """
+    Contour fermé de la section (x, y, bulge), en mm : face de référence avec
+    ses arrondis de pli, puis face opposée en sens inverse.
+    """
+    developpe = developpe or developper(tole)
+    profil = PROFILS[tole["forme"]]
+    s, r = developpe.epaisseur, developpe.rayon
+    sommets, _ = _face_reference(tole, s)
+    directions = [((x1 - x0) / math.hypot(x1 - x0, y1 - y0), (y1 - y0) / math.hypot(x1 - x0, y1 - y0))
+                  for (x0, y0), (x1, y1) in zip(sommets, sommets[1:])]
+    normales = [_normale(*d) for d in directions]
+
+    reference, opposee = [(*sommets[0], 0.0)], []
+    for i, angle in enumerate(profil.plis):
+        (px, py), (dx0, dy0), (dx1, dy1) = sommets[i + 1], directions[i], directions[i + 1]
+        (nx0, ny0), (nx1, ny1) = normales[i], normales[i + 1]
+        bulge = math.tan(math.radians(angle) / 4)
+        demi = math.tan(math.radians(abs(angle)) / 2)
+        # Pli à gauche : la face de référence est à l'extérieur du pli (rayon r + s)
+        rayon_reference, rayon_oppose = (r + s, r) if angle > 0 else (r, r + s)
+        t = rayon_reference * demi
+        reference.append((px - dx0 * t, py - dy0 * t, bulge))
+        reference.append((px + dx1 * t, py + dy1 * t, 0.0))
+        # Angle vif de la face opposée : intersection des deux faces décalées de s
+        k = s / (1 + nx0 * nx1 + ny0 * ny1)
+        qx, qy = px + (nx0 + nx1) * k, py + (ny0 + ny1) * k
+        t = rayon_oppose * demi
+        opposee.append(((qx - dx0 * t, qy - dy0 * t, 0.0), (qx + dx1 * t, qy + dy1 * t, -bulge)))
+    reference.append((*sommets[-1], 0.0))
+
+    (nx, ny), (xf, yf) = normales[-1], sommets[-1]
+    contour = reference + [(xf + nx * s, yf + ny * s, 0.0)]
+    for debut, fin in reversed(opposee):
+        contour.extend((fin, debut))
+    (nx, ny), (x0, y0) = normales[0], sommets[0]
+    contour.append((x0 + nx * s, y0 + ny * s, 0.0))
+    return contour
+
+
+def _texte(bloc, texte, x, y, hauteur=HAUTEUR_TEXTE):
+    from ezdxf.enums import TextEntityAlignment
+
+    bloc.add_text(texte, dxfattribs={"layer": "TEXTES", "height": hauteur}).set_placement(
+        (x, y), align=TextEntityAlignment.LEFT)
+
+
+def _sens_pli(angle):
+    """Sens du pli, flan vu face de référence dessus (un pli à gauche descend)."""
+    return "bas" if angle > 0 else "haut"
+
+
+def ajouter_tole(bloc, tole, titre=""):
+    """
+    Ajoute la section (à l'origine) et le flan (à sa droite) d'une tôle dans
+    un espace objet, une présentation ou un bloc. Lève ValueError si le
+    développé est impossible (forme, cote ou épaisseur manquante).
+    """
+    developpe = developper(tole)
+    profil = PROFILS[tole["forme"]]
+    contour = sommets_section(tole, developpe)
+    bloc.add_lwpolyline(contour, format="xyb", close=True, dxfattribs={"layer": "SECTION"})
+
+    # Cotes de la commande, côté face de référence (à droite du sens de parcours)
+    for p, q in _face_reference(tole, developpe.epaisseur)[1]:
+        bloc.add_aligned_dim(p1=p, p2=q, distance=-(HAUTEUR_TEXTE + 5), dimstyle="EZDXF",
+                             override={"dimtxt": HAUTEUR_TEXTE, "dimasz": HAUTEUR_TEXTE / 2},
+                             dxfattribs={"layer": "COTES"}).render()
+
+    xs = [x for x, _, _ in contour]
+    ys = [y for _, y, _ in contour]
+    marge = HAUTEUR_TEXTE + 15
+    x0 = max(xs) + marge + ECART
+    y0 = min(ys) - marge
+    longueur, largeur = float(tole["longueur"]), developpe.largeur
+
+    # Flan : longueur en x, largeur développée en y, lignes de pli parallèles à la longueur
+    bloc.add_lwpolyline([(x0, y0), (x0 + longueur, y0), (x0 + longueur, y0 + largeur), (x0, y0 + largeur)],
+                        close=True, dxfattribs={"layer": "FLAN"})
+    for position, angle in zip(developpe.lignes_pli, profil.plis):
+        bloc.add_line((x0, y0 + position), (x0 + longueur, y0 + position), dxfattribs={"layer": "PLIS"})
+        _texte(bloc, f"{abs(angle):g}° {_sens_pli(angle)} - Ri {developpe.rayon:g}", x0 + HAUTEUR_TEXTE,
+               y0 + position + HAUTEUR_TEXTE / 2, HAUTEUR_TEXTE * 0.7)
+
+    lignes = [titre or tole["forme"],
+              f"{tole.get('metal', '')} ep. {developpe.epaisseur:g} mm - {tole.get('coloris', '')} "
+              f"({tole.get('laquage', '')})",
+              f"{tole.get('quantite', 1)} x {longueur:g} mm - développé {largeur:.1f} mm",
+              "Flan vu face de référence dessus"]
+    haut = max(max(ys) + marge, y0 + largeur) + HAUTEUR_TEXTE
+    for k, ligne in enumerate(reversed(lignes)):
+        _texte(bloc, ligne, min(xs), haut + k * HAUTEUR_TEXTE * 1.6)
+    return (min(xs), y0, x0 + longueur, haut + len(lignes) * HAUTEUR_TEXTE * 1.6)
+
+
+def _nouveau_document():
+    import ezdxf
+
+    doc = ezdxf.new(setup=["linetypes", "styles", "dimstyles"])
+    for nom, couleur, type_ligne in CALQUES:
+        doc.layers.add(nom, color=couleur, linetype=type_ligne)
+    return doc
+
+
+def titre_tole(tole, numero=None):
+    titre = f"{tole['forme']} - {tole['dimensions']}"
+    return titre if numero is None else f"Tôle {numero} - {titre}"
+
+
+@instrumenter("DXF d'une tôle (ezdxf)")
+def document_tole(tole, titre=""):
+    """Document DXF d'une tôle : section et flan dans l'espace objet."""
+    doc = _nouveau_document()
+    ajouter_tole(doc.modelspace(), tole, titre or titre_tole(tole))
+    return doc
+
+
+@instrumenter("DXF de la commande (ezdxf)", taille=lambda toles, *args, **kwargs: len(toles))
+def document_commande(toles, reference_chantier=""):
+    """
+    Un DXF pour toute la commande : un bloc par tôle, inséré dans l'espace
+    objet (tôles en colonne) et dans sa propre présentation « Tôle n ».
+    Renvoie (doc, erreurs), erreurs : indice de la tôle -> message.
+    """
+    doc = _nouveau_document()
+    msp = doc.modelspace()
+    erreurs, y = {}, 0.0
+    for k, tole in enumerate(toles):
+        nom = f"TOLE_{k + 1}"
+        bloc = doc.blocks.new(nom)
+        try:
+            xmin, ymin, xmax, ymax = ajouter_tole(bloc, tole, titre_tole(tole, k + 1))
+        except ValueError as e:
+            doc.blocks.delete_block(nom, safe=False)
+            erreurs[k] = str(e)
+            continue
+        msp.add_blockref(nom, (-xmin, y - ymax))
+        y -= ymax - ymin + ECART
+        presentation = doc.layouts.new(f"Tôle {k + 1}")
+        presentation.add_blockref(nom, (-xmin, -ymin))
+    if len(doc.layouts) > 2:
+        # Présentation vide créée par ezdxf.new
+        doc.layouts.delete("Layout1")
+    if reference_chantier:
+        _texte(msp, f"Chantier : {reference_chantier}", 0, 2 * HAUTEUR_TEXTE, 2 * HAUTEUR_TEXTE)
+    return doc, erreurs
+
+
+def dxf_bytes(doc):
+    """Document DXF encodé (octets), sans fichier."""
+    flux = io.StringIO()
+    doc.write(flux)
+    return doc.encode(flux.getvalue())
+
+
+class _Tampon(io.RawIOBase):
+    """Flux en écriture seule : zipfile y écrit, `vider` rend ce qui a été écrit depuis le dernier appel."""
+
+    def __init__(self):
+        self._morceaux = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, donnees):
+        self._morceaux.append(bytes(donnees))
+        self._position += len(donnees)
+        return len(donnees)
+
+    def tell(self):
+        return self._position
+
+    def vider(self):
+        donnees = b"".join(self._morceaux)
+        self._morceaux.clear()
+        return donnees
+
+
+def nom_fichier_tole(tole, numero):
+    forme = "".join(c if c.isalnum() else "_" for c in tole["forme"])
+    return f"tole_{numero:03d}_{forme}.dxf"
+
+
+def flux_zip_dxf(toles, erreurs=None):
+    """
+    Archive zip d'un DXF par tôle, produite morceau par morceau (octets) :
+    chaque DXF est écrit directement dans le compresseur puis libéré. Les
+    tôles sans développé sont sautées ; `erreurs` (dictionnaire) reçoit alors
+    indice -> message.
+    """
+    tampon = _Tampon()
+    with zipfile.ZipFile(tampon, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for k, tole in enumerate(toles):
+            try:
+                doc = document_tole(tole, titre_tole(tole, k + 1))
+            except ValueError as e:
+                if erreurs is not None:
+                    erreurs[k] = str(e)
+                continue
+            with archive.open(nom_fichier_tole(tole, k + 1), "w") as entree:
+                with io.TextIOWrapper(entree, encoding=doc.output_encoding, errors="dxfreplace") as texte:
+                    doc.write(texte)
+            yield tampon.vider()
+    yield tampon.vider()
+
+
+@instrumenter("zip DXF des tôles (ezdxf)", taille=lambda toles, *args, **kwargs: len(toles))
+def ecrire_zip_dxf(toles, fichier, erreurs=None):
+    """Écrit l'archive de `flux_zip_dxf` dans `fichier` (chemin ou flux binaire) ; renvoie sa taille en octets."""
+    if isinstance(fichier, (str, bytes)) or hasattr(fichier, "__fspath__"):
+        with open(fichier, "wb") as f:
+            return ecrire_zip_dxf(toles, f, erreurs)
+    taille = 0
+    for morceau in flux_zip_dxf(toles, erreurs):
+        fichier.write(morceau)
+        taille += len(morceau)
+    return taille
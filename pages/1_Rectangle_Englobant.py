@@ -1,197 +1,56 @@
 import streamlit as st
 import math
+import numpy as np
 from shapely.geometry import Polygon
-import matplotlib.pyplot as plt
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-import ezdxf
 import tempfile
 import os
-
-# --- Fonctions de formes géométriques ---
-def losange_points_cote_angle(cote, angle_deg):
-    angle_rad = math.radians(angle_deg)
-    dx = cote * math.cos(angle_rad / 2)
-    dy = cote * math.sin(angle_rad / 2)
-
-    attributs = {
-    }
-    return [(-dx, 0), (0, dy), (dx, 0), (0, -dy)], attributs
-
-def losange_points_diagonales(d1, d2):
-    attributs = {
-        "Diagonale 1 (mm)": d1,
-        "Diagonale 2 (mm)": d2
-    }
-    return [(-d1 / 2, 0), (0, d2 / 2), (d1 / 2, 0), (0, -d2 / 2)], attributs
-
-def trapeze_points(base1, base2, hauteur):
-    dx = (base1 - base2) / 2
-    attributs = {
-        "Base 1 (mm)": base1,
-        "Base 2 (mm)": base2,
-        "Hauteur (mm)": hauteur
-    }
-    return [(-base1 / 2, 0), (base1 / 2, 0), (base2 / 2, hauteur), (-base2 / 2, hauteur)], attributs
-
-def trapeze_rectangle_points(hauteur1, hauteur2, base):
-    """
-    Trapèze rectangle avec l'angle droit en bas à gauche.
+import io
+import zipfile
+
+from miroiterie import commandes, lot
+from miroiterie.apercu import image_figure
+from miroiterie.dxf_cache import document_dxf
+from miroiterie.contours import enveloppe_convexe, reconstruire_contours
+from miroiterie.dossier import PieceDossier
+from miroiterie.dxf_export import document_contour
+from miroiterie.dxf_geometrie import extraire_geometrie
+from miroiterie.formes import FORMES, TOLERANCE_FERMETURE, par_nom
+from miroiterie.instrumentation import instrumenter, panneau_debug
+from miroiterie.quadrilateres import mesures as mesures_quadrilateres
+from miroiterie.stockage import stockage
+from miroiterie.rectangle import minimum_bounding_rectangle
+
+
+def charger_dxf_contours(fichier_dxf, resolution=20):
     """
-    attributs = {
-        "Hauteur 1 (mm)": hauteur1,
-        "Hauteur 2 (mm)": hauteur2,
-        "Base (mm)": base
-    }
-    return [
-        (0, 0),  # A
-        (base, 0),  # B
-        (base, hauteur2),  # C
-        (0, hauteur1)  # D
-    ], attributs
-
-def parallelogramme_points(base, cote, angle_deg):
-    angle_rad = math.radians(angle_deg)
-    dx = cote * math.cos(angle_rad)
-    dy = cote * math.sin(angle_rad)
-    attributs = {
-    }
-    return [(0, 0), (base, 0), (base + dx, dy), (dx, dy)], attributs
-
-
-def construire_quadrilatere_ab_parallele_cd(ab, bc, cd, da, angle_a_deg, angle_b_deg):
-    """Construit un quadrilatère avec AB ‖ CD et vérifie la fermeture."""
-    A = (0, 0)
-    B = (ab, 0)
-
-    angle_a_rad = math.radians(180 - angle_a_deg)
-    angle_b_rad = math.radians(180 - angle_b_deg)
-
-    Dx = A[0] - da * math.cos(angle_a_rad)
-    Dy = A[1] + da * math.sin(angle_a_rad)
-    D = (Dx, Dy)
-
-    Cx = B[0] + bc * math.cos(angle_b_rad)
-    Cy = B[1] + bc * math.sin(angle_b_rad)
-    C = (Cx, Cy)
-
-    # Repositionne C pour que CD soit parallèle à AB (horizontal)
-    Cx_corrected = Dx + cd
-    Cy_corrected = Dy
-    C_corrected = (Cx_corrected, Cy_corrected)
-
-    ecart = math.hypot(C_corrected[0] - C[0], C_corrected[1] - C[1])
-    ferme = ecart < 0.9
-
-    attributs = {
-    }
-
-    return [A, B, C_corrected, D], ferme, ecart, attributs
-
-def construire_quadrilatere_general(ab, bc, cd, da, angle_a_deg, angle_b_deg):
+    Lit un fichier DXF et reconstruit ses contours fermés à partir des entités en vrac
+    (lignes, polylignes avec renflements, cercles, arcs, ellipses, splines).
+    Les arcs et cercles sont approximés par des segments de lignes (resolution = nombre de segments pour un cercle complet).
+    fichier_dxf : chemin du fichier ou document ezdxf déjà chargé (voir miroiterie.dxf_cache).
     """
-    Construit un quadrilatère général (non parallèle) défini par :
-    - longueurs : AB, BC, CD, DA
-    - angles intérieurs : angle_A (entre DA et AB), angle_B (entre AB et BC)
-    """
-    A = (0, 0)
-    B = (ab, 0)
-
-    angle_a_rad = math.radians(180 - angle_a_deg)
-    angle_b_rad = math.radians(180 - angle_b_deg)
-
-    # Point D à partir de A et DA orienté à pi - angle_A
-    D = (
-        A[0] + da * math.cos(math.pi - angle_a_rad),
-        A[1] + da * math.sin(math.pi - angle_a_rad)
-    )
-
-    # Point C à partir de B et BC orienté à angle_B
-    C = (
-        B[0] + bc * math.cos(angle_b_rad),
-        B[1] + bc * math.sin(angle_b_rad)
-    )
-
-    # Vérification de fermeture
-    cd_calc = math.hypot(C[0] - D[0], C[1] - D[1])
-    ecart = abs(cd_calc - cd)
-    ferme = ecart < 0.9
-
-    attributs = {
-    }
+    import ezdxf
+    from ezdxf.document import Drawing
 
-    return [A, B, C, D], ferme, ecart, attributs
+    doc = fichier_dxf if isinstance(fichier_dxf, Drawing) else ezdxf.readfile(fichier_dxf)
+    geometrie = extraire_geometrie(doc, segments_par_tour=resolution)
+    return reconstruire_contours(geometrie)
 
 
 def charger_dxf_points(fichier_dxf, resolution=20):
     """
-    Lit un fichier DXF et extrait les points de toutes les entités fermées (lignes, polylignes, cercles, arcs).
-    Les arcs et cercles sont approximés par des segments de lignes (resolution = nombre de points pour un cercle complet).
+    Points du contour extérieur du DXF (premier point répété à la fin), ou liste vide
+    si aucun contour fermé n'a pu être reconstruit.
     """
-    import numpy as np
-    doc = ezdxf.readfile(fichier_dxf)
-    msp = doc.modelspace()
-    points = []
-
-    def arc_to_points(center, radius, start_angle, end_angle, resolution):
-        """Convertit un arc en points (angles en degrés)"""
-        if end_angle < start_angle:
-            end_angle += 360
-        angles = np.radians(
-            np.linspace(start_angle, end_angle, max(2, int(resolution * abs(end_angle - start_angle) / 360))))
-        return [(center[0] + radius * np.cos(a), center[1] + radius * np.sin(a)) for a in angles]
-
-    for ent in msp:
-        if ent.dxftype() == "LWPOLYLINE":
-            pts = [(p[0], p[1]) for p in ent]
-            if ent.is_closed:
-                pts.append(pts[0])
-            points.extend(pts)
-
-        elif ent.dxftype() == "POLYLINE":
-            pts = [(v.dxf.location.x, v.dxf.location.y) for v in ent.vertices()]
-            if ent.is_closed and pts:
-                pts.append(pts[0])
-            points.extend(pts)
-
-        elif ent.dxftype() == "LINE":
-            start = ent.dxf.start
-            end = ent.dxf.end
-            points.extend([(start.x, start.y), (end.x, end.y)])
-
-        elif ent.dxftype() == "CIRCLE":
-            center = ent.dxf.center
-            radius = ent.dxf.radius
-            circle_pts = arc_to_points((center.x, center.y), radius, 0, 360, resolution)
-            points.extend(circle_pts + [circle_pts[0]])
-
-        elif ent.dxftype() == "ARC":
-            center = ent.dxf.center
-            radius = ent.dxf.radius
-            start_angle = ent.dxf.start_angle
-            end_angle = ent.dxf.end_angle
-            arc_pts = arc_to_points((center.x, center.y), radius, start_angle, end_angle, resolution)
-            points.extend(arc_pts)
-
-    # # Tentative de fermeture automatique
-    # if points and math.dist(points[0], points[-1]) > 1e-3:
-    #     points.append(points[0])
-    #
-    # # Vérification : au moins 3 points distincts
-    # unique_pts = list(dict.fromkeys(points))  # enlever doublons
-    # if len(unique_pts) < 3:
-    #     return []
-
-    return points
-
-# --- Calcul du rectangle englobant ---
-def minimum_bounding_rectangle(points):
-    poly = Polygon(points)
-    rect = poly.minimum_rotated_rectangle
-    return list(rect.exterior.coords)[:-1]
+    contours = charger_dxf_contours(fichier_dxf, resolution)
+    if contours.exterieur is None:
+        return []
+    return contours.exterieur.tolist()
 
 # --- Dessin de la forme et du rectangle ---
 def draw_shape_and_rectangle(shape_pts, rect_pts):
+    # matplotlib n'est chargé qu'au premier aperçu (les suivants viennent du cache)
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots()
 
     # Tracer la forme
@@ -220,28 +79,35 @@ def draw_shape_and_rectangle(shape_pts, rect_pts):
     ax.legend()
     return fig
 
+# Formes proposées dans le menu (clés du registre miroiterie.formes)
+FORMES_MENU = ["losange_cote_angle", "losange_diagonales", "trapeze_isocele", "trapeze_rectangle",
+               "parallelogramme", "quadrilatere_ab_parallele_cd", "quadrilatere_general"]
+
 
 # --- Export PDF ---
 
-def export_forme_pdf(points, rect, ref="", observation="", attributs=None, titre="Fiche technique", filename="forme.pdf"):
+@instrumenter("PDF de la forme (reportlab)", taille=lambda points, *args, **kwargs: len(points))
+def export_forme_pdf(points, rect, ref="", observation="", attributs=None, titre="Fiche technique", filename="forme.pdf",
+                     echelle_reelle=False):
     """
     points : liste de tuples (points de la forme)
     rect : rectangle englobant (liste de 4 points)
     ref : texte de référence
     observation : texte libre
     attributs : dictionnaire de paramètres spécifiques à la forme
+    echelle_reelle : dessin à l'échelle 1:1 (la page est agrandie si nécessaire)
     """
-    # 1. Redessiner et sauvegarder le schéma
-    fig = draw_shape_and_rectangle(points, rect)
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.png', mode="wb") as tmpfile:
-        fig.savefig(tmpfile.name, bbox_inches='tight', dpi=200)
-        image_path = tmpfile.name
-    plt.close(fig)
-
-    # 2. Créer le PDF
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.pdfgen import canvas
+
+    from miroiterie.fiche_pdf import MARGE, barre_controle, dessiner_forme, format_page
+
+    # 1. Créer le PDF
     pdf_path = os.path.join(tempfile.gettempdir(), filename)
-    c = canvas.Canvas(pdf_path, pagesize=A4)
-    width_pdf, height_pdf = A4
+    pagesize = format_page(points, rect, echelle_reelle, A4)
+    c = canvas.Canvas(pdf_path, pagesize=pagesize)
+    width_pdf, height_pdf = pagesize
 
     y = height_pdf - 40
     c.setFont("Helvetica-Bold", 14)
@@ -271,44 +137,24 @@ def export_forme_pdf(points, rect, ref="", observation="", attributs=None, titre
     c.drawString(40, y, f"Hauteur rectangle englobant : {rect_height} mm")
     y -= 25
 
-    # 3. Insertion image
-    image_width = 450
-    image_height = 300
-    c.drawImage(image_path, 80, 100, width=image_width, height=image_height, preserveAspectRatio=True)
+    # 2. Schéma vectoriel (net au zoom, à l'échelle si demandé)
+    if echelle_reelle:
+        dessiner_forme(c, points, rect, (MARGE, MARGE, width_pdf - 2 * MARGE, y - MARGE - 20), echelle=mm)
+        barre_controle(c, 40, y)
+    else:
+        dessiner_forme(c, points, rect, (80, 100, 450, 300))
 
     c.save()
-    os.unlink(image_path)
     return pdf_path
 
 
+@instrumenter("DXF de la forme (ezdxf)", taille=lambda points, *args, **kwargs: len(points))
 def export_quadrilatere_to_dxf(points, filename="quadrilatere.dxf", ref="", observation=""):
     """
     Exporte les points d'un quadrilatère vers un fichier DXF avec une référence et une observation.
     Les points doivent être dans l'ordre [A, B, C, D].
     """
-    doc = ezdxf.new()
-    msp = doc.modelspace()
-
-    # Fermer la boucle : A→B→C→D→A
-    ordered_points = points + [points[0]]
-    for i in range(len(ordered_points) - 1):
-        msp.add_line(ordered_points[i], ordered_points[i + 1])
-
-    # Position de base pour les annotations (au-dessus du point A)
-    base_x, base_y = points[0]
-    text_height = 2.5
-
-    if ref:
-        msp.add_text(f"Réf : {ref}", dxfattribs={"height": text_height}).set_placement(
-            (base_x, base_y + 10),
-            align="LEFT"
-        )
-
-    if observation:
-        msp.add_text(f"Note : {observation}", dxfattribs={"height": text_height}).set_placement(
-            (base_x, base_y + 7),
-            align="LEFT"
-        )
+    doc = document_contour(points, ref, observation)
 
     # Créer un fichier temporaire et retourner le chemin
     temp_path = os.path.join(tempfile.gettempdir(), filename)
@@ -316,6 +162,94 @@ def export_quadrilatere_to_dxf(points, filename="quadrilatere.dxf", ref="", obse
     return temp_path
 
 
+# --- Calcul en lot ---
+def sources_televersees(fichiers):
+    """(nom, contenu) des DXF envoyés, archives zip comprises."""
+    for fichier in fichiers:
+        if fichier.name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(fichier.getvalue())) as archive:
+                yield from lot.sources_zip(archive)
+        else:
+            yield fichier.name, fichier.getvalue()
+
+
+def calcul_lot():
+    fichiers = st.file_uploader("Choisir des fichiers DXF ou des archives zip", type=["dxf", "zip"],
+                                accept_multiple_files=True)
+    if not fichiers or not st.button("▶️ Calculer les rectangles"):
+        return
+
+    barre = st.progress(0.0, text="Analyse en cours...")
+    total = len(fichiers)
+
+    def progression(n, ligne):
+        # Le total n'est connu qu'après ouverture des zip : on borne la barre à 1
+        total_affiche = max(total, n)
+        barre.progress(min(n / total_affiche, 1.0), text=f"{n} fichier(s) traité(s) — {ligne['fichier']}")
+
+    lignes = list(lot.executer_lot(sources_televersees(fichiers), progression=progression))
+    barre.progress(1.0, text=f"{len(lignes)} fichier(s) traité(s)")
+    st.dataframe(lignes, use_container_width=True)
+
+    texte = io.StringIO()
+    lot.ecrire_csv(lignes, texte)
+    classeur = io.BytesIO()
+    lot.ecrire_xlsx(lignes, classeur)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("📥 Télécharger le CSV", texte.getvalue().encode("utf-8-sig"),
+                           file_name="rectangles.csv", mime="text/csv")
+    with col2:
+        st.download_button("📥 Télécharger le XLSX", classeur.getvalue(), file_name="rectangles.xlsx",
+                           mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+
+# --- Commande CSV / Excel ---
+def calcul_commande():
+    fichier = st.file_uploader("Choisir une commande (une pièce par ligne)", type=["csv", "xlsx"])
+    st.caption("Colonnes : forme (clé ou libellé du menu), reference, observation, quantite, puis les paramètres "
+               "de la forme : " + " ; ".join(f"{f.cle} : {', '.join(p.nom for p in f.parametres)}"
+                                            for f in FORMES.values()))
+    fichiers = st.checkbox("Générer un DXF et un PDF par ligne")
+    if not fichier or not st.button("▶️ Traiter la commande"):
+        return
+
+    dossier = tempfile.mkdtemp()
+    base, extension = os.path.splitext(fichier.name)
+    chemin = os.path.join(dossier, "commande" + extension.lower())
+    with open(chemin, "wb") as f:
+        f.write(fichier.getvalue())
+    sortie = os.path.join(dossier, f"{base}_resultats{extension.lower()}")
+    pieces = os.path.join(dossier, f"{base}_pieces.zip") if fichiers else None
+
+    # Le nombre de lignes n'est connu qu'à la fin de la lecture : simple compteur
+    etat = st.empty()
+    nb, erreurs = commandes.importer_commande(chemin, sortie, pieces,
+                                              progression=lambda n: etat.text(f"{n} ligne(s) traitée(s)..."))
+    etat.text(f"{nb} ligne(s) traitée(s), {erreurs} en erreur")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        with open(sortie, "rb") as f:
+            st.download_button("📥 Télécharger les résultats", f, file_name=os.path.basename(sortie))
+    if pieces:
+        with col2:
+            with open(pieces, "rb") as f:
+                st.download_button("📥 Télécharger les DXF et PDF (zip)", f, file_name=os.path.basename(pieces),
+                                   mime="application/zip")
+
+
+# --- Saisie des paramètres d'une forme ---
+def saisie_parametre(modele, p):
+    if not p.facultatif:
+        return st.number_input(p.libelle, value=p.defaut, min_value=p.minimum, max_value=p.maximum)
+    # Mesure facultative : champ effaçable (vide = inconnue), prérempli avec sa valeur par défaut
+    cle = f"{modele.cle}_{p.nom}"
+    st.session_state.setdefault(cle, p.defaut)
+    return st.number_input(p.libelle, value=None, min_value=p.minimum, max_value=p.maximum, key=cle,
+                           placeholder="inconnue")
+
+
 # --- Interface Streamlit ---
 def main():
     st.set_page_config(page_title="Rectangle Englobant", page_icon="📐")
@@ -327,90 +261,64 @@ def main():
 
     # Zone de texte multiligne
     observation = st.text_area("Entrez une observation")
-    forme = st.selectbox("Choisir une forme :", [
-        "Losange (côté + angle)",
-        "Losange (2 diagonales)",
-        "Trapèze isocèle",
-        "Trapèze rectangle",
-        "Parallélogramme",
-        "Quadrilatère général",
-        "Charger un DXF"
+    forme = st.selectbox("Choisir une forme :", [FORMES[cle].nom for cle in FORMES_MENU] + [
+        "Charger un DXF",
+        "Lot de DXF (plusieurs fichiers ou zip)",
+        "Commande (CSV ou Excel)"
     ])
 
     points = []
-    if forme == "Losange (côté + angle)":
-        cote = st.number_input("Longueur du côté (mm)", value=1000, min_value=1)
-        angle = st.number_input("Angle en degrés", value=60.0, min_value=1.0, max_value=179.0)
-        points, attributs = losange_points_cote_angle(cote, angle)
-
-    elif forme == "Losange (2 diagonales)":
-        d1 = st.number_input("Diagonale 1 (mm)", value=1000, min_value=1)
-        d2 = st.number_input("Diagonale 2 (mm)", value=600, min_value=1)
-        points, attributs = losange_points_diagonales(d1, d2)
-
-    elif forme == "Trapèze isocèle":
-        base1 = st.number_input("Grande base (mm)", value=1000, min_value=1)
-        base2 = st.number_input("Petite base (mm)", value=600, min_value=1)
-        hauteur = st.number_input("Hauteur (mm)", value=400, min_value=1)
-        points, attributs = trapeze_points(base1, base2, hauteur)
-
-    elif forme == "Trapèze rectangle":
-        hauteur1 = st.number_input("Hauteur 1 (mm)", value=1000, min_value=1)
-        hauteur2 = st.number_input("Hauteur 2 (mm)", value=700, min_value=1)
-        base = st.number_input("Base (mm)", value=400, min_value=1)
-        points, attributs = trapeze_rectangle_points(hauteur1, hauteur2, base)
-
-    elif forme == "Parallélogramme":
-        base = st.number_input("Longueur de la base (mm)", value=1000, min_value=1)
-        cote = st.number_input("Longueur du côté adjacent (mm)", value=600, min_value=1)
-        angle = st.number_input("Angle entre base et côté (°)", value=60.0, min_value=1.0, max_value=179.0)
-        points, attributs = parallelogramme_points(base, cote, angle)
-
-    elif forme == "Quadrilatère avec côtés opposés parallèles (AB ‖ CD)":
-        ab = st.number_input("Longueur AB", value=1000, min_value=1)
-        bc = st.number_input("Longueur BC", value=600, min_value=1)
-        cd = st.number_input("Longueur CD", value=1000, min_value=1)
-        da = st.number_input("Longueur DA", value=600, min_value=1)
-        angle_a = st.number_input("Angle A (en degrés)", value=60.0, min_value=0.0, max_value=180.0)
-        angle_b = st.number_input("Angle B (en degrés)", value=60.0, min_value=0.0, max_value=180.0)
-
-        points, ferme, ecart, attributs = construire_quadrilatere_ab_parallele_cd(ab, bc, cd, da, angle_a, angle_b)
-
-        if ferme:
-            st.success("✅ La figure se ferme correctement.")
-        else:
-            st.error(f"❌ La figure ne se ferme pas (écart de {ecart:.2f} unités).")
-
-    elif forme == "Quadrilatère général":
-        ab = st.number_input("Longueur AB", value=10.0, min_value=0.1)
-        bc = st.number_input("Longueur BC", value=6.0, min_value=0.1)
-        cd = st.number_input("Longueur CD", value=10.0, min_value=0.1)
-        da = st.number_input("Longueur DA", value=6.0, min_value=0.1)
-        angle_a = st.number_input("Angle A (en degrés)", value=60.0, min_value=0.0, max_value=180.0)
-        angle_b = st.number_input("Angle B (en degrés)", value=60.0, min_value=0.0, max_value=180.0)
-
-        points, ferme, ecart, attributs = construire_quadrilatere_general(ab, bc, cd, da, angle_a, angle_b)
-
-        if ferme:
-            st.success("✅ La figure se ferme correctement.")
-        else:
-            st.error(f"❌ La figure ne se ferme pas (écart de {ecart:.2f} unités).")
-
-    elif forme == "Charger un DXF":
+    points_rectangle = None
+    if forme == "Charger un DXF":
         fichier_dxf = st.file_uploader("Choisir un fichier DXF", type=["dxf"])
         if fichier_dxf:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".dxf") as tmp:
-                tmp.write(fichier_dxf.read())
-                tmp_path = tmp.name
-            points = charger_dxf_points(tmp_path)
+            document = document_dxf(fichier_dxf.getvalue())
+            contours = document.derive("contours", charger_dxf_contours, 20)
             attributs = {"Source": "DXF importé"}
-            if not points:
+            if contours.exterieur is None:
                 st.warning("❗ Aucun polygone fermé détecté dans le fichier DXF.")
+            else:
+                points = contours.exterieur.tolist()
+                # Seule l'enveloppe convexe du contour extérieur compte pour le rectangle
+                points_rectangle = enveloppe_convexe(points)
+                attributs["Contours intérieurs"] = len(contours.trous)
+                if contours.ouverts:
+                    st.warning(f"⚠️ {len(contours.ouverts)} chaîne(s) non fermée(s) ignorée(s).")
+
+    elif forme == "Lot de DXF (plusieurs fichiers ou zip)":
+        calcul_lot()
+
+    elif forme == "Commande (CSV ou Excel)":
+        calcul_commande()
+
+    else:
+        modele = par_nom(forme)
+        if any(p.facultatif for p in modele.parametres):
+            st.caption("Laissez vides les mesures inconnues : la figure est calculée à partir des mesures saisies.")
+        valeurs = {p.nom: saisie_parametre(modele, p) for p in modele.parametres}
+        points, attributs, ecart, ambigue, convexe = modele.construire(**valeurs)
+
+        if ecart is not None:
+            if math.isnan(ecart):
+                st.error("❌ Mesures insuffisantes ou liées : la figure est indéterminée.")
+                points = []
+            elif ecart < TOLERANCE_FERMETURE and not convexe:
+                st.error("❌ Aucune figure convexe ne vérifie ces mesures : celle affichée a un sommet rentrant ou des "
+                         "côtés croisés. Vérifiez les mesures saisies.")
+            elif ecart < TOLERANCE_FERMETURE:
+                st.success("✅ La figure se ferme correctement.")
+            else:
+                st.error(f"❌ Mesures incompatibles : la figure la plus proche s'en écarte de {ecart:.2f} mm.")
+            if ambigue:
+                st.warning("⚠️ Mesures ambiguës : une autre figure convexe les vérifie aussi. Celle affichée n'est "
+                           "peut-être pas la bonne ; ajoutez une mesure (diagonale, angle) pour les départager.")
+            if points:
+                st.dataframe([{nom: round(float(v[0]), 2) for nom, v in mesures_quadrilateres(
+                    np.array([points])).items()}], use_container_width=True)
 
     if points:
-        rect = minimum_bounding_rectangle(points)
-        fig = draw_shape_and_rectangle(points, rect)
-        st.pyplot(fig)
+        rect = minimum_bounding_rectangle(points_rectangle or points)
+        st.image(image_figure(draw_shape_and_rectangle, points, rect))
 
         # Dimensions rectangle englobant
         rect_width = round(math.dist(rect[0], rect[1]), 2)
@@ -421,6 +329,7 @@ def main():
         st.markdown(f"**Hauteur** : {rect_height} mm")
 
         # Export PDF
+        echelle_reelle = st.checkbox("Impression à l'échelle 1:1")
         if st.button("📄 Exporter en PDF"):
             pdf_path = export_forme_pdf(
                 points=points,
@@ -429,7 +338,8 @@ def main():
                 observation=observation,
                 attributs=attributs,
                 titre="Forme",
-                filename=(ref or "forme") + ".pdf"
+                filename=(ref or "forme") + ".pdf",
+                echelle_reelle=echelle_reelle
             )
             with open(pdf_path, "rb") as f:
                 st.download_button("Télécharger le PDF", f, file_name=(ref or "forme") + ".pdf")
@@ -445,8 +355,19 @@ def main():
                     file_name=(ref or "forme") + ".dxf",
                     mime="application/dxf"
                 )
+
+        # Dossier chantier (enregistré, voir la page « Dossier »)
+        chantier = st.session_state.get("chantier", "")
+        if st.button(f"➕ Ajouter au dossier {chantier}".rstrip()):
+            stockage().ajouter_piece(stockage().projet(chantier), PieceDossier(
+                "forme", ref, observation, points=[tuple(p) for p in points], attributs=dict(attributs)
+            ))
+            st.success("Pièce enregistrée dans le dossier.")
+
+
 if __name__ == "__main__":
     main()
+    panneau_debug()
 
 
 
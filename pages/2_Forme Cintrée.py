@@ -1,16 +1,23 @@
 import streamlit as st
 import math
-import matplotlib.pyplot as plt
 from shapely.geometry import Polygon, LineString, Point
-import numpy as np
 import tempfile
 import os
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-import ezdxf
+
+from miroiterie.apercu import image_figure
+from miroiterie.arcs import TOLERANCE_CORDE, generer_arc
+from miroiterie.dossier import PieceDossier
+from miroiterie.dxf_export import TOLERANCE_AJUSTEMENT, document_contour
+from miroiterie.graphe import Graphe
+from miroiterie.instrumentation import instrumenter, panneau_debug
+from miroiterie.rectangle import minimum_bounding_rectangle
+from miroiterie.stockage import stockage
 
 st.set_page_config(layout="centered")
 
+# Libellés des profils d'arc proposés
+TYPES_CINTRE = {"Parabolique": "parabole", "Arc de cercle": "cercle"}
+
 st.title("🔺 Trapèze avec cintre — flèche perpendiculaire à CD")
 st.info("🔁 Calcule la flèche réelle (projetée perpendiculairement à CD).  "
 "  🎯 Affiche cette valeur exacte de flèche (selon la géométrie oblique du segment CD).  "
@@ -36,51 +43,15 @@ if mode_fleche == "Saisie directe":
 else:
     h_base = st.number_input("Hauteur verticale depuis le milieu de AB (mm)", value=700.0, min_value=0.0)
 
-# --- Calcul des points de base ---
-A = (0, 0)
-B = (largeur, 0)
-D = (0, hg)
-C = (largeur, hd)
-milieu_AB = ((A[0] + B[0]) / 2, (A[1] + B[1]) / 2)
-
-# --- Calcul de la flèche réelle si "Calcul depuis la base" ---
-if mode_fleche == "Calcul depuis la base":
-    P = (milieu_AB[0], milieu_AB[1] + h_base)  # point à projeter
-    line_CD = LineString([D, C])
-    proj = line_CD.interpolate(line_CD.project(Point(P)))
-    fleche = int(Point(P).distance(proj))
-    st.info(f"📐 Flèche réelle calculée perpendiculairement à CD : **{fleche:.2f} mm**")
-
-# --- Génération des points de l’arc parabolique ---
-def generate_arc(D, C, fleche, n_points=50):
-    arc_points = []
-    for t in np.linspace(0, 1, n_points):
-        x = D[0] + t * (C[0] - D[0])
-        y = D[1] + t * (C[1] - D[1])
-        h = 4 * fleche * t * (1 - t)  # parabole
-        dx, dy = C[0] - D[0], C[1] - D[1]
-        norm = math.hypot(dx, dy)
-        nx, ny = -dy / norm, dx / norm
-        arc_points.append((x + nx * h, y + ny * h))
-    return arc_points
-
-arc = generate_arc(D, C, fleche)
-
-# --- Création de la forme complète ---
-points = [A, B, C] + arc[::-1] + [D]
-
-# --- Calcul rectangle englobant ---
-def minimum_bounding_rectangle(points):
-    poly = Polygon(points)
-    if not poly.is_valid:
-        poly = poly.buffer(0)
-    min_rect = poly.minimum_rotated_rectangle
-    return list(min_rect.exterior.coords)[:-1]
-
-rect = minimum_bounding_rectangle(points)
+type_cintre = st.radio("Type de cintre :", list(TYPES_CINTRE), horizontal=True)
+tolerance = st.number_input("Tolérance de corde (mm)", value=TOLERANCE_CORDE, min_value=0.01, step=0.05,
+                            help="Écart maximal entre l'arc exact et ses segments : fixe le nombre de points")
 
 # --- Affichage graphique ---
 def draw_shape_and_rectangle(shape_pts, rect_pts, fleche_pt=None):
+    # matplotlib n'est chargé qu'au premier aperçu (les suivants viennent du cache)
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots()
 
     poly = Polygon(shape_pts)
@@ -114,28 +85,87 @@ def draw_shape_and_rectangle(shape_pts, rect_pts, fleche_pt=None):
     ax.legend()
     return fig
 
-fleche_segment = None
+# --- Graphe de calcul : un rerun ne recalcule que l'aval des entrées modifiées ---
+graphe = Graphe(st.session_state.setdefault("graphe_forme_cintree", {}))
+
+
+@graphe.etape("sommets", "largeur", "hg", "hd")
+def calcul_sommets(largeur, hg, hd):
+    A = (0, 0)
+    B = (largeur, 0)
+    D = (0, hg)
+    C = (largeur, hd)
+    return A, B, C, D
+
+
+@graphe.etape("fleche", "sommets", "mode_fleche", "fleche_saisie", "h_base")
+def calcul_fleche(sommets, mode_fleche, fleche_saisie, h_base):
+    """(flèche, segment [P, projeté] à coter ou None)."""
+    if mode_fleche != "Calcul depuis la base":
+        return fleche_saisie, None
+    # Flèche réelle : distance du point au-dessus du milieu de AB à sa projection sur CD
+    A, B, C, D = sommets
+    milieu_AB = ((A[0] + B[0]) / 2, (A[1] + B[1]) / 2)
+    P = (milieu_AB[0], milieu_AB[1] + h_base)  # point à projeter
+    line_CD = LineString([D, C])
+    proj = line_CD.interpolate(line_CD.project(Point(P)))
+    return int(Point(P).distance(proj)), [P, (proj.x, proj.y)]
+
+
+@graphe.etape("arc", "sommets", "fleche", "type_arc", "tolerance")
+def calcul_arc(sommets, fleche, type_arc, tolerance):
+    A, B, C, D = sommets
+    return generer_arc(D, C, fleche[0], type_arc, tolerance)
+
+
+@graphe.etape("points", "sommets", "arc")
+def calcul_points(sommets, arc):
+    # Forme complète (l'arc va de D à C, ses extrémités sont déjà C et D)
+    A, B, C, D = sommets
+    return [A, B] + [tuple(p) for p in arc[::-1].tolist()]
+
+
+@graphe.etape("rectangle", "points")
+def calcul_rectangle(points):
+    return minimum_bounding_rectangle(points)
+
+
+@graphe.etape("apercu", "points", "rectangle", "fleche")
+def calcul_apercu(points, rect, fleche):
+    return image_figure(draw_shape_and_rectangle, points, rect, fleche[1])
+
+
+graphe.evaluer(
+    largeur=largeur, hg=hg, hd=hd, mode_fleche=mode_fleche, type_arc=TYPES_CINTRE[type_cintre], tolerance=tolerance,
+    fleche_saisie=fleche if mode_fleche == "Saisie directe" else None,
+    h_base=h_base if mode_fleche == "Calcul depuis la base" else None,
+)
+fleche, fleche_segment = graphe["fleche"]
+points = graphe["points"]
+rect = graphe["rectangle"]
+
 if mode_fleche == "Calcul depuis la base":
-    fleche_segment = [P, proj]
+    st.info(f"📐 Flèche réelle calculée perpendiculairement à CD : **{fleche:.2f} mm**")
+
+st.image(graphe["apercu"])
 
-fig = draw_shape_and_rectangle(points, rect, fleche_segment)
-st.pyplot(fig)
+with st.expander("⏱️ Temps de calcul par étape"):
+    st.dataframe(graphe.temps(), use_container_width=True)
 
 # --- Export PDF ---
-def export_pdf(points, rect, fleche_segment=None, filename="forme_cintré.pdf"):
-    # 1. Redessiner la figure complète (comme dans Streamlit)
-    fig = draw_shape_and_rectangle(points, rect, fleche_segment)
+@instrumenter("PDF de la forme cintrée (reportlab)", taille=lambda points, *args, **kwargs: len(points))
+def export_pdf(points, rect, fleche_segment=None, filename="forme_cintré.pdf", echelle_reelle=False):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import mm
+    from reportlab.pdfgen import canvas
 
-    # 2. Sauvegarder en image temporaire
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.png', mode="wb") as tmpfile:
-        fig.savefig(tmpfile.name, bbox_inches='tight', dpi=200)
-        image_path = tmpfile.name  # on garde le chemin
-    plt.close(fig)
+    from miroiterie.fiche_pdf import MARGE, barre_controle, dessiner_forme, format_page
 
-    # 3. Création du PDF avec en-tête + image
+    # 1. Création du PDF avec en-tête + schéma vectoriel
     pdf_path = os.path.join(tempfile.gettempdir(), filename)
-    c = canvas.Canvas(pdf_path, pagesize=letter)
-    width_pdf, height_pdf = letter
+    pagesize = format_page(points, rect, echelle_reelle, letter)
+    c = canvas.Canvas(pdf_path, pagesize=pagesize)
+    width_pdf, height_pdf = pagesize
 
     y = height_pdf - 40
     c.setFont("Helvetica-Bold", 12)
@@ -166,33 +196,47 @@ def export_pdf(points, rect, fleche_segment=None, filename="forme_cintré.pdf"):
     c.drawString(40, y, f"Flèche (réelle ou saisie) : {round(fleche, 2)} mm")
     y -= 25
 
-    # 4. Insertion de l'image
-    image_width = 450
-    image_height = 300
-    c.drawImage(image_path, 80, 100, width=image_width, height=image_height, preserveAspectRatio=True)
+    # 2. Schéma vectoriel (net au zoom, à l'échelle si demandé)
+    if echelle_reelle:
+        dessiner_forme(c, points, rect, (MARGE, MARGE, width_pdf - 2 * MARGE, y - MARGE - 20), echelle=mm, fleche=fleche_segment)
+        barre_controle(c, 40, y)
+    else:
+        dessiner_forme(c, points, rect, (80, 100, 450, 300), fleche=fleche_segment)
 
     c.save()
-    os.unlink(image_path)
     return pdf_path
 
+echelle_reelle = st.checkbox("Impression à l'échelle 1:1")
 if st.button("📄 Exporter en PDF"):
-    pdf_path = export_pdf(points, rect, fleche_segment)
+    pdf_path = export_pdf(points, rect, fleche_segment, echelle_reelle=echelle_reelle)
     with open(pdf_path, "rb") as f:
         st.download_button("Télécharger le PDF", f, file_name=(ref or "forme") + ".pdf")
 
+# --- Dossier chantier (enregistré, voir la page « Dossier ») ---
+chantier = st.session_state.get("chantier", "")
+if st.button(f"➕ Ajouter au dossier {chantier}".rstrip()):
+    stockage().ajouter_piece(stockage().projet(chantier), PieceDossier(
+        "cintree", ref, observation, points=[tuple(p) for p in points],
+        attributs={"Base": f"{largeur} mm", "Côté gauche": f"{hg} mm", "Côté droit": f"{hd} mm",
+                   "Flèche (réelle ou saisie)": f"{round(fleche, 2)} mm"},
+        fleche=[tuple(Point(p).coords[0]) for p in fleche_segment] if fleche_segment else None
+    ))
+    st.success("Pièce enregistrée dans le dossier.")
+
 
 # --- Export DXF ---
-def export_dxf(points, filename="forme.dxf"):
-    doc = ezdxf.new()
-    msp = doc.modelspace()
-    closed_points = points + [points[0]]
-    for i in range(len(closed_points) - 1):
-        msp.add_line(closed_points[i], closed_points[i + 1])
+@instrumenter("DXF de la forme cintrée (ezdxf)", taille=lambda points, *args, **kwargs: len(points))
+def export_dxf(points, filename="forme.dxf", tolerance=TOLERANCE_AJUSTEMENT):
+    # Une seule polyligne fermée : l'arc discrétisé redevient un arc (bulge)
+    doc = document_contour(points, tolerance=tolerance)
     path = os.path.join(tempfile.gettempdir(), filename)
     doc.saveas(path)
     return path
 
 if st.button("📐 Exporter en DXF"):
-    dxf_path = export_dxf(points, ref + ".dxf")
+    # Les segments de l'arc sont déjà à `tolerance` de l'arc exact : l'ajustement peut s'en écarter d'autant
+    dxf_path = export_dxf(points, ref + ".dxf", max(TOLERANCE_AJUSTEMENT, tolerance))
     with open(dxf_path, "rb") as f:
-        st.download_button("📥 Télécharger le DXF", f, file_name=(ref or "forme") + ".dxf", mime="application/dxf")
\ No newline at end of file
+        st.download_button("📥 Télécharger le DXF", f, file_name=(ref or "forme") + ".dxf", mime="application/dxf")
+
+panneau_debug()
@@ -1,107 +1,19 @@
 import streamlit as st
-import ezdxf
-import numpy as np
-import tempfile
-import plotly.graph_objects as go
+
+from miroiterie.dxf_cache import document_dxf
+from miroiterie.instrumentation import mesurer, panneau_debug
 
 def get_layers(doc):
     msp = doc.modelspace()
     return sorted(set(entity.dxf.layer for entity in msp))
 
-def plot_dxf_interactive(doc, selected_layers):
-    msp = doc.modelspace()
-    fig = go.Figure()
-
-    for entity in msp:
-        if entity.dxf.layer not in selected_layers:
-            continue
-
-        if entity.dxftype() == "LINE":
-            start = entity.dxf.start
-            end = entity.dxf.end
-            fig.add_trace(go.Scatter(
-                x=[start.x, end.x], y=[start.y, end.y],
-                mode='lines',
-                line=dict(color='blue'),
-                name='LINE',
-                showlegend=False
-            ))
-        elif entity.dxftype() == "CIRCLE":
-            center = entity.dxf.center
-            radius = entity.dxf.radius
-            theta = np.linspace(0, 2*np.pi, 100)
-            x = center.x + radius * np.cos(theta)
-            y = center.y + radius * np.sin(theta)
-            fig.add_trace(go.Scatter(
-                x=x, y=y,
-                mode='lines',
-                line=dict(color='green'),
-                name='CIRCLE',
-                showlegend=False
-            ))
-        elif entity.dxftype() == "ARC":
-            center = entity.dxf.center
-            radius = entity.dxf.radius
-            start_angle = np.radians(entity.dxf.start_angle)
-            end_angle = np.radians(entity.dxf.end_angle)
-            theta = np.linspace(start_angle, end_angle, 100)
-            x = center.x + radius * np.cos(theta)
-            y = center.y + radius * np.sin(theta)
-            fig.add_trace(go.Scatter(
-                x=x, y=y,
-                mode='lines',
-                line=dict(color='red'),
-                name='ARC',
-                showlegend=False
-            ))
-        elif entity.dxftype() in ["LWPOLYLINE", "POLYLINE"]:
-            try:
-                points = entity.get_points()
-                points = [p[0:2] for p in points]
-            except AttributeError:
-                points = [(v.dxf.x, v.dxf.y) for v in entity.vertices()]
-            x, y = zip(*points)
-            fig.add_trace(go.Scatter(
-                x=x, y=y,
-                mode='lines',
-                line=dict(color='magenta'),
-                name='POLYLINE',
-                showlegend=False
-            ))
-        elif entity.dxftype() == "TEXT":
-            insert = entity.dxf.insert
-            content = entity.dxf.text
-            fig.add_trace(go.Scatter(
-                x=[insert.x],
-                y=[insert.y],
-                mode="text",
-                text=[content],
-                textposition="top right",
-                textfont=dict(size=12, color="black"),
-                showlegend=False
-            ))
-        elif entity.dxftype() == "MTEXT":
-            insert = entity.dxf.insert
-            content = entity.text
-            fig.add_trace(go.Scatter(
-                x=[insert.x],
-                y=[insert.y],
-                mode="text",
-                text=[content],
-                textposition="top right",
-                textfont=dict(size=12, color="black"),
-                showlegend=False
-            ))
-
-    fig.update_layout(
-        title="DXF interactif (zoom/pan)",
-        xaxis=dict(scaleanchor="y"),
-        yaxis=dict(scaleanchor="x"),
-        dragmode="pan",
-        margin=dict(l=10, r=10, t=40, b=10)
-    )
-
-    return fig
+def fenetre_selection(evenement):
+    """Fenêtre (xmin, ymin, xmax, ymax) d'une sélection rectangulaire Plotly, sinon None."""
+    boites = evenement.selection.box if evenement else []
+    if not boites:
+        return None
+    x, y = boites[0]["x"], boites[0]["y"]
+    return (min(x), min(y), max(x), max(y))
 
 def main():
     st.title("📐 Visionneuse DXF interactive (zoom & pan)")
@@ -109,20 +21,49 @@ def main():
     uploaded_file = st.file_uploader("Chargez un fichier DXF", type=["dxf"])
 
     if uploaded_file is not None:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".dxf") as tmp_file:
-            tmp_file.write(uploaded_file.read())
-            tmp_path = tmp_file.name
+        # Index spatial (shapely) et rendu Plotly : chargés seulement une fois un fichier envoyé
+        from miroiterie.dxf_geometrie import collecter_primitives
+        from miroiterie.dxf_index import IndexSpatial, geometrie_fenetre
+        from miroiterie.rendu_dxf import plot_dxf_interactive
 
         try:
-            doc = ezdxf.readfile(tmp_path)
-            layers = get_layers(doc)
+            document = document_dxf(uploaded_file.getvalue())
+            doc = document.doc
+            layers = document.derive("calques", get_layers)
 
             st.markdown("### Calques à afficher")
             selected_layers = st.multiselect("Sélectionnez les calques à afficher :", layers, default=layers)
 
             if selected_layers:
-                fig = plot_dxf_interactive(doc, selected_layers)
-                st.plotly_chart(fig, use_container_width=True)
+                primitives = document.derive("primitives", collecter_primitives)
+                index = document.derive("index", lambda _: IndexSpatial(primitives))
+
+                # Fenêtre affichée, propre au fichier chargé ; None = vue d'ensemble
+                if st.session_state.get("fenetre_dxf_cle") != document.cle:
+                    st.session_state["fenetre_dxf_cle"] = document.cle
+                    st.session_state["fenetre_dxf"] = None
+                    st.session_state["fenetre_dxf_vue"] = 0
+                fenetre = st.session_state["fenetre_dxf"] or index.etendue()
+
+                st.caption("Sélection rectangulaire (outil « Box Select ») : zoom détaillé sur la zone.")
+                if st.button("🔍 Vue d'ensemble", disabled=st.session_state["fenetre_dxf"] is None):
+                    st.session_state["fenetre_dxf"] = None
+                    st.session_state["fenetre_dxf_vue"] += 1
+                    st.rerun()
+
+                geometrie = geometrie_fenetre(primitives, index, fenetre, selected_layers)
+                fig = plot_dxf_interactive(doc, selected_layers, geometrie, fenetre=fenetre)
+                # Nouvelle clé à chaque changement de vue : la sélection précédente est oubliée
+                with mesurer("sérialisation Plotly (st.plotly_chart)", len(geometrie.sommets)):
+                    evenement = st.plotly_chart(
+                        fig, use_container_width=True, on_select="rerun", selection_mode="box",
+                        key=f"vue_dxf_{st.session_state['fenetre_dxf_vue']}"
+                    )
+                selection = fenetre_selection(evenement)
+                if selection:
+                    st.session_state["fenetre_dxf"] = selection
+                    st.session_state["fenetre_dxf_vue"] += 1
+                    st.rerun()
             else:
                 st.warning("Aucun calque sélectionné.")
 
@@ -131,3 +72,4 @@ def main():
 
 if __name__ == "__main__":
     main()
+    panneau_debug()
@@ -1,9 +1,16 @@
-import streamlit as st
-from PIL import Image, ImageDraw, ImageFont
-from fpdf import FPDF
 import os
-import io
-from io import BytesIO
+import tempfile
+
+import streamlit as st
+
+from miroiterie import croquis
+from miroiterie.debit import LONGUEURS_STANDARD, debiter
+from miroiterie.dossier import PieceDossier
+from miroiterie.instrumentation import panneau_debug
+from miroiterie.stockage import stockage
+from miroiterie.profils import developper
+from miroiterie.toles import export_commande_pdf
+from miroiterie.toles_dxf import document_commande, document_tole, dxf_bytes, ecrire_zip_dxf, nom_fichier_tole, titre_tole
 
 # À faire une seule fois au début
 #font_bold = ImageFont.truetype("arial.ttf", 14)
@@ -11,10 +18,6 @@ from io import BytesIO
 
 st.set_page_config(page_title="Commande de Tôles", layout="wide")
 
-# --- Stockage temporaire ---
-if "toles" not in st.session_state:
-    st.session_state["toles"] = []
-
 # --- Infos générales ---
 st.title("Commande de Tôles")
 
@@ -22,7 +25,13 @@ col1, col2 = st.columns(2)
 with col1:
     fournisseur = st.text_input("Fournisseur")
 with col2:
-    reference_chantier = st.text_input("Référence chantier")
+    reference_chantier = st.text_input("Référence chantier", value=st.session_state.get("chantier", ""))
+
+# --- Stockage : les tôles sont enregistrées dans le projet du chantier ---
+st.session_state["chantier"] = reference_chantier
+base = stockage()
+# Lecture seule : le projet n'est créé qu'au premier ajout de tôle
+projet = base.trouver_projet(reference_chantier)
 
 st.markdown("---")
 
@@ -47,6 +56,10 @@ note_finition = ""
 if finition == "Autre":
     note_finition = st.text_input("Précisez la finition")
 
+epaisseur_mm = None
+if epaisseur == "Autre":
+    epaisseur_mm = st.number_input("Précisez l'épaisseur (mm)", min_value=0.1, value=1.0, step=0.1)
+
 # --- Dimensions ---
 dimensions = {}
 if forme in ["Cornière", "Cornière"]:
@@ -64,9 +77,11 @@ elif forme == "Tôle en U":
     dimensions["C"] = st.number_input("C (mm)", min_value=10, value=70)
 
 if st.button("Ajouter la tôle"):
-    st.session_state["toles"].append({
+    projet = base.projet(reference_chantier)
+    base.ajouter_piece(projet, PieceDossier("tole", forme, tole={
         "metal": metal,
         "epaisseur": epaisseur,
+        "epaisseur_mm": epaisseur_mm,
         "coloris": coloris,
         "laquage": laquage,
         "finition": finition,
@@ -76,67 +91,29 @@ if st.button("Ajouter la tôle"):
         "quantite": quantite,
         "longueur": longueur,
         "note": note
-    })
-
-# --- Dessin ---
-def dessiner_schema(tole):
-    img = Image.new("RGB", (300, 200), "white")
-    draw = ImageDraw.Draw(img)
-
-    def mm(x): return int(x * 1.5)
-    def text_centered(text, x, y): draw.text((x, y), text, fill="black")
-
-    forme = tole["forme"]
-    d = tole["dimensions"]
-
-    if forme == "Cornière":
-        A, B = mm(d["A"]), mm(d["B"])
-        draw.line([(50, 50), (50 + A, 50)], fill="black", width=2)
-        draw.line([(50, 50), (50, 50 + B)], fill="black", width=2)
-        text_centered(f"A={d['A']}", 50 + A // 2 - 15, 35)
-        text_centered(f"B={d['B']}", 20, 50 + B // 2 - 5)
-
-    elif forme == "Profil Z":
-        A, B, C = mm(d["A"]), mm(d["B"]), mm(d["C"])
-        x0, y0 = 50, 100
-        path = [
-            (x0, y0),
-            (x0 + A, y0),
-            (x0 + A, y0 - B),
-            (x0 + A + C, y0 - B)
-        ]
-        draw.line(path, fill="black", width=2)
-        text_centered(f"A={d['A']}", x0 + A // 2 - 10, y0 + 10)
-        text_centered(f"B={d['B']}", x0 + A + 5, y0 - B // 2 - 5)
-        text_centered(f"C={d['C']}", x0 + A + C // 2 - 10, y0 - B - 15)
-
-    elif forme == "Seuil":
-        L = mm(d["Largeur"])
-        x0, y0 = 50, 80
-        draw.line([x0, y0, x0 + 5, y0 - 4], fill="black", width=2)
-        draw.line([x0 + 5, y0 - 4, x0 + L-5, y0 - 4], fill="black", width=2)
-        draw.line([x0 + L-5, y0 - 4, x0 + L, y0], fill="black", width=2)
-        text_centered(f"Largeur={d['Largeur']}", x0 + L // 2 - 20, y0 - 15)
-        #text_centered(f"Hauteur={d['Hauteur']}", x0 - 40, y0 + H // 2 - 5)
-
-    elif forme == "Tôle en U":
-        A, B, C = mm(d["A"]), mm(d["B"]), mm(d["C"])
-        x0, y0 = 50, 60
-        draw.line([(x0, y0), (x0, y0 + A)], fill="black", width=2)
-        draw.line([(x0, y0 + A), (x0 + B, y0 + A)], fill="black", width=2)
-        draw.line([(x0 + B, y0 + A), (x0 + B, y0+A-C)], fill="black", width=2)
-        text_centered(f"A={d['A']}", x0 - 35, y0 + A // 2 - 5)
-        text_centered(f"B={d['B']}", x0 + B // 2 - 10, y0 + A + 5)
-        text_centered(f"C={d['C']}", x0 + B + 5, y0 + d["C"] // 2)
-
-    text = f"{tole['laquage']}"
-    draw.text((10, 180), text, fill="red")  # position bas gauche
-
-    return img
+    }), fournisseur=fournisseur)
 
 # --- Liste des tôles ---
 st.markdown("## Tôles ajoutées")
-for i, tole in enumerate(st.session_state["toles"]):
+# Toutes les tôles du chantier ; filtrer par fournisseur est un choix explicite
+lignes = base.pieces(projet, "tole", avec_fournisseur=True) if projet is not None else []
+fournisseurs = sorted({f for _, _, f in lignes}, key=str.lower)
+if len(fournisseurs) > 1:
+    filtre = st.selectbox("Fournisseur affiché", ["Tous"] + fournisseurs,
+                          format_func=lambda f: f or "(sans fournisseur)")
+    if filtre != "Tous":
+        lignes = [ligne for ligne in lignes if ligne[2] == filtre]
+        fournisseur = fournisseur or filtre
+toles = [piece.tole for _, piece, _ in lignes]
+# Tôles sans développé (indices) : pas de DXF
+erreurs_dxf = set()
+
+
+def dxf_tole(tole, numero):
+    return dxf_bytes(document_tole(tole, titre_tole(tole, numero)))
+
+
+for numero, ((i, piece, fournisseur_ligne), tole) in enumerate(zip(lignes, toles), start=1):
     finition_txt = tole['note_finition'] if tole['finition'] == "Autre" else tole['finition']
     cols = st.columns([3, 1, 1])
     with cols[0]:
@@ -145,58 +122,91 @@ for i, tole in enumerate(st.session_state["toles"]):
             f"{tole['coloris']} ({tole['laquage']} - {finition_txt}) - "
             f"{tole['quantite']}x{tole['longueur']}mm"
         )
-        st.write(f"Dimensions : {tole['dimensions']}")
+        st.write(f"Dimensions : {tole['dimensions']} — Fournisseur : {fournisseur_ligne or '-'}")
+        try:
+            developpe = developper(tole)
+        except ValueError as e:
+            st.caption(f"Développé impossible : {e}")
+            erreurs_dxf.add(numero - 1)
+        else:
+            st.caption(f"Largeur développée : {developpe.largeur:.1f} mm — "
+                       f"{developpe.poids:.2f} kg par pièce, {developpe.poids * tole['quantite']:.2f} kg au total")
     with cols[1]:
-        img = dessiner_schema(tole)
-        st.image(img, use_container_width=True)
+        st.image(croquis.svg(tole), use_container_width=True)
     with cols[2]:
         if st.button("❌ Supprimer", key=f"delete_{i}"):
-            st.session_state["toles"].pop(i)
-            st.session_state["refresh"] = not st.session_state.get("refresh", False)  # toggle un booléen
+            base.supprimer_piece(i)
+            st.rerun()
+        # DXF généré au clic seulement (section + flan avec lignes de pli)
+        if numero - 1 not in erreurs_dxf:
+            st.download_button("📐 DXF", data=lambda tole=tole, numero=numero: dxf_tole(tole, numero),
+                               file_name=nom_fichier_tole(tole, numero), mime="application/dxf", key=f"dxf_{i}")
+
+# --- Débit : bandes de longueur standard coupées à la largeur développée ---
+if toles:
+    st.markdown("## Débit")
+    col1, col2 = st.columns(2)
+    with col1:
+        longueurs = st.multiselect("Longueurs de bandes disponibles (mm)", LONGUEURS_STANDARD,
+                                   default=list(LONGUEURS_STANDARD))
+    with col2:
+        trait = st.number_input("Trait de coupe (mm)", value=0.0, min_value=0.0, step=0.5)
+    if longueurs:
+        debit = debiter(toles, longueurs, trait)
+        nb_bandes = sum(len(g.bandes) for g in debit.groupes)
+        st.success(f"📦 {nb_bandes} bande(s) — chute {debit.taux_chute * 100:.1f} % — poids {debit.poids:.1f} kg")
+        lignes_debit = []
+        for groupe in debit.groupes:
+            metal_g, epaisseur_g, coloris_g, laquage_g, finition_g, note_finition_g, largeur_g = groupe.cle
+            formats = {}
+            for bande in groupe.bandes:
+                formats[bande.longueur] = formats.get(bande.longueur, 0) + 1
+            lignes_debit.append({
+                "Métal": f"{metal_g} {epaisseur_g} mm",
+                "Teinte": f"{coloris_g} ({laquage_g} - {note_finition_g if finition_g == 'Autre' else finition_g})",
+                "Largeur développée (mm)": largeur_g,
+                "Pièces": sum(len(b.pieces) for b in groupe.bandes),
+                "Bandes": ", ".join(f"{n} x {l}" for l, n in sorted(formats.items(), reverse=True)),
+                "Chute (%)": round(groupe.taux_chute * 100, 1),
+                "Optimal": groupe.optimal,
+            })
+        st.dataframe(lignes_debit, use_container_width=True)
+        if debit.non_placees:
+            st.error(f"❌ {len(debit.non_placees)} pièce(s) plus longue(s) que la plus longue bande "
+                     f"({max(longueurs)} mm)")
+        for t, erreur in debit.erreurs.items():
+            st.warning(f"Tôle {t + 1} ({toles[t]['forme']}) hors débit : {erreur}")
 
 # --- PDF ---
-import tempfile
-
 def generer_pdf():
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, f"Fournisseur : {fournisseur}", ln=True)
-    pdf.cell(200, 10, f"Référence chantier : {reference_chantier}", ln=True)
-    pdf.ln(10)
-
-    temp_dir = tempfile.gettempdir()
-
-    for idx, tole in enumerate(st.session_state["toles"]):
-        finition_txt = tole['note_finition'] if tole['finition'] == "Autre" else tole['finition']
-
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(200, 10, f"Tôle {idx+1} - {tole['forme']}", ln=True)
-        pdf.set_font("Arial", size=11)
-        pdf.multi_cell(0, 8,
-            f"Métal : {tole['metal']}\n"
-            f"Épaisseur : {tole['epaisseur']} \n"
-            f"Coloris : {tole['coloris']}\n"
-            f"Laquage : {tole['laquage']}\n"
-            f"Finition : {finition_txt}\n"
-            f"Dimensions : {tole['dimensions']}\n"
-            f"Quantité : {tole['quantite']} x {tole['longueur']} mm\n"
-            f"Note : {tole['note']}\n"
-        )
-
-        img = dessiner_schema(tole)
-        img_path = os.path.join(temp_dir, f"tole_{idx}.png")
-        img.save(img_path)
-        pdf.image(img_path, w=100)
-        pdf.ln(10)
-        os.remove(img_path)
-
-    buffer = BytesIO()
-    pdf.output(buffer)
-    pdf_data = buffer.getvalue()
-    return pdf_data
+    return export_commande_pdf(toles, fournisseur, reference_chantier)
 
 
 if st.button("📄 Exporter en PDF"):
     pdf_data = generer_pdf()
-    st.download_button("Télécharger le PDF", data=pdf_data, file_name="commande_tole.pdf", mime="application/pdf")
\ No newline at end of file
+    st.download_button("Télécharger le PDF", data=pdf_data, file_name="commande_tole.pdf", mime="application/pdf")
+
+# --- DXF pour la presse plieuse : générés au clic, hors du script de la page ---
+def dxf_commande():
+    return dxf_bytes(document_commande(toles, reference_chantier)[0])
+
+
+def zip_dxf():
+    # Archive écrite tôle par tôle dans un fichier temporaire (effacé à sa fermeture) ; Streamlit lit un second
+    # descripteur du même fichier, qui le garde ouvert jusqu'au téléchargement
+    with tempfile.TemporaryFile() as fichier:
+        ecrire_zip_dxf(toles, fichier)
+        fichier.flush()
+        return open(os.dup(fichier.fileno()), "rb")
+
+
+if len(erreurs_dxf) < len(toles):
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("📐 DXF de la commande (une présentation par tôle)", data=dxf_commande,
+                           file_name="commande_tole.dxf", mime="application/dxf")
+    with col2:
+        st.download_button("🗜️ Zip (un DXF par tôle)", data=zip_dxf,
+                           file_name="commande_tole_dxf.zip", mime="application/zip")
+
+panneau_debug()
@@ -0,0 +1,114 @@
+import streamlit as st
+import matplotlib.pyplot as plt
+from matplotlib.patches import Polygon as PolygonPatch, Rectangle
+
+from miroiterie.calepinage import FORMATS_PLAQUES, Piece, calepiner, export_calepinage_dxf, export_calepinage_pdf
+from miroiterie.contours import reconstruire_contours
+from miroiterie.dxf_cache import document_dxf
+from miroiterie.dxf_geometrie import extraire_geometrie
+from miroiterie.instrumentation import panneau_debug
+
+# Nombre de plaques dessinées à l'écran (les exports contiennent tout)
+PLAQUES_AFFICHEES = 6
+
+
+def contour_dxf(doc):
+    contours = reconstruire_contours(extraire_geometrie(doc, segments_par_tour=72))
+    return contours.exterieur
+
+
+def draw_plaque(calepinage, plaque):
+    fig, ax = plt.subplots(figsize=(8, 4.5))
+    lp, hp = calepinage.format_plaque
+    ax.add_patch(Rectangle((0, 0), lp, hp, fill=False, edgecolor="black", lw=1.5))
+    for placement in calepinage.placements_plaque(plaque):
+        piece = calepinage.pieces[placement.piece]
+        ax.add_patch(Rectangle((placement.x, placement.y), placement.largeur, placement.hauteur,
+                               fill=piece.polygone is None, alpha=0.4 if piece.polygone is None else 1,
+                               edgecolor="red", linestyle="--", lw=0.8))
+        if piece.polygone is not None:
+            ax.add_patch(PolygonPatch(calepinage.polygone_place(placement), alpha=0.5))
+        ax.text(placement.x + placement.largeur / 2, placement.y + placement.hauteur / 2, piece.reference,
+                ha="center", va="center", fontsize=7)
+    ax.set_xlim(-50, lp + 50)
+    ax.set_ylim(-50, hp + 50)
+    ax.set_aspect("equal")
+    ax.axis("off")
+    ax.set_title(f"Plaque {plaque + 1} / {calepinage.nb_plaques}")
+    return fig
+
+
+def main():
+    st.set_page_config(page_title="Calepinage", page_icon="🧩", layout="wide")
+    st.title("🧩 Calepinage sur plateaux de verre")
+    st.info("Place les rectangles englobants des pièces sur des plateaux standards et calcule le taux de chute")
+
+    st.markdown("### Pièces")
+    lignes = st.data_editor(
+        [{"Référence": "P1", "Largeur (mm)": 1000.0, "Hauteur (mm)": 600.0, "Quantité": 4}],
+        num_rows="dynamic", use_container_width=True, key="pieces_calepinage"
+    )
+    fichiers = st.file_uploader("Ajouter des formes DXF (forme réelle conservée)", type=["dxf"],
+                                accept_multiple_files=True)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        nom_format = st.selectbox("Format de plaque", list(FORMATS_PLAQUES) + ["Autre"])
+        if nom_format == "Autre":
+            format_plaque = (st.number_input("Largeur plaque (mm)", value=3210, min_value=100),
+                             st.number_input("Hauteur plaque (mm)", value=2250, min_value=100))
+        else:
+            format_plaque = FORMATS_PLAQUES[nom_format]
+    with col2:
+        jeu = st.number_input("Jeu entre pièces (mm)", value=4.0, min_value=0.0)
+        rognage = st.number_input("Rognage des bords (mm)", value=10.0, min_value=0.0)
+    with col3:
+        rotation = st.checkbox("Autoriser la rotation", value=True)
+        methode = st.radio("Méthode", ["guillotine", "skyline"],
+                           help="guillotine : coupes traversantes ; skyline : plus compact")
+
+    pieces = []
+    for ligne in lignes:
+        largeur, hauteur = ligne.get("Largeur (mm)"), ligne.get("Hauteur (mm)")
+        if not largeur or not hauteur:
+            continue
+        for _ in range(int(ligne.get("Quantité") or 1)):
+            pieces.append(Piece(str(ligne.get("Référence") or ""), float(largeur), float(hauteur)))
+    for fichier in fichiers or []:
+        exterieur = document_dxf(fichier.getvalue()).derive("contour_calepinage", contour_dxf)
+        if exterieur is None:
+            st.warning(f"❗ {fichier.name} : aucun contour fermé.")
+        else:
+            pieces.append(Piece.depuis_forme(fichier.name, exterieur))
+
+    if not pieces:
+        return
+
+    calepinage = calepiner(pieces, format_plaque, jeu, rognage, rotation, methode)
+
+    st.success(f"📦 {calepinage.nb_plaques} plaque(s) — chute {calepinage.taux_chute * 100:.1f} %")
+    if calepinage.non_placees:
+        refs = ", ".join(pieces[k].reference for k in calepinage.non_placees)
+        st.error(f"❌ Pièce(s) plus grande(s) que la plaque : {refs}")
+
+    for plaque in range(min(calepinage.nb_plaques, PLAQUES_AFFICHEES)):
+        fig = draw_plaque(calepinage, plaque)
+        st.pyplot(fig)
+        plt.close(fig)
+    if calepinage.nb_plaques > PLAQUES_AFFICHEES:
+        st.caption(f"… {calepinage.nb_plaques - PLAQUES_AFFICHEES} plaque(s) supplémentaire(s) dans les exports.")
+
+    if st.button("📄 Exporter en PDF"):
+        pdf_path = export_calepinage_pdf(calepinage)
+        with open(pdf_path, "rb") as f:
+            st.download_button("Télécharger le PDF", f, file_name="calepinage.pdf")
+
+    if st.button("📐 Exporter en DXF"):
+        dxf_path = export_calepinage_dxf(calepinage)
+        with open(dxf_path, "rb") as f:
+            st.download_button("📥 Télécharger le DXF", f, file_name="calepinage.dxf", mime="application/dxf")
+
+
+if __name__ == "__main__":
+    main()
+    panneau_debug()
@@ -0,0 +1,90 @@
+import io
+
+import streamlit as st
+
+from miroiterie.dossier import TYPES_PIECES, export_dossier
+from miroiterie.instrumentation import panneau_debug
+from miroiterie.stockage import stockage
+
+# Nombre de chantiers proposés dans la liste (les plus récents d'abord)
+CHANTIERS_AFFICHES = 50
+
+
+def choisir_chantier(base):
+    """Recherche par référence chantier / fournisseur ; renvoie la référence choisie."""
+    col1, col2 = st.columns(2)
+    with col1:
+        recherche = st.text_input("Rechercher un chantier (début de la référence)")
+    with col2:
+        fournisseur = st.selectbox("Fournisseur de tôles", ["Tous"] + base.fournisseurs())
+    projets = base.projets(recherche, "" if fournisseur == "Tous" else fournisseur, CHANTIERS_AFFICHES)
+
+    references = [chantier for _, chantier, _, _ in projets]
+    actif = st.session_state.get("chantier", "")
+    if actif not in references and not recherche and fournisseur == "Tous":
+        references.insert(0, actif)
+    if not references:
+        st.warning("Aucun chantier trouvé.")
+        return None
+    nb_pieces = {chantier: n for _, chantier, _, n in projets}
+    chantier = st.selectbox("Chantier", references, index=references.index(actif) if actif in references else 0,
+                            format_func=lambda c: f"{c or '(sans référence)'} — {nb_pieces.get(c, 0)} pièce(s)")
+
+    nouveau = st.text_input("Ou créer un nouveau chantier")
+    if nouveau and st.button("➕ Créer"):
+        base.projet(nouveau)
+        chantier = nouveau
+    st.session_state["chantier"] = chantier
+    return chantier
+
+
+def main():
+    st.set_page_config(page_title="Dossier chantier", page_icon="🗂️", layout="wide")
+    st.title("🗂️ Dossier chantier")
+    st.info("Regroupe les formes, formes cintrées et tôles enregistrées pour un chantier dans un seul PDF, "
+            "précédé d'un récapitulatif")
+
+    base = stockage()
+    chantier = choisir_chantier(base)
+    if chantier is None:
+        return
+    projet = base.trouver_projet(chantier)
+    lignes = base.pieces(projet) if projet is not None else []
+    if not lignes:
+        st.warning("Dossier vide : utilisez « ➕ Ajouter au dossier » sur les pages de formes, "
+                   "les tôles sont ajoutées depuis la page « Commande de Tôles ».")
+        return
+
+    miniatures = base.miniatures(i for i, _ in lignes)
+    for n, (i, piece) in enumerate(lignes, start=1):
+        cols = st.columns([1, 4, 1])
+        with cols[0]:
+            st.image(miniatures[i], width=80)
+        with cols[1]:
+            st.write(f"{n}. {TYPES_PIECES[piece.type]} — {piece.reference or 'sans référence'}")
+        with cols[2]:
+            if st.button("❌ Retirer", key=f"retirer_{i}"):
+                base.supprimer_piece(i)
+                st.rerun()
+
+    if st.button("🗑️ Vider le dossier"):
+        base.vider(projet)
+        st.rerun()
+
+    titre = st.text_input("Titre", value="Dossier chantier")
+    if st.button("📄 Exporter le dossier PDF"):
+        barre = st.progress(0.0, text="Génération du dossier...")
+
+        def progression(n, total):
+            barre.progress(n / total, text=f"{n} / {total} page(s)")
+
+        # PDF en mémoire : rien dans le dossier temporaire partagé entre les sessions
+        pdf = io.BytesIO()
+        export_dossier([piece for _, piece in lignes], titre, chantier, progression=progression, fichier=pdf)
+        nom = "".join("_" if c in "/\\" else c for c in chantier or "dossier")
+        st.download_button("Télécharger le dossier", pdf.getvalue(), file_name=nom + ".pdf", mime="application/pdf")
+
+
+if __name__ == "__main__":
+    main()
+    panneau_debug()